@@ -1,11 +1,19 @@
+import pandas as pd
 import streamlit as st
+from core import metrics
 from utils import (
-    load_data,
-    harmonize_columns,
-    standardize_types,
-    filter_functioning_days,
-    add_time_features,
+    load_summary,
+    begin_page,
+    page_stage,
+    incremental_state,
+    row_filter,
+    RowFilter,
+    DEFAULT_CHUNK_ROWS,
+    default_workers,
+    INGEST_MODES,
     COL,
+    DEFAULT_CHART_POINTS,
+    DOWNSAMPLE_METHODS,
 )
 
 st.set_page_config(
@@ -24,26 +32,123 @@ st.caption(
 st.sidebar.header("Data Settings")
 default_path = st.session_state.get("data_path", "data/seoulbike_cleaned.csv")
 default_filter = st.session_state.get("apply_filter", True)
+default_mode = st.session_state.get("ingest_mode", INGEST_MODES[0])
+default_chunk = st.session_state.get("chunk_rows", DEFAULT_CHUNK_ROWS)
+default_worker_count = st.session_state.get("workers", default_workers())
+default_profiling = st.session_state.get("profiling", False)
+default_downsample = st.session_state.get("downsample", DOWNSAMPLE_METHODS[0])
+default_chart_points = st.session_state.get("chart_points", DEFAULT_CHART_POINTS)
 
 data_path = st.sidebar.text_input("Dataset path", value=default_path, key="data_path")
 apply_filter = st.sidebar.checkbox("Filter Functioning Day == Yes", value=default_filter, key="apply_filter")
+ingest_mode = st.sidebar.selectbox(
+    "Ingestion mode",
+    INGEST_MODES,
+    index=INGEST_MODES.index(default_mode),
+    key="ingest_mode",
+    help=(
+        "Streaming reads the CSV in bounded chunks, for files larger than memory. "
+        "Parallel splits the CSV (or a directory / glob of CSVs) into partitions "
+        "and summarizes them in a process pool."
+    ),
+)
+if ingest_mode == INGEST_MODES[1]:
+    st.sidebar.number_input(
+        "Chunk size (rows)", min_value=1_000, step=50_000, value=int(default_chunk), key="chunk_rows"
+    )
+if ingest_mode == INGEST_MODES[3]:
+    st.sidebar.number_input(
+        "Workers", min_value=1, max_value=64, step=1, value=int(default_worker_count), key="workers"
+    )
+
+# Row filters: options come from the unfiltered dataset; the normalized filter
+# is kept in session_state["row_filter"] for every page (see utils.row_filter).
+full = load_summary(data_path, apply_filter, filtered=False)
+current = row_filter()
+
+st.sidebar.header("Filters")
+dates = full.cube[COL["date"]].dropna() if COL["date"] in full.cube.columns else pd.Series(dtype="datetime64[ns]")
+date_range = None
+if len(dates):
+    lo, hi = dates.min().date(), dates.max().date()
+    picked = st.sidebar.date_input(
+        "Date range",
+        value=current.date_range or (lo, hi),
+        min_value=lo,
+        max_value=hi,
+        key="filter_dates",
+    )
+    if isinstance(picked, (list, tuple)) and len(picked) == 2 and tuple(picked) != (lo, hi):
+        date_range = (picked[0], picked[1])
+
+season_options = sorted(str(s) for s in full.label_counts.get("season", pd.Series(dtype=int)).index)
+seasons = None
+if season_options:
+    picked = st.sidebar.multiselect(
+        "Seasons",
+        season_options,
+        default=[s for s in (current.seasons or season_options) if s in season_options],
+        key="filter_seasons",
+    )
+    if set(picked) != set(season_options):
+        seasons = tuple(sorted(picked))
+
+picked = st.sidebar.slider("Hours", 0, 23, value=current.hours or (0, 23), key="filter_hours")
+hours = None if tuple(picked) == (0, 23) else (int(picked[0]), int(picked[1]))
+
+HOLIDAY_CHOICES = {"All days": None, "Non-Holiday": False, "Holiday": True}
+picked = st.sidebar.radio(
+    "Holiday",
+    list(HOLIDAY_CHOICES),
+    index=list(HOLIDAY_CHOICES.values()).index(current.holiday),
+    horizontal=True,
+    key="filter_holiday",
+)
+st.session_state["row_filter"] = RowFilter(
+    date_range=date_range, seasons=seasons, hours=hours, holiday=HOLIDAY_CHOICES[picked]
+)
+
+st.sidebar.header("Charts")
+st.sidebar.selectbox(
+    "Downsampling",
+    DOWNSAMPLE_METHODS,
+    index=DOWNSAMPLE_METHODS.index(default_downsample),
+    key="downsample",
+    help="min/max keeps every peak and trough; lttb follows the line's shape more closely.",
+)
+st.sidebar.number_input(
+    "Max points per chart", min_value=100, max_value=100_000, step=500,
+    value=int(default_chart_points), key="chart_points",
+)
+
+st.sidebar.checkbox(
+    "Enable profiling",
+    value=default_profiling,
+    key="profiling",
+    help="Record per-stage timings and memory; see the Diagnostics page.",
+)
+begin_page("app")
+
+if ingest_mode == INGEST_MODES[2]:
+    refresh = incremental_state(data_path, apply_filter).last_refresh
+    st.sidebar.caption(
+        f"Last refresh: {refresh['mode']}, +{refresh['rows_added']:,} rows "
+        f"in {refresh['seconds'] * 1000:.1f} ms"
+    )
 
-# Load & prepare once for the landing KPIs (pages will reload on their own too)
-df = load_data(data_path)
-df = harmonize_columns(df)
-df = standardize_types(df)
-if apply_filter:
-    df = filter_functioning_days(df)
-df = add_time_features(df)
+# Load & prepare for the landing KPIs (cached; pages reuse the same aggregates)
+with page_stage("load_summary"):
+    summary = load_summary(data_path, apply_filter)
 
 # KPI cards
 c1, c2, c3, c4 = st.columns(4)
-c1.metric("Rows", f"{df.shape[0]:,}")
-c2.metric("Columns", f"{df.shape[1]:,}")
+c1.metric("Rows", f"{summary.rows:,}")
+c2.metric("Columns", f"{len(summary.columns):,}")
 
-if COL["target"] in df.columns:
-    c3.metric("Total Rentals", f"{int(df[COL['target']].sum()):,}")
-    c4.metric("Avg Hourly Rentals", f"{df[COL['target']].mean():.0f}")
+if COL["target"] in summary.columns:
+    kpis = metrics.overview(summary)["kpis"]
+    c3.metric("Total Rentals", f"{kpis['total_rentals']:,}")
+    c4.metric("Avg Hourly Rentals", f"{kpis['avg_hourly_rentals']:.0f}")
 else:
     c3.metric("Total Rentals", "N/A")
     c4.metric("Avg Hourly Rentals", "N/A")
@@ -72,11 +177,12 @@ st.write(
     - **Weekday vs Holiday**: behavioral differences
     - **Weather & Season**: external factors
     - **Recommendations**: actionable operations playbook
+    - **Diagnostics**: per-stage timings and memory (enable profiling in the sidebar)
     """
 )
 
 with st.expander("Data preview"):
-    st.dataframe(df.head(25), use_container_width=True)
+    st.dataframe(summary.preview.head(25), use_container_width=True)
 
 st.info(
     "All charts and insights in this app are generated from the **cleaned dataset** (`seoulbike_cleaned.csv`). "
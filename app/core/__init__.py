@@ -0,0 +1,143 @@
+"""
+Streamlit-free analytics core: data pipeline, aggregates and page metrics.
+
+Names are re-exported lazily, so `import core` is cheap and submodules (and
+optional dependencies such as pyarrow) load on first use.
+"""
+from __future__ import annotations
+
+import importlib
+from typing import Any, Dict
+
+_EXPORTS: Dict[str, str] = {
+    # pipeline
+    "COL": "pipeline",
+    "SCHEMA": "pipeline",
+    "HOLIDAY_VALUES": "pipeline",
+    "FUNCTIONING_VALUES": "pipeline",
+    "DATE_FORMATS": "pipeline",
+    "TIMESLOT_LABELS": "pipeline",
+    "DAY_NAMES": "pipeline",
+    "PIPELINE_STAGES": "pipeline",
+    "StageHook": "pipeline",
+    "harmonize_columns": "pipeline",
+    "parse_dates": "pipeline",
+    "standardize_types": "pipeline",
+    "filter_functioning_days": "pipeline",
+    "add_time_features": "pipeline",
+    "timeslot_codes": "pipeline",
+    "memory_footprint": "pipeline",
+    "run_pipeline": "pipeline",
+    "cow_enabled": "pipeline",
+    "missing_columns": "pipeline",
+    # io
+    "DatasetError": "io",
+    "SIDECAR_VERSION": "io",
+    "check_path": "io",
+    "read_csv": "io",
+    "dataset_version": "io",
+    "sidecar_path": "io",
+    "load_typed_dataset": "io",
+    "prepare_frame": "io",
+    # aggregates
+    "CUBE_DIMS": "aggregates",
+    "CUBE_MEASURES": "aggregates",
+    "PREVIEW_ROWS": "aggregates",
+    "WEATHER_GRID": "aggregates",
+    "DEFAULT_WEATHER_EDGES": "aggregates",
+    "DatasetSummary": "aggregates",
+    "build_demand_cube": "aggregates",
+    "merge_cubes": "aggregates",
+    "cube_rollup": "aggregates",
+    "weather_histogram": "aggregates",
+    "histogram_buckets": "aggregates",
+    "bucket_labels": "aggregates",
+    "snap_edges": "aggregates",
+    "summarize_frame": "aggregates",
+    "merge_summaries": "aggregates",
+    "extend_summary": "aggregates",
+    "SKETCH_DIMS": "aggregates",
+    "build_sketches": "aggregates",
+    "merge_sketch_maps": "aggregates",
+    "sketch_rollup": "aggregates",
+    "sketch_quantiles": "aggregates",
+    # sketch
+    "KLLSketch": "sketch",
+    "merge_sketches": "sketch",
+    # downsample
+    "DOWNSAMPLE_METHODS": "downsample",
+    "DEFAULT_CHART_POINTS": "downsample",
+    "downsample_series": "downsample",
+    "minmax_positions": "downsample",
+    "lttb_positions": "downsample",
+    # filters
+    "RowFilter": "filters",
+    "FilterIndex": "filters",
+    "select_rows": "filters",
+    # quality
+    "QualityProfile": "quality",
+    "profile_frame": "quality",
+    "merge_profiles": "quality",
+    "quality_summary": "quality",
+    "duplicate_slots": "quality",
+    "missing_hour_gaps": "quality",
+    "slot_minutes": "quality",
+    # rollups
+    "GRANULARITIES": "rollups",
+    "DEFAULT_GRANULARITY": "rollups",
+    "build_rollups": "rollups",
+    "available_granularities": "rollups",
+    # planner
+    "DAY_TYPES": "planner",
+    "BUFFER_LEVELS": "planner",
+    "PlanGrid": "planner",
+    "build_plan_grid": "planner",
+    "stockout_risk": "planner",
+    "required_buffer": "planner",
+    # starschema
+    "build_star_schema": "starschema",
+    "write_star_schema": "starschema",
+    "read_manifest": "starschema",
+    # store
+    "DatasetStore": "store",
+    "DEFAULT_BUDGET_MB": "store",
+    "nbytes_of": "store",
+    # ingest
+    "DEFAULT_CHUNK_ROWS": "ingest",
+    "IncrementalState": "ingest",
+    "concat_prepared": "ingest",
+    "iter_prepared_chunks": "ingest",
+    "summarize_stream": "ingest",
+    "refresh_incremental": "ingest",
+    # parallel
+    "default_workers": "parallel",
+    "resolve_partitions": "parallel",
+    "plan_partitions": "parallel",
+    "summarize_parallel": "parallel",
+    # moments
+    "MOMENT_DIMS": "moments",
+    "MOMENT_VARS": "moments",
+    "build_moments": "moments",
+    "merge_moment_maps": "moments",
+    "moments_rollup": "moments",
+    "correlations": "moments",
+    "regression": "moments",
+    # metrics
+    "PAGE_METRICS": "metrics",
+    "compute_report": "metrics",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'core' has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
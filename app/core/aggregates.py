@@ -0,0 +1,468 @@
+"""
+Mergeable aggregates: the demand cube and the per-dataset summary that every
+page renders from. Partials built from disjoint row sets (chunks, partitions,
+appended rows) combine exactly with merge_cubes / merge_summaries.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from . import profiling
+from .moments import MomentMap, build_moments, group_key, merge_moment_maps
+from .pipeline import COL, TIMESLOT_LABELS, timeslot_codes
+from .quality import QualityProfile, merge_profiles, profile_frame
+from .sketch import KLLSketch, merge_sketches
+
+
+# ---------------------------------------------------------------------------
+# Demand cube: mergeable per-cell aggregates that page groupbys roll up from.
+# ---------------------------------------------------------------------------
+
+# Cell dimensions, in order. Holiday (label) and IsHoliday carry the same
+# information, so keeping both does not add cells.
+CUBE_DIMS: List[str] = [COL["date"], COL["hour"], COL["season"], COL["holiday"], "IsHoliday", "IsWeekend"]
+CUBE_MEASURES: List[str] = ["sum", "count", "sumsq", "min", "max"]
+
+# Dimensions that are not stored but can be derived from stored ones.
+_CUBE_DERIVED: Dict[str, Callable[[pd.DataFrame], object]] = {
+    "Month": lambda c: c[COL["date"]].dt.month,
+    "DayOfWeek": lambda c: c[COL["date"]].dt.day_name(),
+    "TimeSlot": lambda c: pd.Categorical.from_codes(
+        timeslot_codes(c[COL["hour"]].to_numpy(dtype="float64", na_value=np.nan)),
+        categories=TIMESLOT_LABELS,
+    ),
+}
+
+
+def _cube_dims(frame: pd.DataFrame) -> List[str]:
+    return [c for c in CUBE_DIMS if c in frame.columns]
+
+
+def build_demand_cube(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aggregate the target per (date, hour, season, holiday, weekend) cell:
+    sum, count, sum of squares, min and max. One row per non-empty cell.
+    """
+    dims = _cube_dims(df)
+    y = df[COL["target"]].astype("float64")
+    cells = df[dims].assign(_y=y, _y2=y * y)
+    cube = cells.groupby(dims, observed=True, dropna=False, sort=True).agg(
+        sum=("_y", "sum"),
+        count=("_y", "count"),
+        sumsq=("_y2", "sum"),
+        min=("_y", "min"),
+        max=("_y", "max"),
+    )
+    return cube.reset_index()
+
+
+def merge_cubes(*cubes: pd.DataFrame) -> pd.DataFrame:
+    """Combine cubes built from disjoint row sets (chunks, partitions, appends)."""
+    cubes = [c for c in cubes if c is not None and len(c)]
+    if not cubes:
+        return pd.DataFrame(columns=CUBE_DIMS + CUBE_MEASURES)
+    if len(cubes) == 1:
+        return cubes[0]
+    both = pd.concat(cubes, ignore_index=True)
+    g = both.groupby(_cube_dims(both), observed=True, dropna=False, sort=True)
+    merged = g[["sum", "count", "sumsq"]].sum()
+    merged["min"] = g["min"].min()
+    merged["max"] = g["max"].max()
+    return merged.reset_index()
+
+
+def _extend_cube(cube: pd.DataFrame, df: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """
+    merge_cubes(cube, build_demand_cube(df)) for a few rows, updating cells
+    by position instead of grouping the whole cube again. None when a row
+    needs the general merge: a missing key or target column, a label the
+    cube has no category for, or a new cell that would not sort after the
+    cube's last (date, hour).
+    """
+    dims = _cube_dims(df)
+    if (
+        not len(cube) or COL["target"] not in df.columns
+        or dims != _cube_dims(cube) or dims[:2] != [COL["date"], COL["hour"]]
+    ):
+        return None
+    y = df[COL["target"]].to_numpy(dtype="float64", na_value=np.nan)
+    groups: Dict[Tuple, List[int]] = {}
+    for i, key in enumerate(zip(*(df[c].tolist() for c in dims))):
+        if any(pd.isna(v) for v in key):
+            return None
+        groups.setdefault(key, []).append(i)
+
+    # the cube is sorted by date first, so a key's cell lies in its date's run of rows
+    dates = cube[COL["date"]].to_numpy()
+    measures = {m: cube[m].to_numpy(copy=True) for m in CUBE_MEASURES}
+    new: List[Tuple[Tuple, np.ndarray]] = []
+    for key, idx in groups.items():
+        cell = y[idx]
+        cell = cell[~np.isnan(cell)]
+        day = np.datetime64(key[0], "ns")
+        lo, hi = np.searchsorted(dates, day, side="left"), np.searchsorted(dates, day, side="right")
+        pos = [lo + j for j, row in enumerate(zip(*(cube[c].iloc[lo:hi].tolist() for c in dims))) if row == key]
+        if not pos:
+            new.append((key, cell))
+        elif len(cell):
+            p = pos[0]
+            measures["sum"][p] += cell.sum()
+            measures["count"][p] += len(cell)
+            measures["sumsq"][p] += (cell * cell).sum()
+            measures["min"][p] = np.fmin(measures["min"][p], cell.min())
+            measures["max"][p] = np.fmax(measures["max"][p], cell.max())
+    out = cube.assign(**measures)
+    if not new:
+        return out
+
+    new.sort(key=lambda item: item[0][:2])
+    last = (cube[dims[0]].iloc[-1], cube[dims[1]].iloc[-1])
+    stamps = [last] + [key[:2] for key, _ in new]
+    if any(not a < b for a, b in zip(stamps, stamps[1:])):
+        return None
+    columns: Dict[str, object] = {}
+    for j, c in enumerate(dims):
+        values = [key[j] for key, _ in new]
+        if isinstance(cube[c].dtype, pd.CategoricalDtype):
+            columns[c] = pd.Categorical(values, dtype=cube[c].dtype)
+            if columns[c].isna().any():  # a label the cube has never seen
+                return None
+        else:
+            columns[c] = np.asarray(values, dtype=cube[c].dtype)
+    cells = [cell for _, cell in new]
+    rows = pd.DataFrame({
+        **columns,
+        "sum": [cell.sum() for cell in cells],
+        "count": np.array([len(cell) for cell in cells], dtype=measures["count"].dtype),
+        "sumsq": [(cell * cell).sum() for cell in cells],
+        "min": [cell.min() if len(cell) else np.nan for cell in cells],
+        "max": [cell.max() if len(cell) else np.nan for cell in cells],
+    })
+    return pd.concat([out, rows], ignore_index=True)
+
+
+def cube_rollup(cube: pd.DataFrame, by: List[str]) -> pd.DataFrame:
+    """
+    Roll the cube up to the `by` columns (stored dims or Month / DayOfWeek /
+    TimeSlot). Returns sum, count, mean, std (ddof=1), min and max per group,
+    or a single "all" row when by is empty. Missing keys are dropped, matching
+    a groupby on the raw rows.
+    """
+    if not by:
+        out = pd.DataFrame({
+            "sum": [cube["sum"].sum()],
+            "count": [cube["count"].sum()],
+            "sumsq": [cube["sumsq"].sum()],
+            "min": [cube["min"].min()],
+            "max": [cube["max"].max()],
+        }, index=["all"])
+    else:
+        keys = [
+            cube[name] if name in cube.columns
+            else pd.Series(_CUBE_DERIVED[name](cube), index=cube.index, name=name)
+            for name in by
+        ]
+        g = cube.groupby(keys, observed=True, sort=True)
+        out = g[["sum", "count", "sumsq"]].sum()
+        out["min"] = g["min"].min()
+        out["max"] = g["max"].max()
+
+    n = out["count"].astype("float64")
+    out["mean"] = out["sum"] / n.where(n > 0)
+    var = (out["sumsq"] - out["sum"] ** 2 / n.where(n > 0)) / (n - 1).where(n > 1)
+    out["std"] = np.sqrt(var.clip(lower=0))
+    return out[["sum", "count", "mean", "std", "min", "max"]]
+
+
+# ---------------------------------------------------------------------------
+# Quantile sketches: mergeable per-(hour, holiday, weekend, season) target
+# distributions. Pages roll them up to the dimensions they show.
+# ---------------------------------------------------------------------------
+
+SKETCH_DIMS: List[str] = [COL["hour"], "IsHoliday", "IsWeekend", COL["season"]]
+
+SketchMap = Dict[Tuple, KLLSketch]
+
+
+def _sketch_keys(df: pd.DataFrame) -> List[object]:
+    """
+    Group keys for every SKETCH_DIMS entry, so key tuples keep their
+    positions: missing flags count as False, a missing season as "".
+    """
+    keys: List[object] = []
+    for c in SKETCH_DIMS:
+        if c in ("IsHoliday", "IsWeekend"):
+            keys.append(df[c].to_numpy(dtype=bool, na_value=False) if c in df.columns else np.zeros(len(df), bool))
+        else:
+            keys.append(df[c] if c in df.columns else np.full(len(df), ""))
+    return keys
+
+
+def build_sketches(df: pd.DataFrame) -> SketchMap:
+    """One KLL sketch of the target per SKETCH_DIMS cell present in df."""
+    if COL["target"] not in df.columns or COL["hour"] not in df.columns:
+        return {}
+    y = df[COL["target"]].to_numpy(dtype="float64", na_value=np.nan)
+    groups = df.groupby(_sketch_keys(df), observed=True, sort=True).indices
+    return {
+        group_key(key): KLLSketch().update(y[idx])
+        for key, idx in groups.items()
+    }
+
+
+def merge_sketch_maps(a: SketchMap, b: SketchMap) -> SketchMap:
+    return {key: merge_sketches(a.get(key), b.get(key)) for key in sorted(set(a) | set(b))}
+
+
+def sketch_rollup(sketches: SketchMap, by: List[str]) -> SketchMap:
+    """Merge cell sketches up to the `by` subset of SKETCH_DIMS."""
+    pos = [SKETCH_DIMS.index(b) for b in by]
+    groups: Dict[tuple, List[KLLSketch]] = {}
+    for key in sorted(sketches):
+        groups.setdefault(tuple(key[i] for i in pos), []).append(sketches[key])
+    return {k: merge_sketches(*group) for k, group in groups.items()}
+
+
+def sketch_quantiles(sketches: SketchMap, by: List[str], qs: List[float]) -> pd.DataFrame:
+    """Approximate target quantiles per `by` group, columns labelled like describe() ("50%")."""
+    cols = [f"{q * 100:g}%" for q in qs]
+    rolled = sketch_rollup(sketches, by)
+    if not rolled:
+        return pd.DataFrame(columns=cols)
+    index = pd.MultiIndex.from_tuples(list(rolled), names=by)
+    if len(by) == 1:
+        index = index.get_level_values(0)
+    return pd.DataFrame([sk.quantile(qs) for sk in rolled.values()], index=index, columns=cols)
+
+
+# ---------------------------------------------------------------------------
+# Dataset summaries: everything the pages render, as mergeable partials.
+# ---------------------------------------------------------------------------
+
+PREVIEW_ROWS = 30
+
+# Row-count distributions shown on the Overview page.
+LABEL_COUNT_KEYS: List[str] = ["season", "holiday"]
+
+# Fine histogram grid per weather variable: (low, high, step). Bins are
+# right-closed like pd.cut, (e - step, e] for grid edges e, plus an underflow
+# bin (-inf, low] and an overflow bin (high, inf). The grid is fixed, not
+# data-driven, so histograms of any two partitions add up.
+WEATHER_GRID: Dict[str, Tuple[float, float, float]] = {
+    "temp": (-30.0, 45.0, 0.5),
+    "dew_point": (-40.0, 35.0, 0.5),
+    "humidity": (0.0, 100.0, 1.0),
+    "wind": (0.0, 20.0, 0.1),
+    "visibility": (0.0, 2000.0, 10.0),
+    "solar": (0.0, 5.0, 0.05),
+    "rainfall": (0.0, 100.0, 0.1),
+    "snowfall": (0.0, 20.0, 0.1),
+}
+
+# Default bucket edges per weather variable: buckets are (-inf, e0], (e0, e1],
+# ..., (en, inf). Rainfall/snowfall match the original fixed buckets.
+DEFAULT_WEATHER_EDGES: Dict[str, List[float]] = {
+    "temp": [-10, 0, 10, 20, 30],
+    "dew_point": [-10, 0, 10, 20],
+    "humidity": [20, 40, 60, 80],
+    "wind": [1, 2, 3, 4],
+    "visibility": [500, 1000, 1500],
+    "solar": [0, 0.5, 1, 2],
+    "rainfall": [0, 5, 20],
+    "snowfall": [0, 1, 5],
+}
+
+
+@dataclass
+class DatasetSummary:
+    """
+    Mergeable aggregates of a prepared dataset (or one chunk of it).
+    Built by summarize_frame, combined by merge_summaries; the pages render
+    from these so the full frame never has to be in memory.
+    """
+
+    rows: int
+    columns: List[str]
+    preview: pd.DataFrame
+    cube: pd.DataFrame
+    label_counts: Dict[str, pd.Series] = field(default_factory=dict)
+    weather: Dict[str, pd.DataFrame] = field(default_factory=dict)
+    sketches: SketchMap = field(default_factory=dict)
+    moments: MomentMap = field(default_factory=dict)
+    date_coerced: int = 0
+    quality: Optional[QualityProfile] = None
+
+
+def _grid_edges(key: str) -> np.ndarray:
+    low, high, step = WEATHER_GRID[key]
+    return np.round(low + step * np.arange(int(round((high - low) / step)) + 1), 6)
+
+
+def _snap(grid: np.ndarray, edges: List[float]) -> Tuple[List[float], List[float]]:
+    edges = [float(e) for e in edges]
+    inside = [e for e in edges if grid[0] <= e <= grid[-1]]
+    snapped = sorted({float(grid[np.abs(grid - e).argmin()]) for e in inside})
+    return snapped, [e for e in edges if not grid[0] <= e <= grid[-1]]
+
+
+def snap_edges(key: str, edges: List[float]) -> Tuple[List[float], List[float]]:
+    """
+    Bucket edges as histogram_buckets applies them to WEATHER_GRID[key]:
+    (edges snapped to the nearest grid edge, sorted and deduplicated;
+    edges outside the grid, which are dropped).
+    """
+    return _snap(_grid_edges(key), edges)
+
+
+def weather_histogram(df: pd.DataFrame, key: str) -> pd.DataFrame:
+    """
+    Target sum/count per WEATHER_GRID bin of one weather column, indexed by
+    the bin's upper edge (inf for the overflow bin). Missing values are skipped.
+    """
+    edges = np.append(_grid_edges(key), np.inf)
+    sums, counts = _histogram_bins(df, key, len(edges))
+    return pd.DataFrame({"sum": sums, "count": counts}, index=pd.Index(edges, name="upper"))
+
+
+def _histogram_bins(df: pd.DataFrame, key: str, bins: int) -> Tuple[np.ndarray, np.ndarray]:
+    low, _, step = WEATHER_GRID[key]
+    x = df[COL[key]].to_numpy(dtype="float64", na_value=np.nan)
+    y = df[COL["target"]].to_numpy(dtype="float64", na_value=np.nan)
+    ok = ~(np.isnan(x) | np.isnan(y))
+    # rounding first keeps float32 values that sit on an edge in that edge's bin
+    idx = np.ceil(np.round((x[ok] - low) / step, 6)).clip(0, bins - 1).astype(np.int64)
+    return np.bincount(idx, weights=y[ok], minlength=bins), np.bincount(idx, minlength=bins).astype("float64")
+
+
+def bucket_labels(edges: List[float]) -> List[str]:
+    """Readable labels for the buckets histogram_buckets builds from edges."""
+    if not edges:
+        return ["all"]
+    inner = [f"{a:g}–{b:g}" for a, b in zip(edges, edges[1:])]
+    return [f"≤ {edges[0]:g}"] + inner + [f"> {edges[-1]:g}"]
+
+
+def histogram_buckets(hist: pd.DataFrame, edges: List[float]) -> pd.DataFrame:
+    """
+    Roll a fine weather histogram up to buckets (-inf, e0], (e0, e1], ...,
+    (en, inf): sum, count and mean target per bucket. No pass over rows.
+    Edges snap to the nearest grid edge and edges outside the grid are
+    dropped, since the under/overflow bins cannot be split (see snap_edges).
+    """
+    edges, _ = _snap(hist.index.to_numpy()[:-1], edges)
+    # right-closed: upper edge e falls in bucket j when edges[j-1] < e <= edges[j]
+    bucket = np.searchsorted(np.asarray(edges, dtype="float64"), hist.index.to_numpy(), side="left")
+    n = len(edges) + 1
+    out = pd.DataFrame(
+        {
+            "sum": np.bincount(bucket, weights=hist["sum"].to_numpy(), minlength=n),
+            "count": np.bincount(bucket, weights=hist["count"].to_numpy(), minlength=n),
+        },
+        index=pd.Index(bucket_labels(edges), name="bucket"),
+    )
+    out["mean"] = out["sum"] / out["count"].where(out["count"] > 0)
+    return out
+
+
+def summarize_frame(df: pd.DataFrame) -> DatasetSummary:
+    """Partial aggregates for one prepared frame or chunk."""
+    with profiling.stage("summarize_frame", rows_in=len(df)):
+        return _summarize_frame(df)
+
+
+def _summarize_frame(df: pd.DataFrame, cells: bool = True) -> DatasetSummary:
+    """cells=False leaves out the cube and weather histograms (extend_summary updates those itself)."""
+    has_target = COL["target"] in df.columns and cells
+    return DatasetSummary(
+        rows=int(len(df)),
+        columns=list(df.columns),
+        preview=df.head(PREVIEW_ROWS),
+        cube=build_demand_cube(df) if has_target else pd.DataFrame(columns=CUBE_DIMS + CUBE_MEASURES),
+        label_counts={
+            k: df[COL[k]].value_counts() for k in LABEL_COUNT_KEYS if COL[k] in df.columns
+        },
+        weather={
+            k: weather_histogram(df, k)
+            for k in WEATHER_GRID
+            if has_target and COL[k] in df.columns
+        },
+        sketches=build_sketches(df),
+        moments=build_moments(df),
+        date_coerced=int(df.attrs.get("date_coerced", 0)),
+        quality=profile_frame(df),
+    )
+
+
+def _add_series(a: Optional[pd.Series], b: Optional[pd.Series]) -> Optional[pd.Series]:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    a = a.set_axis(a.index.astype(object))
+    b = b.set_axis(b.index.astype(object))
+    return a.add(b, fill_value=0)
+
+
+def merge_summaries(a: DatasetSummary, b: DatasetSummary) -> DatasetSummary:
+    """Combine summaries of disjoint row sets; a's rows come first."""
+    preview = a.preview
+    if len(preview) < PREVIEW_ROWS and len(b.preview):
+        preview = pd.concat([preview, b.preview]).head(PREVIEW_ROWS)
+    label_counts = {
+        k: _add_series(a.label_counts.get(k), b.label_counts.get(k))
+        .astype("int64")
+        .sort_values(ascending=False)
+        for k in set(a.label_counts) | set(b.label_counts)
+    }
+    weather = {
+        k: a.weather[k].add(b.weather[k], fill_value=0) if k in a.weather and k in b.weather
+        else a.weather.get(k, b.weather.get(k))
+        for k in WEATHER_GRID
+        if k in a.weather or k in b.weather
+    }
+    return DatasetSummary(
+        rows=a.rows + b.rows,
+        columns=a.columns or b.columns,
+        preview=preview,
+        cube=merge_cubes(a.cube, b.cube),
+        label_counts=label_counts,
+        weather=weather,
+        sketches=merge_sketch_maps(a.sketches, b.sketches),
+        moments=merge_moment_maps(a.moments, b.moments),
+        date_coerced=a.date_coerced + b.date_coerced,
+        quality=merge_profiles(a.quality, b.quality),
+    )
+
+
+# Appends of at most this many rows take extend_summary's positional path.
+SMALL_DELTA_ROWS = 64
+
+
+def extend_summary(summary: DatasetSummary, df: pd.DataFrame) -> DatasetSummary:
+    """
+    merge_summaries(summary, summarize_frame(df)) for rows appended to the
+    summarized data. Up to SMALL_DELTA_ROWS rows, cube cells and weather
+    bins are updated by position rather than built for the delta and merged
+    by a groupby over the whole cube; the result is the same.
+    """
+    with profiling.stage("extend_summary", rows_in=len(df)) as rec:
+        cube = _extend_cube(summary.cube, df) if 0 < len(df) <= SMALL_DELTA_ROWS else None
+        rec["fast_path"] = cube is not None
+        if cube is None:
+            return merge_summaries(summary, summarize_frame(df))
+        weather = dict(summary.weather)
+        for k, hist in summary.weather.items():
+            if COL[k] in df.columns:
+                sums, counts = _histogram_bins(df, k, len(hist))
+                weather[k] = pd.DataFrame(
+                    {"sum": hist["sum"].to_numpy() + sums, "count": hist["count"].to_numpy() + counts},
+                    index=hist.index,
+                )
+        for k in WEATHER_GRID:
+            if k not in weather and COL[k] in df.columns:
+                weather[k] = weather_histogram(df, k)
+        return replace(merge_summaries(summary, _summarize_frame(df, cells=False)), cube=cube, weather=weather)
@@ -0,0 +1,100 @@
+"""
+Named derived tables memoized on declared inputs.
+
+A page declares each derived table with the inputs it depends on: dataset
+version, filter state, widget values, and other derived tables by name
+(depends_on). The table is recomputed only when one of those inputs changed
+since its last computation; otherwise the stored value is handed back as is,
+without copying or unpickling. Every computation stamps the table with a new
+version from a monotonic clock, and dependents compare that version, so a
+change propagates down the chain and nothing else recomputes.
+
+One DerivedTables holds one value per name (the latest inputs win), so its
+size is bounded by the number of names a session uses.
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+_MISSING = object()
+
+
+@dataclass
+class _Entry:
+    inputs: Dict[str, Hashable]
+    value: Any
+    version: int
+    compute_ms: float
+    hits: int = 0
+    misses: int = 1
+    changed: List[str] = field(default_factory=list)
+
+
+class DerivedTables:
+    """Memo of derived tables keyed by name; see the module docstring."""
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, _Entry] = {}
+        self._clock = 0
+
+    def get(
+        self,
+        name: str,
+        inputs: Dict[str, Hashable],
+        compute: Callable[[], T],
+        depends_on: Iterable[str] = (),
+    ) -> T:
+        """
+        The value of `name` for these inputs. compute() runs only when an
+        input (or the version of a table in depends_on) differs from the
+        previous call; an exception leaves the previous entry in place.
+        """
+        key = dict(inputs)
+        for dep in depends_on:
+            key[f"@{dep}"] = self.version(dep)
+        entry = self._entries.get(name)
+        if entry is not None and entry.inputs == key:
+            entry.hits += 1
+            return entry.value
+
+        t0 = time.perf_counter()
+        value = compute()
+        self._clock += 1
+        new = _Entry(key, value, self._clock, (time.perf_counter() - t0) * 1000)
+        if entry is not None:
+            new.hits, new.misses = entry.hits, entry.misses + 1
+            new.changed = sorted(
+                k for k in key.keys() | entry.inputs.keys() if key.get(k, _MISSING) != entry.inputs.get(k, _MISSING)
+            )
+        self._entries[name] = new
+        return value
+
+    def version(self, name: str) -> int:
+        """Version of the stored value (0 when the name was never computed)."""
+        entry = self._entries.get(name)
+        return entry.version if entry is not None else 0
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Drop one table (its dependents recompute on their next get) or all."""
+        if name is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(name, None)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """One row per table: version, hits, misses, last compute time and inputs that changed."""
+        return [
+            {
+                "name": name,
+                "version": e.version,
+                "hits": e.hits,
+                "misses": e.misses,
+                "compute_ms": round(e.compute_ms, 3),
+                "last_changed": ", ".join(e.changed),
+            }
+            for name, e in self._entries.items()
+        ]
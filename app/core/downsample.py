@@ -0,0 +1,107 @@
+"""
+Downsampling of long chart series before they are sent to the browser.
+
+Both methods keep the first and last point and return a subset of the
+original points (no interpolation), in order:
+
+- "min/max": split the series into equal-width x buckets (one per pair of
+  output points) and keep each bucket's lowest and highest point. Every
+  peak and trough survives, so the chart's envelope is exact.
+- "lttb": Largest-Triangle-Three-Buckets keeps, per bucket, the point that
+  spans the largest triangle with the previous pick and the next bucket's
+  mean. Closer to the line's overall shape; extremes usually but not
+  always survive.
+"""
+from __future__ import annotations
+
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+DOWNSAMPLE_METHODS: List[str] = ["min/max", "lttb", "off"]
+
+DEFAULT_CHART_POINTS = 2000
+
+
+def _x_values(index: pd.Index) -> np.ndarray:
+    """Index as float positions on the x axis (datetimes as ns since the first one)."""
+    if isinstance(index, pd.DatetimeIndex):
+        ns = index.asi8
+        return (ns - ns[0]).astype("float64")
+    if pd.api.types.is_numeric_dtype(index.dtype):
+        return index.to_numpy(dtype="float64")
+    return np.arange(len(index), dtype="float64")
+
+
+def _buckets(x: np.ndarray, n: int) -> np.ndarray:
+    """Bucket number 0..n-1 of each point, by equal-width x ranges."""
+    span = x[-1] - x[0]
+    if not span > 0:
+        return np.minimum(np.arange(len(x)) * n // len(x), n - 1)
+    return np.minimum(((x - x[0]) / span * n).astype(np.int64), n - 1)
+
+
+def _first_match(y: np.ndarray, bucket: np.ndarray, starts: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Position of the first point per (contiguous) bucket whose y equals that bucket's value."""
+    counts = np.diff(np.r_[starts, len(y)])
+    hit = np.flatnonzero(y == np.repeat(values, counts))
+    _, first = np.unique(bucket[hit], return_index=True)
+    return hit[first]
+
+
+def minmax_positions(x: np.ndarray, y: np.ndarray, target: int) -> np.ndarray:
+    """Positions of the min and max point per bucket, about target points in total (x sorted)."""
+    n = len(y)
+    if n <= target:
+        return np.arange(n)
+    bucket = _buckets(x, max(1, (target - 2) // 2))
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    lows = _first_match(y, bucket, starts, np.minimum.reduceat(y, starts))
+    highs = _first_match(y, bucket, starts, np.maximum.reduceat(y, starts))
+    return np.unique(np.r_[0, lows, highs, n - 1])
+
+
+def lttb_positions(x: np.ndarray, y: np.ndarray, target: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets positions, target points in total (x sorted)."""
+    n = len(y)
+    if n <= target or target < 3:
+        return np.arange(n)
+    # points 1..n-2 go into target-2 buckets; the first and last are always kept
+    edges = np.linspace(1, n - 1, target - 1).astype(np.int64)
+    counts = np.diff(np.r_[edges, n])
+    mean_x = np.add.reduceat(x, edges) / counts
+    mean_y = np.add.reduceat(y, edges) / counts  # last entry: the final point itself
+
+    out = np.empty(target, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(target - 2):
+        lo, hi = edges[i], edges[i + 1]
+        cx, cy = mean_x[i + 1], mean_y[i + 1]
+        bx, by = x[lo:hi], y[lo:hi]
+        area = np.abs((x[a] - cx) * (by - y[a]) - (x[a] - bx) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def downsample_series(series: pd.Series, target: int = DEFAULT_CHART_POINTS, method: str = "min/max") -> pd.Series:
+    """
+    At most about `target` points of series, chosen by method (see
+    DOWNSAMPLE_METHODS). Missing values are dropped first; series that are
+    already short enough are returned unchanged.
+    """
+    if method == "off":
+        return series
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Unknown downsampling method: {method!r}")
+    s = series[series.notna()]
+    if not s.index.is_monotonic_increasing:
+        s = s.sort_index()
+    target = max(int(target), 3)
+    if len(s) <= target:
+        return series
+    x, y = _x_values(s.index), s.to_numpy(dtype="float64")
+    pos = minmax_positions(x, y, target) if method == "min/max" else lttb_positions(x, y, target)
+    return s.iloc[pos]
@@ -0,0 +1,206 @@
+"""
+Row filters (date range, season, hour, holiday) and an index that answers
+them without scanning the frame.
+
+FilterIndex is built once per prepared frame: a sorted date index and a sorted
+hour index for range lookups, and code-position lists for season and holiday.
+A query starts from the most selective predicate's positions and checks only
+those rows against the others, so cost follows the result size, not the
+frame size. RowFilter.mask is the equivalent full scan, used on streamed
+chunks and partitions that have no index.
+"""
+from __future__ import annotations
+
+import datetime as dt
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .pipeline import COL
+
+_NAT = np.iinfo(np.int64).min
+
+
+@dataclass(frozen=True)
+class RowFilter:
+    """
+    Selected rows; None means "no constraint". Dates and hours are inclusive.
+    Frozen (hashable), so it can be part of cache keys.
+    """
+
+    date_range: Optional[Tuple[dt.date, dt.date]] = None
+    seasons: Optional[Tuple[str, ...]] = None
+    hours: Optional[Tuple[int, int]] = None
+    holiday: Optional[bool] = None
+
+    def is_empty(self) -> bool:
+        return self.date_range is None and self.seasons is None and self.hours is None and self.holiday is None
+
+    def describe(self) -> str:
+        parts = []
+        if self.date_range is not None:
+            parts.append(f"{self.date_range[0]} – {self.date_range[1]}")
+        if self.seasons is not None:
+            parts.append(", ".join(self.seasons) or "no seasons")
+        if self.hours is not None:
+            parts.append(f"hours {self.hours[0]:02d}–{self.hours[1]:02d}")
+        if self.holiday is not None:
+            parts.append("holidays" if self.holiday else "non-holidays")
+        return "; ".join(parts) or "all rows"
+
+    def _date_bounds(self) -> Tuple[int, int]:
+        """[start, end) in datetime64[ns] integers."""
+        start = pd.Timestamp(self.date_range[0]).value
+        end = (pd.Timestamp(self.date_range[1]) + pd.Timedelta(days=1)).value
+        return start, end
+
+    def mask(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Boolean row mask by scanning df (missing values never match a
+        constraint). Missing columns are treated as FilterIndex treats them:
+        no date, season or hour matches, and no row is a holiday.
+        """
+        keep = np.ones(len(df), dtype=bool)
+        if self.date_range is not None:
+            d = _date_values(df)
+            start, end = self._date_bounds()
+            keep &= (d >= start) & (d < end)
+        if self.seasons is not None:
+            if COL["season"] in df.columns:
+                keep &= df[COL["season"]].isin(self.seasons).to_numpy(dtype=bool, na_value=False)
+            else:
+                keep[:] = False
+        if self.hours is not None:
+            if COL["hour"] in df.columns:
+                h = df[COL["hour"]].to_numpy(dtype="float64", na_value=np.nan)
+                keep &= (h >= self.hours[0]) & (h <= self.hours[1])
+            else:
+                keep[:] = False
+        if self.holiday is not None:
+            keep &= _holiday_values(df) == self.holiday
+        return keep
+
+
+def _date_values(df: pd.DataFrame) -> np.ndarray:
+    """Date column as int64 ns with NaT as the smallest int64."""
+    if COL["date"] not in df.columns:
+        return np.full(len(df), _NAT, dtype=np.int64)
+    return df[COL["date"]].to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+
+def _holiday_values(df: pd.DataFrame) -> np.ndarray:
+    """IsHoliday as bool; all False when the dataset has no holiday column."""
+    if "IsHoliday" not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+    return df["IsHoliday"].to_numpy(dtype=bool, na_value=False)
+
+
+class FilterIndex:
+    """Positions of rows matching a RowFilter in one frame, without a full scan."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.rows = len(df)
+        dates = _date_values(df)
+        self._dates = dates
+        self._date_order = np.argsort(dates, kind="stable")
+        self._date_sorted = dates[self._date_order]
+
+        if COL["hour"] in df.columns:
+            hours = df[COL["hour"]].to_numpy(dtype="float64", na_value=np.nan)
+        else:
+            hours = np.full(len(df), np.nan)
+        self._hours = hours
+        self._hour_order = np.argsort(hours, kind="stable")  # NaN sorts last
+        self._hour_sorted = hours[self._hour_order]
+
+        if COL["season"] in df.columns:
+            season = df[COL["season"]].astype("category")
+            self._season_labels = list(season.cat.categories)
+            self._season_codes = season.cat.codes.to_numpy()
+        else:
+            self._season_labels, self._season_codes = [], np.full(len(df), -1, dtype=np.int8)
+        self._season_pos = [np.flatnonzero(self._season_codes == i) for i in range(len(self._season_labels))]
+
+        self._holiday = _holiday_values(df)
+        self._holiday_pos = {flag: np.flatnonzero(self._holiday == flag) for flag in (False, True)}
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            a.nbytes
+            for a in [self._dates, self._date_order, self._date_sorted, self._hours, self._hour_order,
+                      self._hour_sorted, self._season_codes, self._holiday, *self._season_pos,
+                      *self._holiday_pos.values()]
+        )
+
+    def _season_allowed(self, f: RowFilter) -> np.ndarray:
+        allowed = np.zeros(len(self._season_labels) + 1, dtype=bool)  # last slot: code -1 (missing)
+        for i, label in enumerate(self._season_labels):
+            allowed[i] = label in f.seasons
+        return allowed
+
+    def positions(self, f: RowFilter) -> np.ndarray:
+        """Sorted row positions matching f."""
+        if f.is_empty():
+            return np.arange(self.rows)
+
+        # (candidate count, candidate positions, check on other candidates).
+        # Date/hour/holiday candidates are views into the index; seasons are
+        # only concatenated if they turn out to be the most selective.
+        plans: List[Tuple[int, Callable[[], np.ndarray], Callable[[np.ndarray], np.ndarray]]] = []
+        if f.date_range is not None:
+            start, end = f._date_bounds()
+            lo, hi = np.searchsorted(self._date_sorted, [start, end], side="left")
+            dates = self._dates
+            plans.append((
+                hi - lo,
+                lambda v=self._date_order[lo:hi]: v,
+                lambda pos: (dates[pos] >= start) & (dates[pos] < end),
+            ))
+        if f.hours is not None:
+            a, b = f.hours
+            lo = np.searchsorted(self._hour_sorted, a, side="left")
+            hi = np.searchsorted(self._hour_sorted, b, side="right")
+            hours = self._hours
+            plans.append((
+                hi - lo,
+                lambda v=self._hour_order[lo:hi]: v,
+                lambda pos: (hours[pos] >= a) & (hours[pos] <= b),
+            ))
+        if f.seasons is not None:
+            allowed = self._season_allowed(f)
+            chosen = [p for i, p in enumerate(self._season_pos) if allowed[i]]
+            codes = self._season_codes
+            plans.append((
+                sum(len(p) for p in chosen),
+                lambda: np.concatenate(chosen) if chosen else np.empty(0, dtype=np.int64),
+                lambda pos: allowed[codes[pos]],
+            ))
+        if f.holiday is not None:
+            flag, holiday = f.holiday, self._holiday
+            plans.append((
+                len(self._holiday_pos[flag]),
+                lambda v=self._holiday_pos[flag]: v,
+                lambda pos: holiday[pos] == flag,
+            ))
+
+        plans.sort(key=lambda p: p[0])
+        pos = plans[0][1]()
+        for _, _, check in plans[1:]:
+            if not len(pos):
+                break
+            pos = pos[check(pos)]
+        # candidates are ascending runs (per date, hour or season), which
+        # timsort ("stable") merges far faster than a general sort
+        return np.sort(pos, kind="stable")
+
+
+def select_rows(df: pd.DataFrame, f: Optional[RowFilter], index: Optional[FilterIndex] = None) -> pd.DataFrame:
+    """Rows of df matching f, through index when given (built on this same df)."""
+    if f is None or f.is_empty():
+        return df
+    if index is not None:
+        return df.take(index.positions(f))
+    return df.loc[f.mask(df)]
@@ -0,0 +1,236 @@
+"""
+Ingestion modes beyond a single in-memory read: chunked streaming for files
+larger than memory, and incremental refresh of append-only feeds.
+"""
+from __future__ import annotations
+
+import io
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from . import profiling
+from .aggregates import DatasetSummary, extend_summary, merge_summaries, summarize_frame
+from .filters import RowFilter, select_rows
+from .io import DatasetError, check_path, dataset_version
+from .pipeline import COL, DateFormats, cow_enabled, run_pipeline
+
+DEFAULT_CHUNK_ROWS = 200_000
+
+
+def iter_prepared_chunks(path: str, apply_filter: bool, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Yield prepared chunks of at most chunk_rows raw rows each."""
+    check_path(path)
+    try:
+        reader = pd.read_csv(path, chunksize=max(int(chunk_rows), 1))
+        date_formats: DateFormats = {}
+        for chunk in reader:
+            yield run_pipeline(chunk, apply_filter, owned=True, date_formats=date_formats)
+    except DatasetError:
+        raise
+    except Exception as e:
+        raise DatasetError(f"Failed to read CSV: {e}") from e
+
+
+def summarize_stream(
+    path: str,
+    apply_filter: bool,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    row_filter: Optional[RowFilter] = None,
+) -> DatasetSummary:
+    """
+    Build the summary by streaming the CSV in bounded chunks, keeping only
+    rows that match row_filter.
+    Peak memory is one prepared chunk plus the (cell-sized) accumulators,
+    independent of file size.
+    """
+    summary: Optional[DatasetSummary] = None
+    for chunk in iter_prepared_chunks(path, apply_filter, chunk_rows):
+        part = summarize_frame(select_rows(chunk, row_filter))
+        summary = part if summary is None else merge_summaries(summary, part)
+    if summary is None:
+        summary = summarize_frame(pd.DataFrame(columns=list(COL.values())))
+    return summary
+
+
+# ---------------------------------------------------------------------------
+# Incremental refresh for append-only feeds (byte-offset watermark).
+# ---------------------------------------------------------------------------
+
+# Bytes right after the header and right before the watermark that must be
+# unchanged for an append-only refresh; any difference (or a new header, or a
+# file that did not grow) forces a rebuild.
+ANCHOR_BYTES = 4096
+
+
+@dataclass
+class IncrementalState:
+    """
+    Prepared rows and summary of a CSV up to a byte offset.
+    offset always sits just after a newline: a trailing line without one is
+    treated as still being written and picked up by a later refresh.
+    Rows are kept as chunks in file order, so an append adds a chunk instead
+    of copying every earlier row (see _append_chunk); frame joins them on use.
+    """
+
+    header: bytes
+    offset: int
+    head: bytes
+    anchor: bytes
+    mtime_ns: int
+    chunks: List[pd.DataFrame]
+    summary: DatasetSummary
+    date_formats: DateFormats = field(default_factory=dict)
+    last_refresh: Dict[str, object] = field(default_factory=dict)
+    _frame: Optional[pd.DataFrame] = field(default=None, repr=False)
+
+    @property
+    def rows(self) -> int:
+        return sum(len(c) for c in self.chunks)
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """All prepared rows as one frame, joined once per offset."""
+        frame = self._frame
+        if frame is None:
+            frame = self.chunks[0] if len(self.chunks) == 1 else concat_prepared(self.chunks)
+            self._frame = frame
+        return frame
+
+    def rows_since(self, start: int) -> pd.DataFrame:
+        """Prepared rows from row position start on (only the chunks that hold them)."""
+        tail, end = [], self.rows
+        for chunk in reversed(self.chunks):
+            if end <= start:
+                break
+            end -= len(chunk)
+            tail.append(chunk.iloc[max(start - end, 0):])
+        if not tail:
+            return self.chunks[-1].iloc[:0]
+        tail.reverse()
+        return tail[0] if len(tail) == 1 else concat_prepared(tail)
+
+
+def concat_prepared(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate prepared rows, unioning categoricals so labels stay categorical."""
+    if not frames:
+        return pd.DataFrame()
+    frames = [f.copy(deep=not cow_enabled()) for f in frames]
+    for c in frames[0].columns:
+        dtypes = [f[c].dtype for f in frames if c in f.columns]
+        if len(dtypes) != len(frames) or not all(isinstance(d, pd.CategoricalDtype) for d in dtypes):
+            continue
+        cats = dtypes[0].categories
+        for d in dtypes[1:]:
+            cats = cats.union(d.categories)
+        for f, d in zip(frames, dtypes):
+            if not cats.equals(d.categories):
+                f[c] = f[c].cat.set_categories(cats)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _append_chunk(chunks: List[pd.DataFrame], new_rows: pd.DataFrame) -> List[pd.DataFrame]:
+    """
+    Add new_rows as a chunk, then join trailing chunks while the one before
+    the last is under twice its size. Chunk sizes stay geometric, so there are
+    O(log rows) chunks and each row is copied O(log rows) times over all
+    appends, rather than every row on every append.
+    """
+    if not len(new_rows):
+        return chunks
+    chunks = chunks + [new_rows]
+    while len(chunks) > 1 and len(chunks[-2]) < 2 * len(chunks[-1]):
+        chunks[-2:] = [concat_prepared(chunks[-2:])]
+    return chunks
+
+
+def _parse_csv_bytes(
+    header: bytes, body: bytes, apply_filter: bool, date_formats: Optional[DateFormats] = None
+) -> pd.DataFrame:
+    raw = pd.read_csv(io.BytesIO(header + body))
+    return run_pipeline(raw, apply_filter, owned=True, date_formats=date_formats)
+
+
+def _full_incremental_build(path: str, apply_filter: bool) -> IncrementalState:
+    with open(path, "rb") as fh:
+        data = fh.read()
+    mtime_ns = dataset_version(path)[0]
+    header_end = data.find(b"\n") + 1
+    end = data.rfind(b"\n") + 1
+    header = data[:header_end]
+    date_formats: DateFormats = {}
+    df = _parse_csv_bytes(header, data[header_end:end], apply_filter, date_formats)
+    return IncrementalState(
+        header=header,
+        offset=end,
+        head=data[header_end:min(end, header_end + ANCHOR_BYTES)],
+        anchor=data[max(header_end, end - ANCHOR_BYTES):end],
+        mtime_ns=mtime_ns,
+        chunks=[df],
+        summary=summarize_frame(df),
+        date_formats=date_formats,
+    )
+
+
+def refresh_incremental(
+    state: Optional[IncrementalState], path: str, apply_filter: bool = True
+) -> IncrementalState:
+    """
+    Bring state up to date with the file on disk.
+    Unchanged file: nothing is read. Bytes appended after the watermark: only
+    the new complete lines are parsed, added as a chunk and merged into the
+    summary (see extend_summary for small appends).
+    Anything else (header edit, rewrite of earlier bytes, truncation): full
+    rebuild. state.last_refresh records what happened and how long it took.
+    """
+    check_path(path)
+    with profiling.stage("incremental_refresh") as rec:
+        state = _refresh_incremental(state, path, apply_filter)
+        rec.update(state.last_refresh)
+    return state
+
+
+def _refresh_incremental(
+    state: Optional[IncrementalState], path: str, apply_filter: bool
+) -> IncrementalState:
+    t0 = time.perf_counter()
+    mtime_ns, size = dataset_version(path)
+
+    if state is not None and mtime_ns == state.mtime_ns and size == state.offset:
+        state.last_refresh = {"mode": "unchanged", "rows_added": 0, "seconds": time.perf_counter() - t0}
+        return state
+
+    mode = "full"
+    if state is not None and size > state.offset:
+        with open(path, "rb") as fh:
+            header = fh.readline()
+            head = fh.read(len(state.head))
+            fh.seek(state.offset - len(state.anchor))
+            anchor = fh.read(len(state.anchor))
+            tail = fh.read(size - state.offset)
+        if header == state.header and head == state.head and anchor == state.anchor:
+            mode = "append"
+
+    try:
+        if mode == "full":
+            state = _full_incremental_build(path, apply_filter)
+            rows_added = state.summary.rows
+        else:
+            end = tail.rfind(b"\n") + 1
+            rows_added = 0
+            if end:
+                new_rows = _parse_csv_bytes(state.header, tail[:end], apply_filter, state.date_formats)
+                rows_added = len(new_rows)
+                state.chunks = _append_chunk(state.chunks, new_rows)
+                state._frame = None
+                state.summary = extend_summary(state.summary, new_rows)
+                state.anchor = (state.anchor + tail[:end])[-ANCHOR_BYTES:]
+                state.offset += end
+            state.mtime_ns = mtime_ns
+    except Exception as e:
+        raise DatasetError(f"Failed to read CSV: {e}") from e
+
+    state.last_refresh = {"mode": mode, "rows_added": rows_added, "seconds": time.perf_counter() - t0}
+    return state
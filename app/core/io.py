@@ -0,0 +1,160 @@
+"""
+Dataset loading: path checks, CSV reads, version fingerprints and the typed
+columnar sidecar. Errors are raised as DatasetError for the caller to render.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+from . import profiling
+from .pipeline import run_pipeline
+
+
+class DatasetError(ValueError):
+    """The dataset cannot be loaded (missing path, unreadable CSV, ...)."""
+
+
+def check_path(path: str) -> None:
+    """Raise DatasetError with a readable message if the dataset path is unusable."""
+    if not path:
+        raise DatasetError("Dataset path is empty.")
+
+    if not os.path.exists(path):
+        raise DatasetError(f"Dataset not found at: {path}")
+
+
+def read_csv(path: str) -> pd.DataFrame:
+    """Read the raw CSV."""
+    check_path(path)
+
+    try:
+        with profiling.stage("read_csv") as rec:
+            df = pd.read_csv(path)
+            rec["rows_out"] = len(df)
+    except Exception as e:
+        raise DatasetError(f"Failed to read CSV: {e}") from e
+
+    return df
+
+
+def dataset_version(path: str) -> Tuple[int, int]:
+    """
+    Cheap fingerprint of the file on disk: (mtime in ns, size in bytes).
+    Used as part of cache keys so an edited dataset invalidates cached results.
+    """
+    try:
+        info = os.stat(path)
+    except OSError:
+        return (0, 0)
+    return (info.st_mtime_ns, info.st_size)
+
+
+# Bump when harmonize_columns/standardize_types change their output schema,
+# so sidecars written by older code are rebuilt instead of trusted.
+SIDECAR_VERSION = 3
+_SIDECAR_META_KEY = b"seoulbike_fingerprint"
+
+
+def sidecar_path(path: str) -> str:
+    """Location of the typed columnar sidecar for a CSV (hidden file next to it)."""
+    folder, name = os.path.split(path)
+    return os.path.join(folder, f".{name}.typed.feather")
+
+
+def _csv_fingerprint(path: str) -> Dict[str, str]:
+    """Header hash + mtime/size of the CSV, stored in the sidecar metadata."""
+    mtime_ns, size = dataset_version(path)
+    with open(path, "rb") as fh:
+        header = fh.readline()
+    return {
+        "sidecar_version": str(SIDECAR_VERSION),
+        "mtime_ns": str(mtime_ns),
+        "size": str(size),
+        "header_sha1": hashlib.sha1(header).hexdigest(),
+    }
+
+
+def _read_sidecar(path: str, fingerprint: Dict[str, str]) -> Optional[pd.DataFrame]:
+    """Memory-map the sidecar if it exists and matches the CSV; None otherwise."""
+    try:
+        import pyarrow.feather as feather
+    except ImportError:
+        return None
+
+    sc_path = sidecar_path(path)
+    if not os.path.exists(sc_path):
+        return None
+
+    with profiling.stage("read_sidecar") as rec:
+        try:
+            table = feather.read_table(sc_path, memory_map=True)
+        except Exception:
+            return None
+
+        meta = table.schema.metadata or {}
+        try:
+            stored = json.loads(meta.get(_SIDECAR_META_KEY, b"{}"))
+        except ValueError:
+            return None
+        if stored != fingerprint:
+            return None
+
+        df = table.to_pandas()
+        rec["rows_out"] = len(df)
+    return df
+
+
+def _write_sidecar(path: str, df: pd.DataFrame, fingerprint: Dict[str, str]) -> None:
+    """Best effort: a read-only data folder or missing pyarrow just skips the sidecar."""
+    try:
+        import pyarrow as pa
+        import pyarrow.feather as feather
+    except ImportError:
+        return
+
+    sc_path = sidecar_path(path)
+    tmp_path = f"{sc_path}.{os.getpid()}.tmp"
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        meta = dict(table.schema.metadata or {})
+        meta[_SIDECAR_META_KEY] = json.dumps(fingerprint).encode()
+        table = table.replace_schema_metadata(meta)
+        # uncompressed so later reads can memory-map the columns directly
+        feather.write_feather(table, tmp_path, compression="uncompressed")
+        os.replace(tmp_path, sc_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_typed_dataset(path: str) -> pd.DataFrame:
+    """
+    Harmonized + typed frame for a CSV.
+    Served from the columnar sidecar when its fingerprint matches the CSV,
+    otherwise parsed from text and written back as a fresh sidecar.
+    """
+    check_path(path)
+    fingerprint = _csv_fingerprint(path)
+
+    df = _read_sidecar(path, fingerprint)
+    if df is not None:
+        return df
+
+    df = run_pipeline(
+        read_csv(path), owned=True, stages=["harmonize_columns", "standardize_types"]
+    )
+    _write_sidecar(path, df, fingerprint)
+    return df
+
+
+def prepare_frame(path: str, apply_filter: bool = True) -> pd.DataFrame:
+    """Full load -> harmonize -> types -> filter -> time features chain (uncached)."""
+    df = load_typed_dataset(path)
+    return run_pipeline(
+        df, apply_filter, owned=True, stages=["filter_functioning_days", "add_time_features"]
+    )
@@ -0,0 +1,275 @@
+"""
+Per-page KPIs and tables, computed from a DatasetSummary.
+
+Each function returns {"kpis": {...}, "tables": {...}} with plain scalars and
+pandas objects, so the Streamlit pages and the batch report share one
+implementation.
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from .aggregates import DEFAULT_WEATHER_EDGES, DatasetSummary, cube_rollup, histogram_buckets, sketch_quantiles
+from .moments import MOMENT_DIMS, correlations, moments_rollup, regression, standardized
+from .pipeline import COL, missing_columns
+from .planner import BUFFER_LEVELS, PlanGrid, build_plan_grid, required_buffer, slot_table, stockout_risk
+from .quality import QualityProfile, duplicate_slots, missing_hour_gaps, quality_summary
+from .rollups import DEFAULT_GRANULARITY, available_granularities, build_rollups
+
+PageResult = Dict[str, Dict[str, Any]]
+
+DISTRIBUTION_COLUMNS = ["count", "mean", "std", "min", "25%", "50%", "75%", "max"]
+DISTRIBUTION_QUANTILES = [0.25, 0.5, 0.75]
+
+# Box plot per hour: whiskers at the 5th/95th percentiles.
+HOURLY_QUANTILES = [0.05, 0.25, 0.5, 0.75, 0.95]
+
+HOLIDAY_LABELS = {False: "Non-Holiday", True: "Holiday"}
+
+
+def _two_labels(frame, labels):
+    """Rename a False/True axis to readable labels (as the pages always did)."""
+    return labels if len(frame) == 2 else [str(c) for c in frame]
+
+
+def overview(summary: DatasetSummary) -> PageResult:
+    cube = summary.cube
+    overall = cube_rollup(cube, []).iloc[0]
+    dates = cube[COL["date"]] if COL["date"] in cube.columns else pd.Series(dtype="datetime64[ns]")
+    return {
+        "kpis": {
+            "rows": summary.rows,
+            "columns": len(summary.columns),
+            "total_rentals": int(overall["sum"]),
+            "avg_hourly_rentals": float(overall["mean"]),
+            "max_hourly_rentals": float(overall["max"]),
+            "date_min": dates.min(),
+            "date_max": dates.max(),
+            "date_coerced": summary.date_coerced,
+        },
+        "tables": {
+            f"{k}_distribution": counts.rename("count").to_frame()
+            for k, counts in summary.label_counts.items()
+        },
+    }
+
+
+def data_quality(summary: DatasetSummary) -> PageResult:
+    """
+    Quality counts (invalid hours, NaT dates, negative counts, duplicate and
+    missing time slots) plus per-column null rates and value ranges.
+    """
+    profile = summary.quality or QualityProfile()
+    columns = profile.columns.copy()
+    columns.insert(1, "null_rate", columns["nulls"] / profile.rows if profile.rows else 0.0)
+    kpis = quality_summary(profile)
+    kpis["date_coerced"] = summary.date_coerced
+    return {
+        "kpis": kpis,
+        "tables": {
+            "columns": columns,
+            "duplicate_slots": duplicate_slots(profile),
+            "missing_hours": missing_hour_gaps(profile),
+        },
+    }
+
+
+def trend_series(rollups: Dict[str, pd.DataFrame], granularity: str = DEFAULT_GRANULARITY) -> pd.Series:
+    """Total rentals per bucket at `granularity` (the default when the data has no such level)."""
+    if granularity not in available_granularities(rollups):
+        granularity = DEFAULT_GRANULARITY
+    return rollups[granularity]["sum"].rename(COL["target"])
+
+
+def demand_patterns(
+    summary: DatasetSummary,
+    granularity: str = DEFAULT_GRANULARITY,
+    rollups: Optional[Dict[str, pd.DataFrame]] = None,
+) -> PageResult:
+    """
+    "trend" is total rentals per time bucket at `granularity` (a GRANULARITIES
+    label, falling back to the default when the data has no such level);
+    "daily" is the same at daily resolution. Pass prebuilt rollups to skip
+    build_rollups.
+    """
+    cube = summary.cube
+    hourly = cube_rollup(cube, [COL["hour"]])["mean"].rename(COL["target"])
+    slot = cube_rollup(cube, ["TimeSlot"])["mean"].rename(COL["target"]).sort_values(ascending=False)
+    rollups = build_rollups(cube) if rollups is None else rollups
+    levels = available_granularities(rollups)
+    if granularity not in levels:
+        granularity = DEFAULT_GRANULARITY
+    tables: Dict[str, Any] = {"hourly": hourly, "timeslot": slot}
+    if rollups:
+        tables["daily"] = rollups["Daily"]["sum"].rename(COL["target"]).rename_axis(COL["date"])
+        tables["trend"] = trend_series(rollups, granularity)
+    return {
+        "kpis": {
+            "peak_hour": int(hourly.idxmax()),
+            "peak_avg_rentals": float(hourly.max()),
+            "avg_rentals": float(cube_rollup(cube, [])["mean"].iloc[0]),
+            "granularity": granularity,
+            "granularities": levels,
+        },
+        "tables": tables,
+    }
+
+
+def weekday_vs_holiday(summary: DatasetSummary) -> PageResult:
+    """
+    Count/mean/std/min/max are exact (cube); percentiles come from the KLL
+    sketches, so the table is the same in every ingestion mode.
+    """
+    cube = summary.cube
+    hourly = cube_rollup(cube, [COL["hour"], "IsHoliday"])["mean"].unstack("IsHoliday").sort_index()
+    hourly.columns = _two_labels(hourly.columns, ["Non-Holiday", "Holiday"])
+
+    dist = cube_rollup(cube, ["IsHoliday"]).join(
+        sketch_quantiles(summary.sketches, ["IsHoliday"], DISTRIBUTION_QUANTILES)
+    )
+    dist = dist.reindex(columns=DISTRIBUTION_COLUMNS)
+    dist.index = _two_labels(dist.index, ["Non-Holiday", "Holiday"])
+
+    percentiles = sketch_quantiles(summary.sketches, [COL["hour"], "IsHoliday"], HOURLY_QUANTILES)
+    if len(percentiles):
+        percentiles = percentiles.rename(index=HOLIDAY_LABELS, level="IsHoliday")
+
+    tables = {"hourly_by_holiday": hourly, "distribution": dist, "hourly_percentiles": percentiles}
+    if "IsWeekend" in cube.columns:
+        weekend = cube_rollup(cube, [COL["hour"], "IsWeekend"])["mean"].unstack("IsWeekend").sort_index()
+        weekend.columns = _two_labels(weekend.columns, ["Weekday", "Weekend"])
+        tables["hourly_by_weekend"] = weekend
+    return {"kpis": {}, "tables": tables}
+
+
+def _slice_label(key: tuple, by: List[str]) -> str:
+    if not by:
+        return "All"
+    return " · ".join(HOLIDAY_LABELS.get(v, str(v)) if d == "IsHoliday" else str(v) for d, v in zip(by, key))
+
+
+def weather_and_season(
+    summary: DatasetSummary,
+    bucket_edges: Optional[Dict[str, List[float]]] = None,
+    slice_by: Optional[List[str]] = None,
+) -> PageResult:
+    """
+    Weather tables are "<key>_buckets" frames (sum, count, mean per bucket),
+    rolled up from the fine histograms with bucket_edges[key] or the default
+    edges for that variable.
+
+    weather_correlation / weather_regression / weather_std_coefficients have
+    one row per slice_by slice (default: season x holiday), all computed from
+    the per-slice cross-product matrices.
+    """
+    bucket_edges = bucket_edges or {}
+    cube = summary.cube
+    tables: Dict[str, Any] = {
+        "season": cube_rollup(cube, [COL["season"]])["mean"].rename(COL["target"]).sort_values(ascending=False),
+    }
+    if COL["date"] in cube.columns and cube[COL["date"]].notna().any():
+        tables["monthly"] = cube_rollup(cube, ["Month"])["mean"].rename(COL["target"])
+    for key, hist in summary.weather.items():
+        tables[f"{key}_buckets"] = histogram_buckets(hist, bucket_edges.get(key, DEFAULT_WEATHER_EDGES[key]))
+
+    if summary.moments:
+        by = MOMENT_DIMS if slice_by is None else slice_by
+        corr, coef, std = {}, {}, {}
+        for key, m in moments_rollup(summary.moments, by).items():
+            label = _slice_label(key, by)
+            corr[label] = correlations(m)
+            coef[label] = regression(m)
+            std[label] = standardized(coef[label], m)
+        tables["weather_correlation"] = pd.DataFrame(corr).T
+        tables["weather_regression"] = pd.DataFrame(coef).T
+        tables["weather_std_coefficients"] = pd.DataFrame(std).T
+    return {"kpis": {}, "tables": tables}
+
+
+def workday_peak_demand(summary: DatasetSummary) -> float:
+    """Average demand over workday (non-holiday, non-weekend) 07-09 hours; NaN if there are none."""
+    cube = summary.cube
+    workday = cube[cube["IsHoliday"] == False]  # noqa: E712
+    if "IsWeekend" in workday.columns:
+        workday = workday[workday["IsWeekend"] == False]  # noqa: E712
+
+    peak_cells = workday[workday[COL["hour"]].between(7, 9)]
+    return float(cube_rollup(peak_cells, [])["mean"].iloc[0]) if len(peak_cells) else float("nan")
+
+
+def buffer_plan(avg_peak: float, buffer_pct: float) -> Dict[str, float]:
+    """Recommended availability for a buffer over the average peak demand."""
+    recommended = avg_peak * (1 + buffer_pct / 100)
+    return {
+        "avg_peak_demand": avg_peak,
+        "buffer_pct": buffer_pct,
+        "recommended_availability": recommended,
+        "additional_bikes": recommended - avg_peak,
+    }
+
+
+def recommendations(summary: DatasetSummary, buffer_pct: float = 10) -> PageResult:
+    """Workday (non-holiday, non-weekend) 07-09 average demand plus a buffer."""
+    return {"kpis": buffer_plan(workday_peak_demand(summary), buffer_pct), "tables": {}}
+
+
+def scenario_plan(
+    summary: DatasetSummary,
+    service_level: float = 0.95,
+    grid: Optional[PlanGrid] = None,
+) -> PageResult:
+    """
+    Stockout risk for every slot (hour x season x day type) x BUFFER_LEVELS,
+    plus the buffer each slot needs to reach the service level. Pass a
+    prebuilt grid to skip reading quantiles from the sketches.
+    """
+    grid = grid if grid is not None else build_plan_grid(summary.sketches, summary.cube)
+    slots = pd.DataFrame({"mean": grid.mean, "hours": grid.hours}, index=grid.slots)
+    slots["required_buffer_pct"] = required_buffer(grid, service_level)
+    return {
+        "kpis": {"service_level": service_level, "slots": len(grid.slots), "buffers": len(BUFFER_LEVELS)},
+        "tables": {
+            "risk": slot_table(grid, stockout_risk(grid, BUFFER_LEVELS), BUFFER_LEVELS),
+            "slots": slots,
+        },
+    }
+
+
+PAGE_METRICS: Dict[str, Callable[..., PageResult]] = {
+    "overview": overview,
+    "data_quality": data_quality,
+    "demand_patterns": demand_patterns,
+    "weekday_vs_holiday": weekday_vs_holiday,
+    "weather_and_season": weather_and_season,
+    "recommendations": recommendations,
+    "scenario_plan": scenario_plan,
+}
+
+
+# Canonical columns (keys in COL) each page needs, as the pages check them.
+REQUIRED_COLUMNS: Dict[str, List[str]] = {
+    "overview": ["date", "target", "hour", "season", "holiday"],
+    "data_quality": [],
+    "demand_patterns": ["target", "hour", "date"],
+    "weekday_vs_holiday": ["target", "hour", "holiday", "date"],
+    "weather_and_season": ["target", "season", "date"],
+    "recommendations": ["target", "hour", "holiday", "season", "date"],
+    "scenario_plan": ["target", "hour", "holiday", "season", "date"],
+}
+
+
+def compute_report(summary: DatasetSummary) -> Dict[str, PageResult]:
+    """
+    Every page's KPIs and tables for one dataset. A page whose required
+    columns are missing gets {"kpis": {"skipped": <reason>}, "tables": {}}.
+    """
+    report = {}
+    for name, fn in PAGE_METRICS.items():
+        missing = missing_columns(summary.columns, REQUIRED_COLUMNS.get(name, []))
+        if missing:
+            report[name] = {"kpis": {"skipped": "missing columns: " + ", ".join(missing)}, "tables": {}}
+        else:
+            report[name] = fn(summary)
+    return report
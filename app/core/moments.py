@@ -0,0 +1,133 @@
+"""
+Sufficient statistics for weather-vs-demand correlation and regression.
+
+Per slice (season, holiday) we keep the cross-product matrix Z'Z of
+Z = [1, target, weather...] over complete rows. Its first row holds n and the
+column sums, so Pearson correlations and least-squares coefficients follow in
+O(k^2)-O(k^3) for k variables, without touching rows again. Matrices of
+disjoint row sets add, so slices merge across chunks, partitions and appends.
+"""
+from __future__ import annotations
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .pipeline import COL
+
+MOMENT_DIMS: List[str] = [COL["season"], "IsHoliday"]
+
+# Weather predictors, as COL keys, in display order.
+MOMENT_VARS: List[str] = ["temp", "humidity", "wind", "visibility", "dew_point", "solar", "rainfall", "snowfall"]
+
+CONST = "const"
+
+MomentMap = Dict[Tuple, pd.DataFrame]
+
+
+def group_key(key) -> Tuple:
+    """groupby key as a tuple of plain Python scalars (hashable, picklable, sortable)."""
+    return tuple(v.item() if hasattr(v, "item") else v for v in (key if isinstance(key, tuple) else (key,)))
+
+
+def build_moments(df: pd.DataFrame) -> MomentMap:
+    """
+    Z'Z per MOMENT_DIMS slice, Z = [const, target, weather columns present].
+    Keys always have one entry per MOMENT_DIMS: a missing holiday flag counts
+    as False, a missing season as "".
+    """
+    names = [COL["target"]] + [COL[k] for k in MOMENT_VARS if COL[k] in df.columns]
+    if COL["target"] not in df.columns or len(names) < 2:
+        return {}
+    keys = [
+        df[c] if c in df.columns else np.zeros(len(df), bool) if c == "IsHoliday" else np.full(len(df), "")
+        for c in MOMENT_DIMS
+    ]
+    z = np.column_stack(
+        [np.ones(len(df))] + [df[c].to_numpy(dtype="float64", na_value=np.nan) for c in names]
+    )
+    complete = ~np.isnan(z).any(axis=1)
+    labels = [CONST] + names
+    out: MomentMap = {}
+    for key, idx in df.groupby(keys, observed=True, sort=True).indices.items():
+        zg = z[idx[complete[idx]]]
+        out[group_key(key)] = pd.DataFrame(zg.T @ zg, index=labels, columns=labels)
+    return out
+
+
+def _add(a: pd.DataFrame, b: pd.DataFrame) -> pd.DataFrame:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if a.index.equals(b.index):
+        return a + b
+    # differing column sets: only variables both sides have stay comparable
+    common = a.index.intersection(b.index, sort=False)
+    return a.loc[common, common] + b.loc[common, common]
+
+
+def merge_moment_maps(a: MomentMap, b: MomentMap) -> MomentMap:
+    return {key: _add(a.get(key), b.get(key)) for key in sorted(set(a) | set(b))}
+
+
+def moments_rollup(moments: MomentMap, by: List[str]) -> MomentMap:
+    """Add slice matrices up to the `by` subset of MOMENT_DIMS (by=[] is the whole dataset)."""
+    pos = [MOMENT_DIMS.index(b) for b in by]
+    out: MomentMap = {}
+    for key in sorted(moments):
+        k = tuple(key[i] for i in pos)
+        out[k] = _add(out.get(k), moments[key])
+    return out
+
+
+def _centered(m: pd.DataFrame) -> Tuple[float, List[str], np.ndarray]:
+    """n, variable names and the centered cross-product matrix (n * covariance)."""
+    z = m.to_numpy()
+    n = float(z[0, 0])
+    names = list(m.index[1:])
+    if not n:
+        return n, names, np.full((len(names), len(names)), np.nan)
+    s = z[0, 1:]
+    return n, names, z[1:, 1:] - np.outer(s, s) / n
+
+
+def correlations(m: pd.DataFrame) -> pd.Series:
+    """Pearson correlation of the target with each weather variable (NaN if constant)."""
+    n, names, c = _centered(m)
+    t = names.index(COL["target"])
+    denom = np.sqrt(np.clip(np.diag(c) * c[t, t], 0, None))
+    r = c[t] / np.where(denom > 0, denom, np.nan)
+    return pd.Series(np.delete(r, t), index=names[:t] + names[t + 1:])
+
+
+def regression(m: pd.DataFrame) -> pd.Series:
+    """
+    Least squares target ~ const + weather: raw coefficients, plus r2 and n.
+    Variables that are constant within the slice get NaN and are left out.
+    """
+    n, names, c = _centered(m)
+    t = names.index(COL["target"])
+    xs = [i for i in range(len(names)) if i != t]
+    out = pd.Series(np.nan, index=[CONST] + [names[i] for i in xs] + ["r2", "n"], dtype="float64")
+    out["n"] = n
+    if n < 2:
+        return out
+    keep = [i for i in xs if c[i, i] > 1e-9 * n]
+    if keep and n > len(keep) + 1:
+        cxy = c[keep, t]
+        beta = np.linalg.lstsq(c[np.ix_(keep, keep)], cxy, rcond=None)[0]
+        out[[names[i] for i in keep]] = beta
+        sums = m.to_numpy()[0, 1:]
+        out[CONST] = (sums[t] - sums[keep] @ beta) / n
+        out["r2"] = float(beta @ cxy / c[t, t]) if c[t, t] > 0 else np.nan
+    return out
+
+
+def standardized(coef: pd.Series, m: pd.DataFrame) -> pd.Series:
+    """Coefficients in standard deviations of the target per standard deviation of x."""
+    n, names, c = _centered(m)
+    sd = pd.Series(np.sqrt(np.clip(np.diag(c), 0, None)), index=names)
+    xs = [v for v in names if v != COL["target"]]
+    return coef[xs] * sd[xs] / sd[COL["target"]]
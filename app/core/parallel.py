@@ -0,0 +1,139 @@
+"""
+Parallel ingestion: split the input into partitions (files of a partitioned
+dataset, and newline-aligned byte ranges within each file), prepare and
+summarize them in a process pool, and merge the partial summaries in order.
+"""
+from __future__ import annotations
+
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+from . import profiling
+from .aggregates import DatasetSummary, merge_summaries, summarize_frame
+from .filters import RowFilter, select_rows
+from .io import DatasetError, check_path, dataset_version
+from .ingest import _parse_csv_bytes
+from .pipeline import COL
+
+# (file, first byte, end byte) of one partition; bytes exclude the header line.
+Partition = Tuple[str, int, int]
+
+# Partitions per worker: a few more than one evens out uneven partitions
+# (e.g. stations of different sizes) without much merge overhead.
+PARTITIONS_PER_WORKER = 2
+
+# Byte ranges smaller than this are not split further.
+MIN_PARTITION_BYTES = 1 << 20
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def resolve_partitions(path: str) -> List[str]:
+    """
+    CSV files behind a dataset path: the file itself, every *.csv in a
+    directory, or every match of a glob pattern (sorted, so merge order and
+    the preview are stable).
+    """
+    if glob.has_magic(path):
+        files = sorted(p for p in glob.glob(path) if os.path.isfile(p))
+    elif os.path.isdir(path):
+        files = sorted(glob.glob(os.path.join(path, "*.csv")))
+    else:
+        check_path(path)
+        return [path]
+    if not files:
+        raise DatasetError(f"No CSV files found at: {path}")
+    return files
+
+
+def partitions_version(path: str) -> Tuple[Tuple[int, int], ...]:
+    """dataset_version of every file behind path, for cache keys."""
+    try:
+        files = resolve_partitions(path)
+    except DatasetError:
+        return ()
+    return tuple(dataset_version(p) for p in files)
+
+
+def _split_file(path: str, parts: int) -> List[Partition]:
+    """Split a CSV body into up to `parts` byte ranges ending on newlines."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as fh:
+        start = len(fh.readline())
+        parts = max(1, min(parts, (size - start) // MIN_PARTITION_BYTES))
+        step = (size - start) // parts
+        bounds = [start]
+        for i in range(1, parts):
+            fh.seek(max(start + i * step, bounds[-1]))
+            fh.readline()  # move to the start of the next full line
+            bounds.append(min(fh.tell(), size))
+    bounds.append(size)
+    return [(path, a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+
+def plan_partitions(files: List[str], workers: int) -> List[Partition]:
+    """Spread about workers * PARTITIONS_PER_WORKER partitions over files by size."""
+    sizes = [max(os.path.getsize(p), 1) for p in files]
+    target = max(1, workers) * PARTITIONS_PER_WORKER
+    total = sum(sizes)
+    plan: List[Partition] = []
+    for path, size in zip(files, sizes):
+        plan.extend(_split_file(path, max(1, round(target * size / total))))
+    return plan
+
+
+def summarize_partition(
+    part: Partition, apply_filter: bool, row_filter: Optional[RowFilter] = None
+) -> DatasetSummary:
+    """Prepare, filter and summarize one partition (runs in a worker process)."""
+    path, start, end = part
+    with open(path, "rb") as fh:
+        header = fh.readline()
+        fh.seek(start)
+        body = fh.read(end - start)
+    return summarize_frame(select_rows(_parse_csv_bytes(header, body, apply_filter), row_filter))
+
+
+def summarize_parallel(
+    path: str,
+    apply_filter: bool = True,
+    workers: Optional[int] = None,
+    row_filter: Optional[RowFilter] = None,
+) -> DatasetSummary:
+    """
+    Summary of a dataset (one CSV, a directory of CSVs or a glob pattern)
+    computed over partitions in a process pool. The merged result equals
+    summarize_frame over the whole prepared dataset (rows matching
+    row_filter); workers <= 1 runs the same partitions in this process.
+    """
+    workers = default_workers() if workers is None else max(1, int(workers))
+    files = resolve_partitions(path)
+    with profiling.stage("parallel_summary") as rec:
+        plan = plan_partitions(files, workers)
+        rec.update(files=len(files), partitions=len(plan), workers=workers)
+        try:
+            if workers == 1 or len(plan) == 1:
+                parts = [summarize_partition(p, apply_filter, row_filter) for p in plan]
+            else:
+                with ProcessPoolExecutor(max_workers=min(workers, len(plan))) as pool:
+                    parts = list(pool.map(
+                        summarize_partition, plan, [apply_filter] * len(plan), [row_filter] * len(plan)
+                    ))
+        except DatasetError:
+            raise
+        except Exception as e:
+            raise DatasetError(f"Failed to read CSV: {e}") from e
+
+        summary: Optional[DatasetSummary] = None
+        for part in parts:
+            summary = part if summary is None else merge_summaries(summary, part)
+        if summary is None:
+            summary = summarize_frame(pd.DataFrame(columns=list(COL.values())))
+        rec["rows_out"] = summary.rows
+    return summary
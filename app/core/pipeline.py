@@ -0,0 +1,505 @@
+"""
+Column harmonization, type standardization and feature derivation.
+
+Pure pandas/NumPy: nothing here imports Streamlit, so the same transforms
+run in the app, in batch reports and in benchmarks.
+"""
+from __future__ import annotations
+
+import functools
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from . import profiling
+
+
+# Canonical column keys used throughout the app
+# You can adjust these canonical names, but keep the keys stable.
+COL: Dict[str, str] = {
+    "date": "Date",
+    "target": "Rented Bike Count",
+    "hour": "Hour",
+    "season": "Seasons",
+    "holiday": "Holiday",
+    "functioning_day": "Functioning Day",
+    # optional / sometimes present:
+    "temp": "Temperature(°C)",
+    "humidity": "Humidity(%)",
+    "wind": "Wind speed (m/s)",
+    "visibility": "Visibility (10m)",
+    "dew_point": "Dew point temperature(°C)",
+    "solar": "Solar Radiation (MJ/m2)",
+    "rainfall": "Rainfall(mm)",
+    "snowfall": "Snowfall (cm)",
+}
+
+
+# Copy-on-Write makes shallow copies and column assignment safe to share.
+# It is always on from pandas 3. On pandas 2 it is an opt-in global option
+# that importing core leaves alone: the Streamlit app switches it on
+# (utils.py), other callers get deep copies unless they enabled it.
+_PANDAS_MAJOR = int(pd.__version__.split(".")[0])
+
+
+def cow_enabled() -> bool:
+    """True when shallow copies are copy-on-write (pandas 3, or opted in on pandas 2)."""
+    return _PANDAS_MAJOR >= 3 or (_PANDAS_MAJOR == 2 and pd.get_option("mode.copy_on_write") is True)
+
+
+def _own(df: pd.DataFrame, copy: bool) -> pd.DataFrame:
+    """
+    Return a frame the caller may mutate.
+    copy=False means the caller already owns df; otherwise take a copy that
+    is lazy (copy-on-write) where pandas supports it.
+    """
+    if not copy:
+        return df
+    return df.copy(deep=not cow_enabled())
+
+
+def _norm(s: str) -> str:
+    """Normalize a column name for fuzzy matching."""
+    return (
+        str(s)
+        .strip()
+        .lower()
+        .replace("(", "")
+        .replace(")", "")
+        .replace("°", "")
+        .replace("%", "")
+        .replace("/", " ")
+        .replace("-", " ")
+        .replace("__", "_")
+        .replace("  ", " ")
+        .replace("_", " ")
+        .replace(".", " ")
+        .replace(",", " ")
+        .replace(":", " ")
+        .strip()
+    )
+
+
+def _build_normalized_lookup(columns: List[str]) -> Dict[str, str]:
+    """Map normalized -> original column name."""
+    lookup: Dict[str, str] = {}
+    for c in columns:
+        lookup[_norm(c)] = c
+    return lookup
+
+
+def harmonize_columns(df: pd.DataFrame, copy: bool = True) -> pd.DataFrame:
+    """
+    Align common variations of column names to canonical names in COL.
+    This prevents KPI 'N/A' caused by mismatched column labels.
+    copy=False renames the caller's frame in place (see run_pipeline).
+    """
+    df = _own(df, copy)
+
+    # strip whitespace in columns
+    df.columns = [str(c).strip() for c in df.columns]
+    lookup = _build_normalized_lookup(list(df.columns))
+
+    # Define candidates for each canonical field (normalized forms)
+    candidates = {
+        "date": [
+            "date",
+            "datetime",
+            "timestamp",
+        ],
+        "target": [
+            "rented bike count",
+            "rentedbikecount",
+            "rented_bike_count",
+            "rent bike count",
+            "rentbikecount",
+            "bike count",
+            "bike rental count",
+            "rental count",
+            "count",
+        ],
+        "hour": ["hour", "hr"],
+        "season": ["seasons", "season"],
+        "holiday": ["holiday", "is holiday", "is_holiday"],
+        "functioning_day": ["functioning day", "functioningday", "operating day", "operational day"],
+        "temp": ["temperature c", "temperature", "temp c", "temp"],
+        "humidity": ["humidity", "humidity percent"],
+        "wind": ["wind speed m s", "wind speed", "windspeed"],
+        "visibility": ["visibility 10m", "visibility"],
+        "dew_point": ["dew point temperature c", "dew point temperature", "dew point"],
+        "solar": ["solar radiation mj m2", "solar radiation"],
+        "rainfall": ["rainfall mm", "rainfall"],
+        "snowfall": ["snowfall cm", "snowfall"],
+    }
+
+    rename_map: Dict[str, str] = {}
+
+    for key, canon in COL.items():
+        if canon in df.columns:
+            continue  # already canonical
+
+        # try candidate matches
+        for cand in candidates.get(key, []):
+            cand_norm = _norm(cand)
+            if cand_norm in lookup:
+                rename_map[lookup[cand_norm]] = canon
+                break
+
+        # special handling: some datasets use underscores heavily
+        if canon not in df.columns:
+            # try exact normalized match of the canonical name itself
+            canon_norm = _norm(canon)
+            if canon_norm in lookup and lookup[canon_norm] != canon:
+                rename_map[lookup[canon_norm]] = canon
+
+    if rename_map:
+        df.rename(columns=rename_map, inplace=True)
+
+    return df
+
+
+# Declared compact schema, keyed like COL.
+# "integer" downcasts to the narrowest int that holds the data (int8 for Hour,
+# int16 for hourly counts) and falls back to float32 when values are missing
+# or fractional; labels become categoricals.
+SCHEMA: Dict[str, str] = {
+    "target": "integer",
+    "hour": "integer",
+    "temp": "float32",
+    "humidity": "float32",
+    "wind": "float32",
+    "visibility": "float32",
+    "dew_point": "float32",
+    "solar": "float32",
+    "rainfall": "float32",
+    "snowfall": "float32",
+    "season": "category",
+    "holiday": "category",
+    "functioning_day": "category",
+}
+
+HOLIDAY_VALUES = {"holiday", "yes", "true", "1", "y"}
+FUNCTIONING_VALUES = {"yes", "y", "true", "1"}
+
+
+def _to_compact_numeric(s: pd.Series, kind: str) -> pd.Series:
+    values = pd.to_numeric(s, errors="coerce")
+    if kind == "integer":
+        arr = values.to_numpy(dtype="float64", na_value=np.nan)
+        if len(arr) and not np.isnan(arr).any() and np.array_equal(arr, np.floor(arr)):
+            return pd.to_numeric(values, downcast="integer")
+        return values.astype("float32")
+    return values.astype(kind)
+
+
+def _to_label_category(s: pd.Series) -> pd.Series:
+    """Whitespace-stripped categorical; only the distinct labels get stripped."""
+    codes, uniques = pd.factorize(s, use_na_sentinel=True)
+    stripped = pd.Index(np.asarray(uniques, dtype=object).astype(str)).str.strip()
+    label_codes, categories = pd.factorize(stripped, sort=True)
+    new_codes = np.where(codes >= 0, label_codes[codes], -1)
+    return pd.Series(
+        pd.Categorical.from_codes(new_codes, categories=categories), index=s.index, name=s.name
+    )
+
+
+def _label_flag(s: pd.Series, values: set) -> np.ndarray:
+    """Boolean array: label (case/space-insensitive) is one of values."""
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        hit = s.cat.categories.astype(str).str.strip().str.lower().isin(values)
+        codes = s.cat.codes.to_numpy()
+        return np.where(codes >= 0, np.asarray(hit)[codes], False)
+    return s.astype(str).str.strip().str.lower().isin(values).to_numpy()
+
+
+# Candidate Date formats, tried in order (day-first before month-first, like
+# the dayfirst=True fallback).
+DATE_FORMATS: List[str] = [
+    "%Y-%m-%d",
+    "%d/%m/%Y",
+    "%d-%m-%Y",
+    "%d.%m.%Y",
+    "%Y/%m/%d",
+    "%m/%d/%Y",
+    "%Y%m%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%dT%H:%M:%S",
+    "%d/%m/%Y %H:%M",
+    "%d/%m/%Y %H:%M:%S",
+]
+_DATE_SAMPLE_SIZE = 64
+
+# Date format per digit-shape (e.g. "9999-99-99" -> "%Y-%m-%d") for one
+# dataset. Callers that parse one dataset in pieces (stream chunks,
+# incremental appends) keep one across calls so the pieces agree; it is never
+# shared between datasets.
+DateFormats = Dict[str, Optional[str]]
+
+# Shapes kept per DateFormats; junk values can create many.
+_MAX_SHAPES = 1024
+
+
+def _sniff_date_format(sample: pd.Series) -> Optional[str]:
+    """First DATE_FORMATS entry that parses the whole sample (None if none does)."""
+    for fmt in DATE_FORMATS:
+        if pd.to_datetime(sample, format=fmt, errors="coerce").notna().all():
+            return fmt
+    return None
+
+
+def _sample(group: pd.Series) -> pd.Series:
+    step = max(len(group) // _DATE_SAMPLE_SIZE, 1)
+    return group.iloc[::step].iloc[:_DATE_SAMPLE_SIZE]
+
+
+def _parse_shape(group: pd.Series, shape: str, formats: DateFormats) -> pd.Series:
+    """
+    Parse strings of one shape with the dataset's format for it, sniffing
+    one the first time. Values that format would coerce get a second chance:
+    re-sniff on them (and switch the dataset's format if the new one parses
+    the whole group), else dayfirst inference for just those values.
+    """
+    if shape not in formats:
+        if len(formats) >= _MAX_SHAPES:
+            formats.clear()
+        formats[shape] = _sniff_date_format(_sample(group))
+    fmt = formats[shape]
+    if fmt is None:
+        return pd.to_datetime(group, errors="coerce", dayfirst=True, format="mixed")
+
+    values = pd.to_datetime(group, format=fmt, errors="coerce")
+    bad = values.isna().to_numpy()
+    if not bad.any():
+        return values
+    refit = _sniff_date_format(pd.concat([_sample(group[bad]), _sample(group)]))
+    if refit is not None and refit != fmt:
+        retry = pd.to_datetime(group, format=refit, errors="coerce")
+        if retry.notna().all():
+            formats[shape] = refit
+            return retry
+    values[bad] = pd.to_datetime(group[bad], errors="coerce", dayfirst=True, format="mixed")
+    return values
+
+
+def parse_dates(s: pd.Series, formats: Optional[DateFormats] = None) -> Tuple[pd.Series, int]:
+    """
+    Parse a Date column, returning (datetimes, number of values coerced to NaT).
+    Only the distinct strings are parsed, grouped by digit-shape with a sniffed
+    explicit format per shape, and mapped back through the factorized codes.
+    Shapes no format fits, and values the sniffed format rejects, fall back to
+    dayfirst inference. Pass the same formats for every piece of one dataset
+    to keep their formats consistent; by default each call sniffs afresh.
+    """
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s, 0
+    formats = {} if formats is None else formats
+
+    codes, uniques = pd.factorize(s, use_na_sentinel=True)
+    uniques = pd.Series(np.asarray(uniques, dtype=object).astype(str)).str.strip()
+    shapes = uniques.str.replace(r"\d", "9", regex=True)
+
+    parsed = pd.Series(pd.NaT, index=uniques.index, dtype="datetime64[ns]")
+    for shape, group in uniques.groupby(shapes, sort=False):
+        parsed[group.index] = _parse_shape(group, shape, formats).astype("datetime64[ns]")
+
+    # code -1 (missing input) picks the trailing NaT
+    lookup = np.append(parsed.to_numpy(dtype="datetime64[ns]"), np.datetime64("NaT", "ns"))
+    out = pd.Series(lookup[codes], index=s.index, name=s.name)
+    coerced = int(parsed.isna().to_numpy()[codes[codes >= 0]].sum())
+    return out, coerced
+
+
+def standardize_types(
+    df: pd.DataFrame, copy: bool = True, date_formats: Optional[DateFormats] = None
+) -> pd.DataFrame:
+    """
+    Standardize datatypes (date parsing, numerics, categoricals) to SCHEMA
+    and add the boolean IsHoliday flag. date_formats: see parse_dates.
+    Safe even if some optional columns are missing.
+    """
+    df = _own(df, copy)
+
+    # Date (count of unparseable values is kept in df.attrs["date_coerced"])
+    if COL["date"] in df.columns:
+        df[COL["date"]], df.attrs["date_coerced"] = parse_dates(df[COL["date"]], date_formats)
+
+    for key, kind in SCHEMA.items():
+        c = COL[key]
+        if c not in df.columns:
+            continue
+        if kind == "category":
+            df[c] = _to_label_category(df[c])
+        else:
+            df[c] = _to_compact_numeric(df[c], kind)
+
+    if COL["holiday"] in df.columns:
+        df["IsHoliday"] = _label_flag(df[COL["holiday"]], HOLIDAY_VALUES)
+
+    return df
+
+
+def filter_functioning_days(df: pd.DataFrame, copy: bool = True) -> pd.DataFrame:
+    """Filter Functioning Day == Yes (robust to Yes/No variants)."""
+    df = _own(df, copy)
+    col = COL["functioning_day"]
+    if col not in df.columns:
+        return df
+
+    keep = _label_flag(df[col], FUNCTIONING_VALUES)
+    if keep.all():
+        return df  # nothing to drop: hand back the same (owned) frame
+    return df.loc[keep]
+
+
+def memory_footprint(df: pd.DataFrame) -> pd.DataFrame:
+    """Per-column dtype and deep memory usage (bytes), largest first, plus a total row."""
+    usage = df.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({"dtype": df.dtypes.astype(str), "bytes": usage})
+    report = report.sort_values("bytes", ascending=False)
+    report.loc["(total)"] = ["", int(usage.sum())]
+    return report
+
+
+# TimeSlot labels, in chart order; hour -> slot is a 24-entry lookup table.
+TIMESLOT_LABELS: List[str] = [
+    "Early Morning (00-06)",
+    "Morning Peak (07-09)",
+    "Midday (10-16)",
+    "Evening Peak (17-19)",
+    "Night (20-23)",
+    "Unknown",
+]
+_HOUR_TO_SLOT = np.array([0] * 7 + [1] * 3 + [2] * 7 + [3] * 3 + [4] * 4, dtype=np.int8)
+_UNKNOWN_SLOT = TIMESLOT_LABELS.index("Unknown")
+
+DAY_NAMES: List[str] = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def timeslot_codes(hours: np.ndarray) -> np.ndarray:
+    """Vectorized hour -> index into TIMESLOT_LABELS (NaN/out of range -> Unknown)."""
+    h = np.nan_to_num(np.asarray(hours, dtype="float64"), nan=-1.0).astype(np.int64)
+    codes = np.full(h.shape, _UNKNOWN_SLOT, dtype=np.int8)
+    valid = (h >= 0) & (h <= 23)
+    codes[valid] = _HOUR_TO_SLOT[h[valid]]
+    return codes
+
+
+def add_time_features(df: pd.DataFrame, copy: bool = True) -> pd.DataFrame:
+    """
+    Add Month, DayOfWeek, IsWeekend, TimeSlot.
+    DayOfWeek and TimeSlot are categoricals built from integer codes
+    (weekday number, hour lookup table) rather than per-row strings.
+    """
+    df = _own(df, copy)
+
+    if COL["date"] in df.columns:
+        dt = df[COL["date"]]
+        weekday = dt.dt.weekday.fillna(-1).to_numpy(dtype=np.int8)
+        df["Month"] = _to_compact_numeric(dt.dt.month, "integer")
+        df["DayOfWeek"] = pd.Categorical.from_codes(weekday, categories=DAY_NAMES)
+        df["IsWeekend"] = weekday >= 5
+    else:
+        # fallback columns if date not present
+        df["Month"] = pd.NA
+        df["DayOfWeek"] = pd.NA
+        df["IsWeekend"] = pd.NA
+
+    if COL["hour"] in df.columns:
+        codes = timeslot_codes(df[COL["hour"]].to_numpy(dtype="float64", na_value=np.nan))
+    else:
+        codes = np.full(len(df), _UNKNOWN_SLOT, dtype=np.int8)
+    df["TimeSlot"] = pd.Categorical.from_codes(codes, categories=TIMESLOT_LABELS)
+
+    return df
+
+
+# Stage hook: called with (stage name, stats) after each pipeline stage.
+StageHook = Callable[[str, Dict[str, int]], None]
+
+PIPELINE_STAGES: Dict[str, Callable[..., pd.DataFrame]] = {
+    "harmonize_columns": harmonize_columns,
+    "standardize_types": standardize_types,
+    "filter_functioning_days": filter_functioning_days,
+    "add_time_features": add_time_features,
+}
+
+
+def run_pipeline(
+    df: pd.DataFrame,
+    apply_filter: bool = True,
+    owned: bool = False,
+    stages: Optional[List[str]] = None,
+    on_stage: Optional[StageHook] = None,
+    date_formats: Optional[DateFormats] = None,
+) -> pd.DataFrame:
+    """
+    Run the transform chain without the per-stage defensive copies.
+    date_formats is handed to standardize_types (see parse_dates).
+
+    owned=True hands df over to the pipeline, which then mutates it in place;
+    otherwise one (copy-on-write) copy is taken up front instead of one per
+    stage. The filter stage returns df itself when no rows are dropped.
+
+    on_stage receives, per stage: rows, peak_bytes (highest allocation above
+    the stage's starting point), retained_bytes (net allocation still alive
+    when the stage ends) and frame_bytes (deep size of the output frame).
+    Allocation tracking uses tracemalloc and is only switched on when a hook
+    is given; Arrow-backed columns allocate outside of it.
+    """
+    df = _own(df, not owned)
+    names = list(PIPELINE_STAGES) if stages is None else list(stages)
+    if not apply_filter and "filter_functioning_days" in names:
+        names.remove("filter_functioning_days")
+
+    started_tracing = False
+    if on_stage is not None and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        started_tracing = True
+
+    try:
+        for name in names:
+            fn = PIPELINE_STAGES[name]
+            if name == "standardize_types" and date_formats is not None:
+                fn = functools.partial(fn, date_formats=date_formats)
+            if on_stage is None:
+                with profiling.stage(name, rows_in=len(df)) as rec:
+                    df = fn(df, copy=False)
+                    rec["rows_out"] = len(df)
+                continue
+
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            with profiling.stage(name, rows_in=len(df)) as rec:
+                df = fn(df, copy=False)
+                rec["rows_out"] = len(df)
+            current, peak = tracemalloc.get_traced_memory()
+            on_stage(name, {
+                "rows": int(len(df)),
+                "peak_bytes": int(peak - base),
+                "retained_bytes": int(current - base),
+                "frame_bytes": int(df.memory_usage(deep=True).sum()),
+            })
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+
+    return df
+
+
+def missing_columns(columns: List[str], required_keys: List[str]) -> List[str]:
+    """
+    Required canonical columns (keys in COL, e.g. ["date", "target"]) that
+    are absent from columns, formatted as "key -> 'Canonical Name'".
+    """
+    missing = []
+    for k in required_keys:
+        if k not in COL:
+            missing.append(f"(unknown key) {k}")
+            continue
+        canon = COL[k]
+        if canon not in columns:
+            missing.append(f"{k} -> '{canon}'")
+    return missing
@@ -0,0 +1,117 @@
+"""
+Fleet planning scenarios from the empirical demand distribution.
+
+For every slot (hour x season x day type) the target's quantiles are read
+once from the KLL sketches into one array Q[slot, level]. A buffer scenario
+stocks mean x (1 + buffer) bikes in a slot. Its stockout risk is the share
+of demand quantiles above that capacity, i.e. P(demand > capacity). A whole
+grid of buffers is evaluated in one broadcast comparison against Q.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from .aggregates import SKETCH_DIMS, SketchMap, cube_rollup
+from .pipeline import COL
+from .sketch import merge_sketches
+
+DAY_TYPES: List[str] = ["Workday", "Weekend", "Holiday"]
+ALL_SEASONS = "All seasons"
+
+# Quantile levels per slot: risk is resolved to 1 / (len + 1) = 0.5%.
+PLAN_LEVELS = np.arange(1, 200) / 200
+
+# Buffer scenarios (% above the slot mean).
+BUFFER_LEVELS = np.arange(0, 155, 5)
+
+_SLOT_DIMS = [COL["hour"], "Season", "DayType"]
+
+
+def day_type(holiday: bool, weekend: bool) -> str:
+    """Holiday wins over weekend."""
+    return DAY_TYPES[2] if holiday else DAY_TYPES[1] if weekend else DAY_TYPES[0]
+
+
+@dataclass
+class PlanGrid:
+    """Per-slot demand quantiles and means; slots is the (Hour, Season, DayType) index."""
+
+    slots: pd.MultiIndex
+    quantiles: np.ndarray  # [slot, PLAN_LEVELS]
+    mean: np.ndarray  # [slot]
+    hours: np.ndarray  # [slot] observed hours behind each slot
+
+
+def build_plan_grid(sketches: SketchMap, cube: pd.DataFrame) -> PlanGrid:
+    """
+    Merge the sketch cells into slots (each season plus ALL_SEASONS) and read
+    PLAN_LEVELS quantiles from each; means and hour counts come from the cube.
+    """
+    hour, holiday, weekend, season = (SKETCH_DIMS.index(d) for d in [COL["hour"], "IsHoliday", "IsWeekend", COL["season"]])
+    groups = {}
+    for key in sorted(sketches):
+        dt = day_type(key[holiday], key[weekend])
+        for s in (str(key[season]), ALL_SEASONS):
+            groups.setdefault((int(key[hour]), s, dt), []).append(sketches[key])
+    merged = {slot: merge_sketches(*group) for slot, group in groups.items()}
+    if not merged:
+        return PlanGrid(pd.MultiIndex.from_tuples([], names=_SLOT_DIMS), np.empty((0, len(PLAN_LEVELS))),
+                        np.empty(0), np.empty(0))
+    order = sorted(merged)
+    position = {slot: i for i, slot in enumerate(order)}
+    quantiles = np.vstack([merged[slot].quantile(PLAN_LEVELS) for slot in order])
+
+    # exact means and hour counts per slot, from the cube cells
+    sums = np.zeros(len(order))
+    counts = np.zeros(len(order))
+    by = [d for d in [COL["hour"], COL["season"], "IsHoliday", "IsWeekend"] if d in cube.columns]
+    cells = cube_rollup(cube, by)
+    for key, total, n in zip(cells.index, cells["sum"], cells["count"]):
+        values = dict(zip(by, key if isinstance(key, tuple) else (key,)))
+        dt = day_type(bool(values.get("IsHoliday", False)), bool(values.get("IsWeekend", False)))
+        for s in (str(values.get(COL["season"], "")), ALL_SEASONS):
+            i = position.get((int(values[COL["hour"]]), s, dt))
+            if i is not None:
+                sums[i] += total
+                counts[i] += n
+    return PlanGrid(
+        slots=pd.MultiIndex.from_tuples(order, names=_SLOT_DIMS),
+        quantiles=quantiles,
+        mean=sums / np.where(counts > 0, counts, np.nan),
+        hours=counts,
+    )
+
+
+def stockout_risk(grid: PlanGrid, buffers: np.ndarray = BUFFER_LEVELS) -> np.ndarray:
+    """
+    P(demand > mean x (1 + buffer/100)) for every slot x buffer, as one array
+    operation: [slot, buffer].
+    """
+    capacity = grid.mean[:, None] * (1 + np.asarray(buffers, dtype="float64")[None, :] / 100)
+    covered = (grid.quantiles[:, None, :] <= capacity[:, :, None]).sum(axis=2)
+    return 1 - covered / (len(PLAN_LEVELS) + 1)
+
+
+def required_buffer(grid: PlanGrid, service_level: float) -> np.ndarray:
+    """Buffer (% over the mean) that covers demand with the given probability, per slot."""
+    level = int(np.clip(np.ceil(service_level * (len(PLAN_LEVELS) + 1)) - 1, 0, len(PLAN_LEVELS) - 1))
+    return (grid.quantiles[:, level] / grid.mean - 1) * 100
+
+
+def slot_table(grid: PlanGrid, values: np.ndarray, columns) -> pd.DataFrame:
+    """Wrap a [slot, ...] array as a frame on the slot index."""
+    return pd.DataFrame(np.asarray(values).reshape(len(grid.slots), -1), index=grid.slots, columns=columns)
+
+
+def pivot_slots(frame: pd.DataFrame, day: str, column) -> pd.DataFrame:
+    """Hour x Season view of one column for one day type."""
+    return frame.xs(day, level="DayType")[column].unstack("Season")
+
+
+def select_slots(frame: pd.DataFrame, season: str, day: str) -> pd.DataFrame:
+    """Hour x columns view for one season and day type."""
+    return frame.xs((season, day), level=("Season", "DayType"))
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Deque, Dict, Iterator, List, Optional
+
+# Lightweight per-stage profiler for the data pipeline and page compute blocks.
+# Records wall time, rows in/out and resident-memory delta per stage per rerun.
+# Disabled by default; when disabled, stage() hands back a shared no-op record
+# and costs one flag check.
+#
+# The enabled flag and the current run are context variables: Streamlit runs
+# each session's rerun in its own thread, so one session's toggle or rerun
+# does not leak into another's. Records from all sessions share one bounded
+# buffer and carry the session id given to start_run, so views can filter on it.
+
+MAX_RECORDS = 5000
+
+_NO_RUN: Dict[str, str] = {"id": "", "page": "", "session": ""}
+
+_enabled: ContextVar[bool] = ContextVar("profiling_enabled", default=False)
+_run: ContextVar[Dict[str, str]] = ContextVar("profiling_run", default=_NO_RUN)
+_records: Deque[Dict[str, object]] = deque(maxlen=MAX_RECORDS)
+
+
+class _NoopRecord(dict):
+    """Shared record handed out while disabled; writes are dropped."""
+
+    def __setitem__(self, key, value) -> None:
+        pass
+
+    def update(self, *args, **kwargs) -> None:
+        pass
+
+
+_NOOP: Dict[str, object] = _NoopRecord()
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+def _rss_bytes() -> int:
+    """Current resident set size (Linux /proc), falling back to peak RSS."""
+    try:
+        with open("/proc/self/statm", "rb") as fh:
+            return int(fh.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        try:
+            import resource
+        except ImportError:
+            return 0
+        # ru_maxrss is KiB on Linux, bytes on macOS; only deltas are used
+        return int(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss) * 1024
+
+
+def enable(on: bool = True) -> None:
+    """Switch profiling on or off for the current context (thread / rerun)."""
+    _enabled.set(bool(on))
+
+
+def is_enabled() -> bool:
+    return _enabled.get()
+
+
+def start_run(page: str, session: str = "") -> None:
+    """Mark the start of one page rerun; following stages are grouped under it."""
+    if _enabled.get():
+        _run.set({"id": uuid.uuid4().hex[:12], "page": page, "session": session})
+
+
+@contextmanager
+def stage(name: str, rows_in: Optional[int] = None) -> Iterator[Dict[str, object]]:
+    """
+    Time a block. The yielded dict can be given "rows_out" (or any extra
+    field) by the caller before the block ends.
+    """
+    if not _enabled.get():
+        yield _NOOP
+        return
+
+    rec: Dict[str, object] = {"rows_in": rows_in, "rows_out": None}
+    rss0 = _rss_bytes()
+    t0 = time.perf_counter()
+    try:
+        yield rec
+    finally:
+        wall = time.perf_counter() - t0
+        run = _run.get()
+        rec.update({
+            "session": run["session"],
+            "run": run["id"],
+            "page": run["page"],
+            "stage": name,
+            "wall_ms": round(wall * 1000, 3),
+            "rss_delta_bytes": _rss_bytes() - rss0,
+            "ts": time.time(),
+        })
+        _records.append(rec)
+
+
+def records(session: Optional[str] = None) -> List[Dict[str, object]]:
+    """All records, or only those of one session."""
+    recs = list(_records)
+    return recs if session is None else [r for r in recs if r["session"] == session]
+
+
+def clear(session: Optional[str] = None) -> None:
+    """Drop all records, or only those of one session."""
+    if session is None:
+        _records.clear()
+        return
+    kept = [r for r in list(_records) if r["session"] != session]
+    _records.clear()
+    _records.extend(kept)
+
+
+def to_jsonl(recs: Optional[List[Dict[str, object]]] = None) -> str:
+    """Records as JSON lines (one stage per line) for offline analysis."""
+    recs = records() if recs is None else recs
+    return "".join(json.dumps(r, default=str) + "\n" for r in recs)
+
+
+def export_jsonl(path: str) -> int:
+    """Append the current records to a JSON lines file; returns lines written."""
+    recs = records()
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.write(to_jsonl(recs))
+    return len(recs)
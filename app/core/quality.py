@@ -0,0 +1,215 @@
+"""
+Data-quality profile of a prepared dataset, built in the same pass as the
+rest of the summary and mergeable like it.
+
+Per column: null count, and min/max for numeric and date columns. Per row:
+hours outside 0-23 (or fractional), negative counts, and the time slot each
+row occupies: the Date's day plus Hour plus any minutes in Date, to the
+minute, so a 15-minute feed has four slots per hour. Slots are kept as
+sorted unique ids with row counts, so duplicates and gaps in the series are
+exact across chunks, partitions and appends while the profile stays the
+size of the time span. Gaps are measured in the feed's own step (the most
+common distance between slots).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from .pipeline import COL
+
+_NS_PER_MIN = 60_000_000_000
+_MIN_PER_HOUR = 60
+_MIN_PER_DAY = 24 * _MIN_PER_HOUR
+
+
+@dataclass
+class QualityProfile:
+    """Mergeable quality counts of a prepared frame; see profile_frame / merge_profiles."""
+
+    rows: int = 0
+    # per column: nulls, min, max (min/max None for label columns)
+    columns: pd.DataFrame = field(default_factory=lambda: pd.DataFrame(columns=["nulls", "min", "max"]))
+    invalid_hours: int = 0
+    negative_counts: int = 0
+    # minutes since the epoch of every slot present, and rows per slot
+    slots: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    slot_rows: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+
+
+def _column_stats(df: pd.DataFrame) -> pd.DataFrame:
+    # numpy per column: pandas reductions cost more than the work on small chunks
+    stats = {}
+    for c in df.columns:
+        s = df[c]
+        lo = hi = None
+        if pd.api.types.is_datetime64_any_dtype(s.dtype):
+            v = s.to_numpy()
+            ok = v[~np.isnat(v)]
+            nulls = len(v) - len(ok)
+            if len(ok):
+                lo, hi = pd.Timestamp(ok.min()), pd.Timestamp(ok.max())
+        elif pd.api.types.is_numeric_dtype(s.dtype) and not pd.api.types.is_bool_dtype(s.dtype):
+            v = s.to_numpy(dtype="float64", na_value=np.nan)
+            ok = v[~np.isnan(v)]
+            nulls = len(v) - len(ok)
+            if len(ok):
+                lo, hi = float(ok.min()), float(ok.max())
+        else:
+            nulls = int(s.isna().sum())
+        stats[c] = (int(nulls), lo, hi)
+    return pd.DataFrame.from_dict(stats, orient="index", columns=["nulls", "min", "max"]).astype({"nulls": "int64"})
+
+
+def profile_frame(df: pd.DataFrame) -> QualityProfile:
+    """Quality profile of one prepared frame or chunk (vectorized, one look per column)."""
+    out = QualityProfile(rows=int(len(df)), columns=_column_stats(df))
+
+    hours = None
+    if COL["hour"] in df.columns:
+        hours = df[COL["hour"]].to_numpy(dtype="float64", na_value=np.nan)
+        bad = ~np.isnan(hours) & ((hours < 0) | (hours > 23) | (hours != np.floor(hours)))
+        out.invalid_hours = int(bad.sum())
+        hours = np.where(bad, np.nan, hours)
+
+    if COL["target"] in df.columns:
+        y = df[COL["target"]].to_numpy(dtype="float64", na_value=np.nan)
+        out.negative_counts = int((y < 0).sum())
+
+    if hours is not None and COL["date"] in df.columns:
+        ns = df[COL["date"]].to_numpy(dtype="datetime64[ns]").view(np.int64)
+        ok = (ns != np.iinfo(np.int64).min) & ~np.isnan(hours)
+        minutes = np.floor_divide(ns[ok], _NS_PER_MIN)
+        day = minutes - minutes % _MIN_PER_DAY
+        slots = day + hours[ok].astype(np.int64) * _MIN_PER_HOUR + minutes % _MIN_PER_HOUR
+        out.slots, out.slot_rows = _count_slots(slots)
+    return out
+
+
+def _count_slots(slots: np.ndarray):
+    """
+    Sorted unique slots and their row counts; a bincount over the span in
+    steps of the slots' common divisor when that span is dense.
+    """
+    if not len(slots):
+        return slots, slots.copy()
+    lo = slots.min()
+    step = max(int(np.gcd.reduce(slots - lo)), 1)
+    span = int(slots.max() - lo) // step + 1
+    if span > 4 * len(slots):  # sparse (e.g. stray far-off dates): sort instead
+        return np.unique(slots, return_counts=True)
+    counts = np.bincount((slots - lo) // step, minlength=span)
+    present = np.flatnonzero(counts)
+    return present * step + lo, counts[present]
+
+
+def _pick(fn, x, y):
+    if x is None or pd.isna(x):
+        return None if y is None or pd.isna(y) else y
+    if y is None or pd.isna(y):
+        return x
+    return fn(x, y)
+
+
+def _merge_columns(a: pd.DataFrame, b: pd.DataFrame) -> pd.DataFrame:
+    if not len(a):
+        return b
+    if not len(b):
+        return a
+    index = a.index.union(b.index, sort=False)
+    a, b = a.reindex(index), b.reindex(index)
+    return pd.DataFrame(
+        {
+            "nulls": (a["nulls"].fillna(0) + b["nulls"].fillna(0)).astype("int64"),
+            "min": [_pick(min, x, y) for x, y in zip(a["min"], b["min"])],
+            "max": [_pick(max, x, y) for x, y in zip(a["max"], b["max"])],
+        },
+        index=index,
+    )
+
+
+def merge_profiles(a: Optional[QualityProfile], b: Optional[QualityProfile]) -> Optional[QualityProfile]:
+    """Combine profiles of disjoint row sets."""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    slots, inverse = np.unique(np.concatenate([a.slots, b.slots]), return_inverse=True)
+    slot_rows = np.bincount(inverse, weights=np.concatenate([a.slot_rows, b.slot_rows]), minlength=len(slots))
+    return QualityProfile(
+        rows=a.rows + b.rows,
+        columns=_merge_columns(a.columns, b.columns),
+        invalid_hours=a.invalid_hours + b.invalid_hours,
+        negative_counts=a.negative_counts + b.negative_counts,
+        slots=slots,
+        slot_rows=slot_rows.astype(np.int64),
+    )
+
+
+def _slot_times(slots: np.ndarray) -> pd.DatetimeIndex:
+    return pd.DatetimeIndex(slots * _NS_PER_MIN)
+
+
+def slot_minutes(profile: QualityProfile) -> int:
+    """
+    The feed's step in minutes: the most common distance between
+    consecutive slots (60 for an hourly feed, also when there are too few
+    slots to tell).
+    """
+    step = np.diff(profile.slots)
+    if not len(step):
+        return _MIN_PER_HOUR
+    values, counts = np.unique(step, return_counts=True)
+    return int(values[counts.argmax()])
+
+
+def duplicate_slots(profile: QualityProfile) -> pd.DataFrame:
+    """Slots (Date, Hour and, for sub-hourly feeds, Minute) held by more than one row, with row counts."""
+    dup = profile.slot_rows > 1
+    times = _slot_times(profile.slots[dup])
+    out = pd.DataFrame({COL["date"]: times.normalize(), COL["hour"]: times.hour})
+    if slot_minutes(profile) < _MIN_PER_HOUR:
+        out["Minute"] = times.minute
+    out["rows"] = profile.slot_rows[dup]
+    return out
+
+
+def _gaps(profile: QualityProfile):
+    step = slot_minutes(profile)
+    dist = np.diff(profile.slots)
+    gap = np.flatnonzero(dist > step)
+    # slots absent on the feed's step strictly between two present ones
+    return step, gap, (dist[gap] - 1) // step
+
+
+def missing_hour_gaps(profile: QualityProfile) -> pd.DataFrame:
+    """Runs of consecutive slots absent between the first and last slot: start, end, slots, hours."""
+    step, gap, missing = _gaps(profile)
+    slots = profile.slots
+    return pd.DataFrame({
+        "start": _slot_times(slots[gap] + step),
+        "end": _slot_times(slots[gap] + missing * step),
+        "slots": missing,
+        "hours": missing * step / _MIN_PER_HOUR,
+    })
+
+
+def quality_summary(profile: QualityProfile) -> Dict[str, int]:
+    """Headline counts of the profile; slots are counted on the feed's step (slot_minutes)."""
+    step, _, missing = _gaps(profile)
+    missing = int(missing.sum())
+    nat = profile.columns["nulls"].get(COL["date"], 0)
+    return {
+        "rows": profile.rows,
+        "invalid_hours": profile.invalid_hours,
+        "nat_dates": int(nat),
+        "negative_counts": profile.negative_counts,
+        "duplicate_slots": int((profile.slot_rows > 1).sum()),
+        "duplicate_rows": int((profile.slot_rows - 1).clip(min=0).sum()),
+        "slot_minutes": step,
+        "expected_slots": len(profile.slots) + missing,
+        "missing_slots": missing,
+    }
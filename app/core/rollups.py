@@ -0,0 +1,114 @@
+"""
+Time rollups of the target at several resolutions, built hierarchically.
+
+The base level is a sum/count series over 15-minute slots, taken from the
+demand cube (whose Date cells keep any time of day, so sub-hourly feeds
+stay sub-hourly). Every coarser level is summed from its parent level, never
+from rows or cube cells, and is only as long as the time span it covers.
+"""
+from __future__ import annotations
+
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from .pipeline import COL
+
+# Selector label -> parent level; the first entry is the base level.
+GRANULARITIES: Dict[str, str] = {
+    "15 min": "",
+    "Hourly": "15 min",
+    "Daily": "Hourly",
+    "Weekly": "Daily",
+    "Monthly": "Daily",
+}
+
+DEFAULT_GRANULARITY = "Daily"
+
+_NS_PER_MIN = 60_000_000_000
+_NS_PER_DAY = 24 * 60 * _NS_PER_MIN
+_BASE_NS = 15 * _NS_PER_MIN
+_NAT = np.iinfo(np.int64).min
+
+
+def _floor_week(ns: np.ndarray) -> np.ndarray:
+    days = ns // _NS_PER_DAY
+    return (days - (days + 3) % 7) * _NS_PER_DAY  # 1970-01-01 was a Thursday; weeks start on Monday
+
+
+def _floor_month(ns: np.ndarray) -> np.ndarray:
+    return ns.astype("datetime64[ns]").astype("datetime64[M]").astype("datetime64[ns]").view(np.int64)
+
+
+# Bucket start (int64 ns) for each level, from its parent's bucket starts.
+_FLOOR = {
+    "Hourly": lambda ns: ns - ns % (60 * _NS_PER_MIN),
+    "Daily": lambda ns: ns - ns % _NS_PER_DAY,
+    "Weekly": _floor_week,
+    "Monthly": _floor_month,
+}
+
+Rollups = Dict[str, pd.DataFrame]
+
+
+def cube_times(cube: pd.DataFrame) -> np.ndarray:
+    """
+    int64 ns timestamp of each cube cell: the Date's day plus Hour, plus any
+    minutes in Date. Cells without a date or hour get NaT (int64 min).
+    """
+    ns = cube[COL["date"]].to_numpy(dtype="datetime64[ns]").view(np.int64)
+    hours = cube[COL["hour"]].to_numpy(dtype="float64", na_value=np.nan)
+    ok = (ns != _NAT) & ~np.isnan(hours)
+    day = ns - ns % _NS_PER_DAY
+    minute = ns % (60 * _NS_PER_MIN)
+    out = day + np.nan_to_num(hours).astype(np.int64) * 60 * _NS_PER_MIN + minute - minute % _NS_PER_MIN
+    return np.where(ok, out, _NAT)
+
+
+def _reduce(keys: np.ndarray, sums: np.ndarray, counts: np.ndarray):
+    """Add up runs of equal keys (keys sorted)."""
+    if not len(keys):
+        return keys, sums, counts
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    return keys[starts], np.add.reduceat(sums, starts), np.add.reduceat(counts, starts)
+
+
+def _frame(keys: np.ndarray, sums: np.ndarray, counts: np.ndarray) -> pd.DataFrame:
+    out = pd.DataFrame(
+        {"sum": sums, "count": counts},
+        index=pd.DatetimeIndex(keys.astype("datetime64[ns]"), name="time"),
+    )
+    out["mean"] = out["sum"] / out["count"].where(out["count"] > 0)
+    return out
+
+
+def build_rollups(cube: pd.DataFrame) -> Rollups:
+    """sum / count / mean per time bucket at every GRANULARITIES level (cells without a time are skipped)."""
+    if COL["date"] not in cube.columns or COL["hour"] not in cube.columns:
+        return {}
+    ns = cube_times(cube)
+    ok = ns != _NAT
+    base = ns[ok] - ns[ok] % _BASE_NS
+    order = np.argsort(base, kind="stable")
+    arrays = {}
+    for level, parent in GRANULARITIES.items():
+        if not parent:
+            arrays[level] = _reduce(
+                base[order],
+                cube["sum"].to_numpy(dtype="float64")[ok][order],
+                cube["count"].to_numpy(dtype="float64")[ok][order],
+            )
+        else:
+            keys, sums, counts = arrays[parent]
+            arrays[level] = _reduce(_FLOOR[level](keys), sums, counts)  # floors keep keys sorted
+    return {level: _frame(*a) for level, a in arrays.items()}
+
+
+def available_granularities(rollups: Rollups) -> List[str]:
+    """Levels worth offering: 15 min only when some bucket is not on the hour."""
+    names = [k for k in GRANULARITIES if k in rollups]
+    base = rollups.get("15 min")
+    if base is not None and not (base.index.minute != 0).any():
+        names.remove("15 min")
+    return names
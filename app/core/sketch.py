@@ -0,0 +1,139 @@
+"""
+KLL quantile sketch: a compact, mergeable summary of a numeric distribution.
+
+Values are kept in levels of compactors; an item at level h stands for 2**h
+input values. When the sketch exceeds its capacity, a full level is sorted
+and every other item is promoted, which keeps the size around 3*k items
+regardless of input size. Rank error is roughly 1.7/k of n (about 1% at the
+default k=200) and does not grow with merges.
+"""
+from __future__ import annotations
+
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_K = 200
+
+# Smallest compactor capacity (levels far below the top shrink towards this).
+MIN_CAPACITY = 8
+
+# Capacity shrinks by this factor per level below the top one.
+_CAPACITY_DECAY = 2.0 / 3.0
+
+
+class KLLSketch:
+    """
+    Streaming/mergeable quantile sketch over float values (NaN is ignored).
+    n, min and max are exact; quantile() is approximate in rank.
+    Compaction offsets alternate deterministically, so equal inputs in equal
+    order give equal sketches (and cached results stay reproducible).
+    """
+
+    def __init__(self, k: int = DEFAULT_K):
+        self.k = int(k)
+        self.levels: List[np.ndarray] = [np.empty(0, dtype="float64")]
+        self.n = 0
+        self.min = np.nan
+        self.max = np.nan
+        self._parity = 0
+
+    def __repr__(self) -> str:
+        return f"KLLSketch(k={self.k}, n={self.n}, retained={self.retained})"
+
+    @property
+    def retained(self) -> int:
+        """Items held in memory (the sketch size)."""
+        return int(sum(len(level) for level in self.levels))
+
+    def _capacity(self, h: int) -> int:
+        depth = len(self.levels) - h - 1
+        return max(MIN_CAPACITY, int(np.ceil(self.k * _CAPACITY_DECAY ** depth)))
+
+    def update(self, values) -> "KLLSketch":
+        """Add a batch of values in place; returns self."""
+        v = np.asarray(values, dtype="float64").ravel()
+        v = v[~np.isnan(v)]
+        if not len(v):
+            return self
+        lo, hi = v.min(), v.max()
+        self.min = lo if not self.n else min(self.min, lo)
+        self.max = hi if not self.n else max(self.max, hi)
+        self.n += len(v)
+        self.levels[0] = np.concatenate([self.levels[0], v])
+        self._compress()
+        return self
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """New sketch summarizing both inputs; neither input is modified."""
+        return KLLSketch.merge_all([self, other])
+
+    @staticmethod
+    def merge_all(sketches: Sequence["KLLSketch"]) -> "KLLSketch":
+        """
+        New sketch summarizing all inputs: levels are concatenated and then
+        compacted once, instead of once per pairwise merge.
+        """
+        out = KLLSketch(max(s.k for s in sketches))
+        depth = max(len(s.levels) for s in sketches)
+        out.levels = [
+            np.concatenate([s.levels[h] for s in sketches if h < len(s.levels)] or [out.levels[0]])
+            for h in range(depth)
+        ]
+        out.n = sum(s.n for s in sketches)
+        out.min = np.nanmin([s.min for s in sketches]) if out.n else np.nan
+        out.max = np.nanmax([s.max for s in sketches]) if out.n else np.nan
+        for s in sketches:
+            out._parity ^= s._parity
+        out._compress()
+        return out
+
+    def _compress(self) -> None:
+        while self.retained > sum(self._capacity(h) for h in range(len(self.levels))):
+            h = next(h for h, level in enumerate(self.levels) if len(level) > self._capacity(h))
+            if h + 1 == len(self.levels):
+                self.levels.append(self.levels[0][:0])
+            items = np.sort(self.levels[h])
+            # An odd item out stays at this level; the rest pair up and one
+            # of each pair moves up with double weight.
+            if len(items) % 2:
+                keep, items = (items[:1], items[1:]) if self._parity else (items[-1:], items[:-1])
+            else:
+                keep = items[:0]
+            self.levels[h] = keep
+            self.levels[h + 1] = np.concatenate([self.levels[h + 1], items[self._parity::2]])
+            self._parity ^= 1
+
+    def _weighted(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2 ** h, dtype="float64") for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        return items[order], np.cumsum(weights[order])
+
+    def quantile(self, qs: Sequence[float]) -> np.ndarray:
+        """Approximate quantiles for probabilities in [0, 1] (NaN when empty)."""
+        qs = np.atleast_1d(np.asarray(qs, dtype="float64"))
+        if not self.n:
+            return np.full(len(qs), np.nan)
+        items, cum = self._weighted()
+        idx = np.searchsorted(cum, qs * cum[-1], side="left").clip(0, len(items) - 1)
+        out = items[idx]
+        out[qs <= 0] = self.min
+        out[qs >= 1] = self.max
+        return out
+
+    def rank(self, x: float) -> float:
+        """Approximate fraction of values <= x."""
+        if not self.n:
+            return np.nan
+        items, cum = self._weighted()
+        i = np.searchsorted(items, x, side="right")
+        return float(cum[i - 1] / cum[-1]) if i else 0.0
+
+
+def merge_sketches(*sketches: Optional[KLLSketch]) -> Optional[KLLSketch]:
+    """Merge any number of sketches in one pass (None entries are skipped)."""
+    present = [s for s in sketches if s is not None]
+    if len(present) < 2:
+        return present[0] if present else None
+    return KLLSketch.merge_all(present)
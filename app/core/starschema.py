@@ -0,0 +1,250 @@
+"""
+Star-schema extract of the prepared dataset for the Power BI layer.
+
+build_star_schema(df) turns a prepared frame (the same prepare_frame output
+the app uses) into small typed tables:
+
+- dim_date: one row per day (DateKey yyyymmdd, calendar attributes, season,
+  holiday);
+- dim_hour: hours 0-23 with their TimeSlot;
+- fact_hourly: rentals and mean weather per (DateKey, Hour);
+- fact_daily: rentals, peak hour and daily weather per DateKey;
+- fact_monthly: rentals, hours and days per MonthKey (yyyymm).
+
+write_star_schema writes them as Parquet. String columns are categoricals,
+so they are stored dictionary-encoded. fact_hourly and fact_daily are split
+into one file per month (<table>/<yyyymm>.parquet). A file is rewritten only
+when its content hash changed, and manifest.json records each file's hash
+plus the files the last export changed or removed. A BI refresh can then
+reload just those.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .io import dataset_version
+from .pipeline import COL, DAY_NAMES, TIMESLOT_LABELS, timeslot_codes
+
+MANIFEST = "manifest.json"
+MANIFEST_VERSION = 1
+
+PARTITIONED_TABLES: List[str] = ["fact_hourly", "fact_daily"]
+PARTITION_KEY = "MonthKey"
+
+# Weather measures: daily facts sum these and average the rest.
+_SUMMED_WEATHER = ["rainfall", "snowfall"]
+_WEATHER_KEYS = ["temp", "humidity", "wind", "visibility", "dew_point", "solar", "rainfall", "snowfall"]
+
+_MONTH_NAMES = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+def _date_keys(dates: pd.Series) -> np.ndarray:
+    return (dates.dt.year * 10000 + dates.dt.month * 100 + dates.dt.day).to_numpy(dtype="int32")
+
+
+def _first_per_day(df: pd.DataFrame, column: str) -> pd.Series:
+    return df.groupby("DateKey", sort=True)[column].first()
+
+
+def build_star_schema(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """
+    Dimension and fact tables of a prepared frame. Rows without a date or
+    without a whole hour in 0-23 are left out (the quality profile counts
+    those as invalid hours), so the int8 Hour key is never truncated.
+    """
+    target, hour = COL["target"], COL["hour"]
+    hours = df[hour].to_numpy(dtype="float64", na_value=np.nan)
+    keep = df[COL["date"]].notna().to_numpy() & (hours >= 0) & (hours <= 23) & (hours == np.floor(hours))
+    weather = [COL[k] for k in _WEATHER_KEYS if COL[k] in df.columns]
+    base = df.loc[keep, [c for c in [COL["date"], hour, target, COL["season"], COL["holiday"], "IsHoliday"] + weather
+                         if c in df.columns]]
+    base = base.assign(DateKey=_date_keys(base[COL["date"]]), **{hour: base[hour].astype("int8")})
+
+    # dimensions
+    days = base.groupby("DateKey", sort=True)[COL["date"]].first().dt.normalize()
+    dim_date = pd.DataFrame({
+        "DateKey": days.index.to_numpy(dtype="int32"),
+        "Date": days.to_numpy(),
+        "Year": days.dt.year.to_numpy(dtype="int16"),
+        "Month": days.dt.month.to_numpy(dtype="int8"),
+        "MonthName": pd.Categorical(
+            np.asarray(_MONTH_NAMES)[days.dt.month.to_numpy() - 1], categories=_MONTH_NAMES, ordered=True
+        ),
+        PARTITION_KEY: (days.dt.year * 100 + days.dt.month).to_numpy(dtype="int32"),
+        "Day": days.dt.day.to_numpy(dtype="int8"),
+        "DayOfWeek": pd.Categorical.from_codes(days.dt.weekday.to_numpy(), categories=DAY_NAMES, ordered=True),
+        "IsWeekend": (days.dt.weekday >= 5).to_numpy(),
+    })
+    for column in [COL["season"], COL["holiday"]]:
+        if column in base.columns:
+            dim_date[column] = pd.Categorical(_first_per_day(base, column).astype("string").to_numpy())
+    if "IsHoliday" in base.columns:
+        dim_date["IsHoliday"] = _first_per_day(base, "IsHoliday").to_numpy(dtype=bool)
+
+    hours = np.arange(24, dtype="int8")
+    dim_hour = pd.DataFrame({
+        hour: hours,
+        "HourLabel": [f"{h:02d}:00" for h in hours],
+        "TimeSlot": pd.Categorical.from_codes(timeslot_codes(pd.Series(hours)), categories=TIMESLOT_LABELS),
+    })
+
+    # facts
+    measures = {target: (target, "sum"), "Hours": (target, "size")}
+    measures.update({w: (w, "mean") for w in weather})
+    fact_hourly = base.groupby(["DateKey", hour], sort=True).agg(**measures).reset_index()
+
+    by_day = base.groupby("DateKey", sort=True)
+    daily_measures = {target: (target, "sum"), "Hours": (target, "size")}
+    daily_measures.update({w: (w, "sum" if w in [COL[k] for k in _SUMMED_WEATHER] else "mean") for w in weather})
+    fact_daily = by_day.agg(**daily_measures)
+    peak = fact_hourly.loc[fact_hourly.groupby("DateKey", sort=True)[target].idxmax(), ["DateKey", hour, target]]
+    fact_daily["PeakHour"] = peak[hour].to_numpy()
+    fact_daily["PeakHourRentals"] = peak[target].to_numpy()
+    fact_daily = fact_daily.reset_index()
+
+    month_of = dict(zip(dim_date["DateKey"], dim_date[PARTITION_KEY]))
+    for fact in (fact_hourly, fact_daily):
+        fact.insert(1, PARTITION_KEY, fact["DateKey"].map(month_of).to_numpy(dtype="int32"))
+    fact_monthly = fact_daily.groupby(PARTITION_KEY, sort=True).agg(
+        **{target: (target, "sum"), "Hours": ("Hours", "sum"), "Days": ("DateKey", "size")}
+    ).reset_index()
+
+    for fact in (fact_hourly, fact_daily, fact_monthly):
+        fact[target] = fact[target].astype("int64" if fact[target].max() >= 2**31 else "int32")
+        fact["Hours"] = fact["Hours"].astype("int32")
+        for w in weather:
+            if w in fact.columns:
+                fact[w] = fact[w].astype("float32")
+
+    return {
+        "dim_date": dim_date,
+        "dim_hour": dim_hour,
+        "fact_hourly": fact_hourly,
+        "fact_daily": fact_daily,
+        "fact_monthly": fact_monthly,
+    }
+
+
+def frame_digest(df: pd.DataFrame) -> str:
+    """Content hash of a table (values, column names and dtypes; not the index)."""
+    h = hashlib.sha1()
+    h.update(json.dumps([[c, str(t)] for c, t in df.dtypes.items()]).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _write_parquet(df: pd.DataFrame, path: str) -> None:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    try:
+        pq.write_table(
+            table,
+            tmp_path,
+            use_dictionary=True,
+            compression="snappy",
+            coerce_timestamps="ms",
+            allow_truncated_timestamps=True,
+        )
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_manifest(out_dir: str) -> Optional[Dict]:
+    """The manifest of a previous export, or None."""
+    try:
+        with open(os.path.join(out_dir, MANIFEST)) as fh:
+            manifest = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("manifest_version") == MANIFEST_VERSION else None
+
+
+def _files(tables: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+    """Relative file path -> table slice, one file per unpartitioned table or per month."""
+    files = {}
+    for name, table in tables.items():
+        if name not in PARTITIONED_TABLES:
+            files[f"{name}.parquet"] = table
+            continue
+        for month, part in table.groupby(PARTITION_KEY, sort=True):
+            files[f"{name}/{month}.parquet"] = part.reset_index(drop=True)
+    return files
+
+
+def _existing_partitions(out_dir: str) -> List[str]:
+    """Month files already under out_dir, whether or not a manifest lists them."""
+    found = []
+    for name in PARTITIONED_TABLES:
+        folder = os.path.join(out_dir, name)
+        if os.path.isdir(folder):
+            found += [f"{name}/{f}" for f in os.listdir(folder) if f.endswith(".parquet") and f[:-8].isdigit()]
+    return found
+
+
+def write_star_schema(
+    tables: Dict[str, pd.DataFrame], out_dir: str, source: Optional[Dict] = None, full: bool = False
+) -> Dict:
+    """
+    Write the tables under out_dir, rewriting only files whose content hash
+    differs from the previous manifest (every file with full=True). Files of
+    months no longer present are deleted, also those a lost or outdated
+    manifest does not list. Returns the new manifest.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    previous = (read_manifest(out_dir) or {}).get("files", {})
+    known = previous if not full else {}
+    files: Dict[str, Dict] = {}
+    changed: List[str] = []
+    for rel, table in _files(tables).items():
+        digest = frame_digest(table)
+        path = os.path.join(out_dir, rel)
+        if known.get(rel, {}).get("sha1") != digest or not os.path.exists(path):
+            _write_parquet(table, path)
+            changed.append(rel)
+        files[rel] = {"rows": len(table), "sha1": digest, "bytes": os.path.getsize(path)}
+
+    removed = sorted((set(previous) | set(_existing_partitions(out_dir))) - set(files))
+    for rel in removed:
+        path = os.path.join(out_dir, rel)
+        if os.path.exists(path):
+            os.remove(path)
+        try:
+            os.rmdir(os.path.dirname(path))
+        except OSError:
+            pass
+
+    manifest = {
+        "manifest_version": MANIFEST_VERSION,
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "source": source or {},
+        "partition_key": PARTITION_KEY,
+        "partitioned_tables": PARTITIONED_TABLES,
+        "files": files,
+        "changed": changed,
+        "removed": removed,
+    }
+    tmp_path = os.path.join(out_dir, f"{MANIFEST}.{os.getpid()}.tmp")
+    with open(tmp_path, "w") as fh:
+        json.dump(manifest, fh, indent=1)
+    os.replace(tmp_path, os.path.join(out_dir, MANIFEST))
+    return manifest
+
+
+def export_source(path: str, apply_filter: bool) -> Dict:
+    """Source description stored in the manifest: path, file version and filter."""
+    mtime_ns, size = dataset_version(path)
+    return {"path": os.path.abspath(path), "mtime_ns": mtime_ns, "size": size, "apply_filter": bool(apply_filter)}
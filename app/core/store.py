@@ -0,0 +1,157 @@
+"""
+Shared in-process store for large read-only objects (prepared frames, filter
+indexes), with a memory budget and LRU eviction.
+
+Nothing is copied on a hit. Frames are handed out as shallow copies, which
+under Copy-on-Write share all column data with the stored frame: a caller
+that assigns or modifies columns copies only what it touches and never
+changes what other sessions see. Without Copy-on-Write (pandas 2 with the
+option off) frames are handed out as deep copies instead. Other values
+(indexes) are handed out as-is and must be treated as read-only.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+import pandas as pd
+
+from .pipeline import cow_enabled
+
+DEFAULT_BUDGET_MB = 2048
+
+
+def _handout(value: Any) -> Any:
+    return value.copy(deep=not cow_enabled()) if isinstance(value, pd.DataFrame) else value
+
+
+def nbytes_of(value: Any) -> int:
+    """Resident size of a stored value (deep for frames, .nbytes otherwise)."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    return int(getattr(value, "nbytes", 0))
+
+
+@dataclass
+class _Entry:
+    value: Any
+    nbytes: int
+    version: Hashable
+    loaded_at: float
+    load_ms: float
+    hits: int = 0
+
+
+class DatasetStore:
+    """
+    Thread-safe LRU of loaded objects keyed by (name, version).
+    A name (e.g. ("prepared", path, apply_filter)) holds one version at a time:
+    loading a new version drops the old one. When the total size exceeds the
+    budget, least recently used entries are evicted; an entry larger than the
+    whole budget is still kept, alone. Concurrent requests for the same key
+    load it once.
+    """
+
+    def __init__(self, budget_bytes: int = DEFAULT_BUDGET_MB << 20):
+        self.budget_bytes = int(budget_bytes)
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading: Dict[Hashable, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale = 0
+
+    def _hit(self, name: Hashable, version: Hashable) -> Optional[_Entry]:
+        entry = self._entries.get(name)
+        if entry is None or entry.version != version:
+            return None
+        self._entries.move_to_end(name)
+        entry.hits += 1
+        self.hits += 1
+        return entry
+
+    def get(
+        self,
+        name: Hashable,
+        version: Hashable,
+        loader: Callable[[], Any],
+        sizeof: Callable[[Any], int] = nbytes_of,
+    ) -> Any:
+        """The stored value for (name, version), calling loader() on a miss."""
+        with self._lock:
+            entry = self._hit(name, version)
+            if entry is not None:
+                return _handout(entry.value)
+            key_lock = self._loading.setdefault((name, version), threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                entry = self._hit(name, version)  # loaded by another session meanwhile
+                if entry is not None:
+                    return _handout(entry.value)
+            try:
+                t0 = time.perf_counter()
+                value = loader()
+                load_ms = (time.perf_counter() - t0) * 1000
+            finally:
+                with self._lock:
+                    self._loading.pop((name, version), None)
+
+            with self._lock:
+                self.misses += 1
+                if name in self._entries:
+                    del self._entries[name]
+                    self.stale += 1
+                self._entries[name] = _Entry(value, sizeof(value), version, time.time(), load_ms)
+                self._evict()
+        return _handout(value)
+
+    def _evict(self) -> None:
+        while len(self._entries) > 1 and self.nbytes > self.budget_bytes:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    @property
+    def nbytes(self) -> int:
+        return sum(e.nbytes for e in self._entries.values())
+
+    def set_budget(self, budget_bytes: int) -> None:
+        with self._lock:
+            self.budget_bytes = int(budget_bytes)
+            self._evict()
+
+    def clear(self) -> None:
+        """Drop all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.nbytes,
+                "budget_bytes": self.budget_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "stale": self.stale,
+            }
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """One row per entry, least recently used first."""
+        with self._lock:
+            return [
+                {
+                    "name": " | ".join(str(p) for p in (n if isinstance(n, tuple) else (n,))),
+                    "version": str(e.version),
+                    "bytes": e.nbytes,
+                    "hits": e.hits,
+                    "load_ms": round(e.load_ms, 1),
+                    "loaded_at": pd.Timestamp(e.loaded_at, unit="s"),
+                }
+                for n, e in self._entries.items()
+            ]
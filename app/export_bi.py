@@ -0,0 +1,62 @@
+"""
+Star-schema Parquet extract of a dataset for the Power BI layer, no Streamlit.
+
+Usage:
+    python app/export_bi.py data/seoulbike_cleaned.csv [--out exports/powerbi]
+                            [--no-filter] [--full] [--force]
+
+The dataset is prepared exactly as the app prepares it (prepare_frame), then
+written as dim_date / dim_hour and pre-aggregated facts (hourly, daily,
+monthly); see core/starschema.py. fact_hourly and fact_daily are partitioned
+by month. Only changed months are rewritten, and <out>/manifest.json lists
+them under "changed", so a BI refresh can reload just those files.
+
+The export is skipped when the source file and filter match the previous
+manifest (use --force to rebuild anyway; --full also rewrites unchanged
+files).
+"""
+import argparse
+import os
+import sys
+
+from core import DatasetError, prepare_frame
+from core.starschema import build_star_schema, export_source, read_manifest, write_star_schema
+
+
+def run(path: str, out: str, apply_filter: bool, full: bool = False, force: bool = False) -> dict:
+    source = export_source(path, apply_filter)
+    previous = read_manifest(out)
+    if previous and previous.get("source") == source and not (full or force):
+        return {**previous, "changed": [], "removed": []}
+    tables = build_star_schema(prepare_frame(path, apply_filter))
+    return write_star_schema(tables, out, source=source, full=full)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", help="CSV dataset")
+    parser.add_argument("--out", default=os.path.join("exports", "powerbi"), help="output directory")
+    parser.add_argument("--no-filter", action="store_true", help="keep non-functioning days")
+    parser.add_argument("--full", action="store_true", help="rewrite every file, changed or not")
+    parser.add_argument("--force", action="store_true", help="rebuild even if the source is unchanged")
+    args = parser.parse_args()
+
+    try:
+        manifest = run(args.path, args.out, not args.no_filter, args.full, args.force)
+    except DatasetError as e:
+        print(f"{args.path}: {e}", file=sys.stderr)
+        return 1
+    total = sum(f["bytes"] for f in manifest["files"].values())
+    print(
+        f"{args.path}: {len(manifest['files'])} files ({total / 1e6:.2f} MB) -> {args.out}; "
+        f"{len(manifest['changed'])} changed, {len(manifest['removed'])} removed"
+    )
+    for rel in manifest["changed"]:
+        print(f"  changed {rel}")
+    for rel in manifest["removed"]:
+        print(f"  removed {rel}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
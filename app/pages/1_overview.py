@@ -3,14 +3,14 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 import streamlit as st
+from core import metrics
 from utils import (
-    load_data,
-    harmonize_columns,
-    standardize_types,
-    filter_functioning_days,
-    add_time_features,
-    COL,
+    load_frame,
+    load_summary,
+    begin_page,
+    page_stage,
     validate_required_columns,
+    memory_footprint,
 )
 
 st.title("1) Overview")
@@ -19,40 +19,81 @@ st.caption("Dataset snapshot, coverage, and core KPIs.")
 # use global settings if set in app/app.py
 data_path = st.session_state.get("data_path", "data/seoulbike_cleaned.csv")
 apply_filter = st.session_state.get("apply_filter", True)
+begin_page("1_overview")
 
-df = load_data(data_path)
-df = harmonize_columns(df)
-df = standardize_types(df)
-if apply_filter:
-    df = filter_functioning_days(df)
-df = add_time_features(df)
+with page_stage("load_summary"):
+    summary = load_summary(data_path, apply_filter)
 
-validate_required_columns(df, ["date", "target", "hour", "season", "holiday"])
+validate_required_columns(summary.preview, ["date", "target", "hour", "season", "holiday"])
+with page_stage("metrics"):
+    result = metrics.overview(summary)
+kpis, tables = result["kpis"], result["tables"]
 
 c1, c2, c3, c4 = st.columns(4)
-c1.metric("Rows", f"{df.shape[0]:,}")
-c2.metric("Total Rentals", f"{int(df[COL['target']].sum()):,}")
-c3.metric("Avg Hourly Rentals", f"{df[COL['target']].mean():.0f}")
-c4.metric("Max Hourly Rentals", f"{int(df[COL['target']].max()):,}")
+c1.metric("Rows", f"{kpis['rows']:,}")
+c2.metric("Total Rentals", f"{kpis['total_rentals']:,}")
+c3.metric("Avg Hourly Rentals", f"{kpis['avg_hourly_rentals']:.0f}")
+c4.metric("Max Hourly Rentals", f"{int(kpis['max_hourly_rentals']):,}")
 
 st.markdown("---")
 
 st.subheader("Dataset Coverage")
-min_date = df[COL["date"]].min()
-max_date = df[COL["date"]].max()
-st.write(f"Date range: **{min_date.date()}** to **{max_date.date()}**")
+st.write(f"Date range: **{kpis['date_min'].date()}** to **{kpis['date_max'].date()}**")
+if kpis["date_coerced"]:
+    st.warning(f"{kpis['date_coerced']:,} Date values could not be parsed and were set to missing.")
 
 col1, col2 = st.columns(2)
 with col1:
     st.write("Season distribution")
-    st.dataframe(df[COL["season"]].value_counts().rename("count").to_frame(), use_container_width=True)
+    st.dataframe(tables["season_distribution"], use_container_width=True)
 with col2:
     st.write("Holiday distribution")
-    st.dataframe(df[COL["holiday"]].value_counts().rename("count").to_frame(), use_container_width=True)
+    st.dataframe(tables["holiday_distribution"], use_container_width=True)
+
+st.markdown("---")
+st.subheader("Data Quality")
+# always the whole dataset, not the sidebar row filters
+with page_stage("data_quality"):
+    quality = metrics.data_quality(load_summary(data_path, apply_filter, filtered=False))
+q, qt = quality["kpis"], quality["tables"]
+
+q1, q2, q3, q4, q5 = st.columns(5)
+q1.metric("Invalid hours", f"{q['invalid_hours']:,}", help="Hour outside 0–23 or fractional")
+q2.metric("Missing dates", f"{q['nat_dates']:,}", help=f"{q['date_coerced']:,} of them unparseable")
+q3.metric("Negative counts", f"{q['negative_counts']:,}")
+step = "hour" if q["slot_minutes"] == 60 else f"{q['slot_minutes']}-minute slot"
+q4.metric("Duplicate timestamps", f"{q['duplicate_slots']:,}", help=f"{q['duplicate_rows']:,} extra rows")
+q5.metric(
+    f"Missing {step}s",
+    f"{q['missing_slots']:,}",
+    help=f"of {q['expected_slots']:,} {step}s between the first and last row",
+)
+if apply_filter and q["missing_slots"]:
+    st.caption(f"Non-functioning days are filtered out, so they count as missing {step}s.")
+
+with st.expander("Column nulls and ranges"):
+    st.dataframe(
+        qt["columns"].astype({"min": str, "max": str}).replace("None", ""),
+        column_config={"null_rate": st.column_config.NumberColumn("null rate", format="percent")},
+        use_container_width=True,
+    )
+if len(qt["duplicate_slots"]):
+    with st.expander(f"Duplicate timestamps ({len(qt['duplicate_slots']):,})"):
+        st.dataframe(qt["duplicate_slots"], use_container_width=True, hide_index=True)
+if len(qt["missing_hours"]):
+    with st.expander(f"Gaps in the series ({len(qt['missing_hours']):,})"):
+        st.dataframe(qt["missing_hours"], use_container_width=True, hide_index=True)
 
 st.markdown("---")
 st.subheader("Data Preview")
-st.dataframe(df.head(30), use_container_width=True)
+st.dataframe(summary.preview, use_container_width=True)
 
 with st.expander("Column list"):
-    st.write(list(df.columns))
+    st.write(summary.columns)
+
+df = load_frame(data_path, apply_filter)
+if df is not None:
+    with st.expander("Memory footprint"):
+        with page_stage("memory_footprint", rows_in=len(df)):
+            footprint = memory_footprint(df)
+        st.dataframe(footprint, use_container_width=True)
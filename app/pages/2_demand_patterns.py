@@ -3,14 +3,15 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 import streamlit as st
-import pandas as pd
+from core import metrics
 from utils import (
-    load_data,
-    harmonize_columns,
-    standardize_types,
-    filter_functioning_days,
-    add_time_features,
-    COL,
+    load_summary,
+    begin_page,
+    build_rollups,
+    chart_series,
+    derived,
+    interactive_section,
+    page_stage,
     validate_required_columns,
 )
 
@@ -19,37 +20,48 @@ st.caption("Peak hour behavior and time-based demand patterns.")
 
 data_path = st.session_state.get("data_path", "data/seoulbike_cleaned.csv")
 apply_filter = st.session_state.get("apply_filter", True)
+begin_page("2_demand_patterns")
 
-df = load_data(data_path)
-df = harmonize_columns(df)
-df = standardize_types(df)
-if apply_filter:
-    df = filter_functioning_days(df)
-df = add_time_features(df)
+with page_stage("load_summary"):
+    summary = load_summary(data_path, apply_filter)
 
-validate_required_columns(df, ["target", "hour", "date"])
+validate_required_columns(summary.preview, ["target", "hour", "date"])
+rollups = derived("rollups", {}, lambda: build_rollups(summary.cube), depends_on=["summary"])
+result = derived(
+    "demand_patterns", {}, lambda: metrics.demand_patterns(summary, rollups=rollups), depends_on=["rollups"]
+)
+kpis, tables = result["kpis"], result["tables"]
 
 st.subheader("Average rentals by hour")
-hourly = df.groupby(COL["hour"])[COL["target"]].mean().sort_index()
+hourly = tables["hourly"]
 st.line_chart(hourly)
 
-peak_hour = int(hourly.idxmax())
-peak_val = float(hourly.max())
-
 c1, c2, c3 = st.columns(3)
-c1.metric("Peak Hour", f"{peak_hour:02d}:00")
-c2.metric("Avg Rentals at Peak", f"{peak_val:.0f}")
-c3.metric("Avg Rentals (All Hours)", f"{df[COL['target']].mean():.0f}")
+c1.metric("Peak Hour", f"{kpis['peak_hour']:02d}:00")
+c2.metric("Avg Rentals at Peak", f"{kpis['peak_avg_rentals']:.0f}")
+c3.metric("Avg Rentals (All Hours)", f"{kpis['avg_rentals']:.0f}")
 
 st.markdown("---")
 st.subheader("TimeSlot breakdown")
-slot = df.groupby("TimeSlot")[COL["target"]].mean().sort_values(ascending=False)
-st.bar_chart(slot)
+st.bar_chart(tables["timeslot"])
 
 st.markdown("---")
-st.subheader("Daily total rentals trend")
-daily = df.groupby(df[COL["date"]].dt.date)[COL["target"]].sum()
-st.line_chart(daily)
+st.subheader("Total rentals trend")
+
+
+@interactive_section("trend")
+def trend_section() -> None:
+    granularity = st.radio("Resolution", kpis["granularities"], key="trend_granularity", horizontal=True,
+                           index=kpis["granularities"].index(kpis["granularity"]))
+    trend = derived(
+        "trend", {"granularity": granularity}, lambda: metrics.trend_series(rollups, granularity),
+        depends_on=["rollups"],
+    )
+    st.line_chart(chart_series(trend))
+
+
+if "trend" in tables:
+    trend_section()
 
 with st.expander("Supporting table (hourly averages)"):
     st.dataframe(hourly.rename("avg_rentals").to_frame(), use_container_width=True)
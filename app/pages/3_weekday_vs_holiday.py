@@ -2,15 +2,13 @@ import os
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
+import plotly.graph_objects as go
 import streamlit as st
-import pandas as pd
+from core import metrics
 from utils import (
-    load_data,
-    harmonize_columns,
-    standardize_types,
-    filter_functioning_days,
-    add_time_features,
-    COL,
+    load_summary,
+    begin_page,
+    page_stage,
     validate_required_columns,
 )
 
@@ -19,52 +17,47 @@ st.caption("Compare demand patterns across holiday vs non-holiday and weekday/we
 
 data_path = st.session_state.get("data_path", "data/seoulbike_cleaned.csv")
 apply_filter = st.session_state.get("apply_filter", True)
+begin_page("3_weekday_vs_holiday")
 
-df = load_data(data_path)
-df = harmonize_columns(df)
-df = standardize_types(df)
-if apply_filter:
-    df = filter_functioning_days(df)
-df = add_time_features(df)
+with page_stage("load_summary"):
+    summary = load_summary(data_path, apply_filter)
 
-validate_required_columns(df, ["target", "hour", "holiday", "date"])
-
-# Normalize holiday values to two buckets
-holiday_col = COL["holiday"]
-s = df[holiday_col].astype(str).str.strip().str.lower()
-df["_HolidayFlag"] = s.isin({"holiday", "yes", "true", "1", "y"})
+validate_required_columns(summary.preview, ["target", "hour", "holiday", "date"])
+with page_stage("metrics", rows_in=len(summary.cube)):
+    result = metrics.weekday_vs_holiday(summary)
+tables = result["tables"]
 
 st.subheader("Average rentals by hour (Holiday vs Non-Holiday)")
-hourly = (
-    df.groupby([COL["hour"], "_HolidayFlag"])[COL["target"]]
-    .mean()
-    .reset_index()
-    .pivot(index=COL["hour"], columns="_HolidayFlag", values=COL["target"])
-    .sort_index()
-)
-hourly.columns = ["Non-Holiday", "Holiday"] if len(hourly.columns) == 2 else [str(c) for c in hourly.columns]
-st.line_chart(hourly)
+st.line_chart(tables["hourly_by_holiday"])
 
 st.markdown("---")
 
 st.subheader("Overall rentals distribution (Holiday vs Non-Holiday)")
-# Streamlit doesn't have native boxplot without extra libs; use summary stats
-summary = df.groupby("_HolidayFlag")[COL["target"]].describe()[["count", "mean", "50%", "std", "min", "max"]]
-summary.index = ["Non-Holiday", "Holiday"] if len(summary.index) == 2 else summary.index
-st.dataframe(summary, use_container_width=True)
+st.caption("Percentiles are estimated from mergeable quantile sketches (within about 1% in rank).")
+st.dataframe(tables["distribution"], use_container_width=True)
+
+st.subheader("Hourly rentals distribution")
+percentiles = tables["hourly_percentiles"]
+fig = go.Figure()
+for label in percentiles.index.get_level_values("IsHoliday").unique():
+    p = percentiles.xs(label, level="IsHoliday")
+    fig.add_trace(go.Box(
+        name=label,
+        x=p.index,
+        lowerfence=p["5%"],
+        q1=p["25%"],
+        median=p["50%"],
+        q3=p["75%"],
+        upperfence=p["95%"],
+    ))
+fig.update_layout(boxmode="group", xaxis_title="Hour", yaxis_title="Rented Bike Count", margin=dict(t=10))
+st.plotly_chart(fig, use_container_width=True)
+st.caption("Boxes span the 25th–75th percentiles; whiskers the 5th–95th.")
 
 st.markdown("---")
 
 st.subheader("Weekday vs Weekend (based on Date)")
-if "IsWeekend" in df.columns:
-    weekend_hourly = (
-        df.groupby([COL["hour"], "IsWeekend"])[COL["target"]]
-        .mean()
-        .reset_index()
-        .pivot(index=COL["hour"], columns="IsWeekend", values=COL["target"])
-        .sort_index()
-    )
-    weekend_hourly.columns = ["Weekday", "Weekend"] if len(weekend_hourly.columns) == 2 else [str(c) for c in weekend_hourly.columns]
-    st.line_chart(weekend_hourly)
+if "hourly_by_weekend" in tables:
+    st.line_chart(tables["hourly_by_weekend"])
 else:
     st.info("Weekend features are unavailable because Date column could not be parsed.")
@@ -2,16 +2,18 @@ import os
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
+import plotly.express as px
 import streamlit as st
-import pandas as pd
+from core import metrics
 from utils import (
-    load_data,
-    harmonize_columns,
-    standardize_types,
-    filter_functioning_days,
-    add_time_features,
-    COL,
+    load_summary,
+    begin_page,
+    derived,
+    interactive_section,
+    page_stage,
     validate_required_columns,
+    weather_bucket_controls,
+    COL,
 )
 
 st.title("4) Weather & Season")
@@ -19,49 +21,105 @@ st.caption("Understand how external factors (season and weather) relate to renta
 
 data_path = st.session_state.get("data_path", "data/seoulbike_cleaned.csv")
 apply_filter = st.session_state.get("apply_filter", True)
+begin_page("4_weather_and_season")
+
+with page_stage("load_summary"):
+    summary = load_summary(data_path, apply_filter)
+
+validate_required_columns(summary.preview, ["target", "season", "date"])
+weather_key, edges = weather_bucket_controls(summary)
+
+# Slicing for the correlation view below; the widget is drawn further down but
+# its value is already in session_state on reruns.
+SLICES = {
+    "Season × Holiday": [COL["season"], "IsHoliday"],
+    "Season": [COL["season"]],
+    "Holiday": ["IsHoliday"],
+    "All data": [],
+}
 
-df = load_data(data_path)
-df = harmonize_columns(df)
-df = standardize_types(df)
-if apply_filter:
-    df = filter_functioning_days(df)
-df = add_time_features(df)
 
-validate_required_columns(df, ["target", "season", "date"])
+def weather_tables(slice_name: str):
+    return derived(
+        "weather_and_season",
+        {"weather_key": weather_key, "edges": tuple(edges), "slice": slice_name},
+        lambda: metrics.weather_and_season(
+            summary,
+            bucket_edges={weather_key: edges} if weather_key else None,
+            slice_by=SLICES[slice_name],
+        )["tables"],
+        depends_on=["summary"],
+    )
+
+
+tables = weather_tables(st.session_state.get("weather_slice", next(iter(SLICES))))
 
 st.subheader("Average rentals by season")
-season_avg = df.groupby(COL["season"])[COL["target"]].mean().sort_values(ascending=False)
-st.bar_chart(season_avg)
+st.bar_chart(tables["season"])
 
 st.markdown("---")
 
 st.subheader("Monthly trend (average rentals)")
-if "Month" in df.columns and df["Month"].notna().any():
-    monthly = df.groupby("Month")[COL["target"]].mean().sort_index()
-    st.line_chart(monthly)
+if "monthly" in tables:
+    st.line_chart(tables["monthly"])
 else:
     st.info("Month feature is unavailable because Date column could not be parsed.")
 
 st.markdown("---")
 
-# Optional: Weather proxy using Rainfall/Snowfall if available
-weather_cols_available = [c for c in [COL["rainfall"], COL["snowfall"]] if c in df.columns]
-if weather_cols_available:
-    st.subheader("Weather effect (Rainfall / Snowfall)")
+# Weather effect for the variable and bucket edges picked in the sidebar,
+# rolled up from pre-binned histograms (no pass over the rows).
+if weather_key:
+    st.subheader(f"Weather effect ({COL[weather_key]})")
+    buckets = tables[f"{weather_key}_buckets"]
     col1, col2 = st.columns(2)
 
-    if COL["rainfall"] in df.columns:
-        with col1:
-            st.write("Avg rentals by Rainfall bucket")
-            bucket = pd.cut(df[COL["rainfall"]].fillna(0), bins=[-0.01, 0, 5, 20, 1000], labels=["0", "0-5", "5-20", ">20"])
-            rain_avg = df.groupby(bucket)[COL["target"]].mean()
-            st.bar_chart(rain_avg)
-
-    if COL["snowfall"] in df.columns:
-        with col2:
-            st.write("Avg rentals by Snowfall bucket")
-            bucket = pd.cut(df[COL["snowfall"]].fillna(0), bins=[-0.01, 0, 1, 5, 1000], labels=["0", "0-1", "1-5", ">5"])
-            snow_avg = df.groupby(bucket)[COL["target"]].mean()
-            st.bar_chart(snow_avg)
+    with col1:
+        st.write("Avg rentals by bucket")
+        st.bar_chart(buckets["mean"].rename(COL["target"]).dropna())
+
+    with col2:
+        st.write("Hours per bucket")
+        st.bar_chart(buckets["count"].rename("Hours"))
+    st.caption("Change the variable and bucket edges in the sidebar.")
+else:
+    st.info("Weather columns (temperature, humidity, rainfall, ...) are not available in this dataset.")
+
+st.markdown("---")
+
+st.subheader("Weather vs demand: correlation & regression")
+
+
+@interactive_section("weather_fit")
+def weather_fit_section() -> None:
+    c1, c2 = st.columns(2)
+    tables = weather_tables(c1.selectbox("Slice by", list(SLICES), key="weather_slice"))
+    view = c2.radio(
+        "Show",
+        ["Correlation", "Standardized coefficient"],
+        horizontal=True,
+        key="weather_view",
+        help="Standardized: change in demand (in SDs) per SD of the weather variable, "
+        "holding the other weather variables fixed.",
+    )
+    heat = tables["weather_correlation"] if view == "Correlation" else tables["weather_std_coefficients"]
+    fig = px.imshow(
+        heat.astype(float),
+        color_continuous_scale="RdBu",
+        zmin=-1,
+        zmax=1,
+        text_auto=".2f",
+        aspect="auto",
+    )
+    fig.update_layout(margin=dict(t=10), coloraxis_colorbar_title="")
+    st.plotly_chart(fig, use_container_width=True)
+
+    with st.expander("Least-squares coefficients per slice"):
+        st.dataframe(tables["weather_regression"], use_container_width=True)
+    st.caption("Blank cells: the variable is constant in that slice (e.g. no snowfall in summer).")
+
+
+if "weather_correlation" in tables:
+    weather_fit_section()
 else:
-    st.info("Weather columns (Rainfall/Snowfall) are not available in this dataset.")
+    st.info("Weather columns are not available in this dataset.")
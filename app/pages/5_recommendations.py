@@ -2,14 +2,21 @@ import os
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
+import plotly.express as px
 import streamlit as st
+from core import metrics
 from utils import (
-    load_data,
-    harmonize_columns,
-    standardize_types,
-    filter_functioning_days,
-    add_time_features,
-    COL,
+    ALL_SEASONS,
+    DAY_TYPES,
+    load_summary,
+    begin_page,
+    derived,
+    interactive_section,
+    page_stage,
+    pivot_slots,
+    plan_grid,
+    row_filter,
+    select_slots,
     validate_required_columns,
 )
 
@@ -18,15 +25,12 @@ st.caption("Operational playbook and simple planning calculator (portfolio-frien
 
 data_path = st.session_state.get("data_path", "data/seoulbike_cleaned.csv")
 apply_filter = st.session_state.get("apply_filter", True)
+begin_page("5_recommendations")
 
-df = load_data(data_path)
-df = harmonize_columns(df)
-df = standardize_types(df)
-if apply_filter:
-    df = filter_functioning_days(df)
-df = add_time_features(df)
+with page_stage("load_summary"):
+    summary = load_summary(data_path, apply_filter)
 
-validate_required_columns(df, ["target", "hour", "holiday", "season", "date"])
+validate_required_columns(summary.preview, ["target", "hour", "holiday", "season", "date"])
 
 st.subheader("Actionable Insights (high-level)")
 st.markdown(
@@ -40,32 +44,85 @@ st.markdown(
 st.markdown("---")
 st.subheader("Simple Planner: Morning Peak Buffer (Workdays)")
 
-# Build workday subset (Non-Holiday + Weekday)
-holiday_col = COL["holiday"]
-s = df[holiday_col].astype(str).str.strip().str.lower()
-df["_HolidayFlag"] = s.isin({"holiday", "yes", "true", "1", "y"})
+# Workday (Non-Holiday, not weekend) demand during 07-09 depends on the data
+# only; the slider section reruns by itself and just applies the buffer.
+avg_peak = derived("workday_peak", {}, lambda: metrics.workday_peak_demand(summary), depends_on=["summary"])
 
-# Workday: Non-Holiday and not weekend (if possible)
-workday_df = df[df["_HolidayFlag"] == False]
-if "IsWeekend" in workday_df.columns:
-    workday_df = workday_df[workday_df["IsWeekend"] == False]
 
-# Focus hours 7-9
-peak_df = workday_df[workday_df[COL["hour"]].between(7, 9)]
-avg_peak = float(peak_df[COL["target"]].mean()) if len(peak_df) else float("nan")
+@interactive_section("buffer")
+def buffer_section() -> None:
+    buffer_pct = st.slider("Buffer (%) to avoid stockouts", min_value=0, max_value=50, value=10, step=1)
+    kpis = metrics.buffer_plan(avg_peak, buffer_pct)
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Avg Peak Demand (07–09)", f"{kpis['avg_peak_demand']:,.0f}")
+    c2.metric("Recommended Availability", f"{kpis['recommended_availability']:,.0f}")
+    c3.metric("Additional Bikes", f"{kpis['additional_bikes']:,.0f}")
 
-if not (avg_peak == avg_peak):  # NaN check
+
+if avg_peak == avg_peak:  # NaN check
+    buffer_section()
+elif not row_filter().is_empty():
+    st.info(
+        f"No workday hours between 07:00 and 09:00 match the current filters ({row_filter().describe()}), "
+        "so there is no morning-peak average to buffer. The scenario planner below still covers them."
+    )
+else:
     st.warning("Could not compute average demand during 07:00–09:00. Check Date/Hour parsing.")
-    st.stop()
 
-buffer_pct = st.slider("Buffer (%) to avoid stockouts", min_value=0, max_value=50, value=10, step=1)
-recommended = avg_peak * (1 + buffer_pct / 100)
-additional = recommended - avg_peak
+st.markdown("---")
+st.subheader("Scenario Planner: Stockout Risk by Slot")
+st.caption(
+    "Risk = share of observed demand above mean × (1 + buffer) for that hour, season and day type, "
+    "from the demand distribution rather than its average. Every buffer level is evaluated at once; "
+    "changing the selection only slices the precomputed grid."
+)
+
+grid = derived("plan_grid", {}, lambda: plan_grid(data_path, apply_filter), depends_on=["summary"])
+
+
+@interactive_section("scenario_planner")
+def scenario_section() -> None:
+    seasons = [s for s in grid.slots.unique(level="Season") if s != ALL_SEASONS]
+    c1, c2, c3 = st.columns(3)
+    season = c1.selectbox("Season", [ALL_SEASONS] + seasons, key="plan_season")
+    pairs = set(zip(grid.slots.get_level_values("Season"), grid.slots.get_level_values("DayType")))
+    days = [d for d in DAY_TYPES if (season, d) in pairs]
+    day = c2.selectbox("Day type", days, key="plan_day")
+    service_level = c3.select_slider(
+        "Service level",
+        options=[0.8, 0.9, 0.95, 0.99],
+        value=0.95,
+        format_func=lambda v: f"{v:.0%}",
+        key="plan_service_level",
+    )
+
+    tables = derived(
+        "scenario_plan",
+        {"service_level": service_level},
+        lambda: metrics.scenario_plan(summary, service_level=service_level, grid=grid)["tables"],
+        depends_on=["plan_grid"],
+    )
+    risk = select_slots(tables["risk"], season, day)
+    fig = px.imshow(
+        risk.T,
+        color_continuous_scale="Reds",
+        zmin=0,
+        zmax=1,
+        origin="lower",
+        aspect="auto",
+        labels=dict(x="Hour", y="Buffer (%)", color="Stockout risk"),
+    )
+    fig.update_layout(margin=dict(t=10))
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.markdown(f"**Buffer (% above the slot mean) for a {service_level:.0%} service level — {day}s**")
+    st.dataframe(pivot_slots(tables["slots"], day, "required_buffer_pct").round(0), use_container_width=True)
+
 
-c1, c2, c3 = st.columns(3)
-c1.metric("Avg Peak Demand (07–09)", f"{avg_peak:,.0f}")
-c2.metric("Recommended Availability", f"{recommended:,.0f}")
-c3.metric("Additional Bikes", f"{additional:,.0f}")
+if len(grid.slots):
+    scenario_section()
+else:
+    st.info("Scenario planning needs hourly demand per slot; none is available for this dataset.")
 
 st.info(
     "Note: This planner is simplified for portfolio purposes. In production, you would incorporate "
@@ -0,0 +1,93 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import pandas as pd
+import streamlit as st
+
+from core import profiling
+from utils import dataset_store, derived_tables, session_id
+
+st.title("6) Diagnostics")
+st.caption("Per-stage wall time, rows in/out and memory delta of the data pipeline and page computations.")
+
+if not st.session_state.get("profiling", False):
+    st.info("Profiling is off. Enable it in the sidebar of the main page, then open the pages you want to measure.")
+
+st.subheader("Dataset store")
+st.caption("Prepared frames and filter indexes shared by all sessions; least recently used entries are evicted over budget.")
+store = dataset_store()
+stats = store.stats()
+c1, c2, c3, c4, c5 = st.columns(5)
+c1.metric("Entries", f"{stats['entries']:,}")
+c2.metric("Memory", f"{stats['bytes'] / 2**20:,.1f} / {stats['budget_bytes'] / 2**20:,.0f} MB")
+c3.metric("Hits", f"{stats['hits']:,}")
+c4.metric("Misses", f"{stats['misses']:,}")
+c5.metric("Evictions", f"{stats['evictions']:,}", help=f"{stats['stale']:,} more entries replaced by a newer file version")
+if stats["entries"]:
+    st.dataframe(pd.DataFrame(store.entries()), use_container_width=True, hide_index=True)
+if st.button("Clear dataset store"):
+    store.clear()
+    st.rerun()
+
+st.subheader("Derived tables (this session)")
+st.caption(
+    "Page results memoized on their declared inputs; a table recomputes only when an input or a "
+    "table it depends on changed. last_changed lists the inputs behind its latest recompute."
+)
+derived_stats = derived_tables().stats()
+if derived_stats:
+    st.dataframe(pd.DataFrame(derived_stats), use_container_width=True, hide_index=True)
+else:
+    st.write("No derived tables yet; open a page first.")
+if st.button("Clear derived tables"):
+    derived_tables().invalidate()
+    st.rerun()
+
+st.markdown("---")
+st.subheader("Pipeline profiling (this session)")
+recs = profiling.records(session=session_id())
+if not recs:
+    st.write("No profiling records yet.")
+    st.stop()
+
+df = pd.DataFrame(recs)
+df["time"] = pd.to_datetime(df["ts"], unit="s")
+
+c1, c2, c3 = st.columns(3)
+c1.metric("Records", f"{len(df):,}")
+c2.metric("Reruns", f"{df['run'].nunique():,}")
+c3.metric("Total stage time", f"{df['wall_ms'].sum():,.0f} ms")
+
+st.markdown("---")
+st.subheader("Latest rerun per page")
+latest_runs = df.sort_values("ts").groupby("page")["run"].last()
+latest = df[df["run"].isin(latest_runs)]
+st.dataframe(
+    latest[[c for c in ["page", "stage", "wall_ms", "rows_in", "rows_out", "memo", "rss_delta_bytes"] if c in latest]],
+    use_container_width=True,
+)
+
+st.markdown("---")
+st.subheader("Stage summary (all reruns)")
+by_stage = (
+    df.groupby(["page", "stage"])["wall_ms"]
+    .agg(calls="count", mean_ms="mean", p95_ms=lambda s: s.quantile(0.95), max_ms="max")
+    .sort_values("mean_ms", ascending=False)
+)
+st.dataframe(by_stage, use_container_width=True)
+st.bar_chart(by_stage["mean_ms"].droplevel("page").groupby(level=0).max().sort_values(ascending=False))
+
+st.markdown("---")
+col1, col2 = st.columns(2)
+with col1:
+    st.download_button(
+        "Download records (JSON lines)",
+        data=profiling.to_jsonl(recs),
+        file_name="profiling.jsonl",
+        mime="application/jsonl",
+    )
+with col2:
+    if st.button("Clear records"):
+        profiling.clear(session=session_id())
+        st.rerun()
@@ -0,0 +1,120 @@
+"""
+Batch report: every page's KPIs and tables for one or many datasets, no Streamlit.
+
+Usage:
+    python app/report.py data/seoulbike_cleaned.csv [more.csv ...] [--out reports]
+                         [--no-filter] [--stream] [--chunk-rows 200000]
+                         [--parallel] [--workers N]
+
+A dataset may also be a directory of CSVs or a glob pattern (with --parallel).
+
+For each dataset, writes <out>/<stem>/<page>.json (KPIs) and
+<out>/<stem>/<page>__<table>.csv (tables). Pages whose columns the dataset
+lacks are written with a "skipped" reason. A dataset that fails does not
+stop the batch: its error goes to stderr and to <out>/failures.json.
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from core import (
+    DEFAULT_CHUNK_ROWS,
+    DatasetError,
+    compute_report,
+    default_workers,
+    prepare_frame,
+    summarize_frame,
+    summarize_parallel,
+    summarize_stream,
+)
+
+
+def _jsonable(value):
+    """KPI value as JSON: NaT/NaN become null, timestamps ISO strings."""
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if value is None or (pd.api.types.is_scalar(value) and pd.isna(value)):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if hasattr(value, "item"):  # numpy scalars
+        value = value.item()
+    return value
+
+
+def write_report(report: Dict[str, Dict[str, Dict]], out_dir: str) -> List[str]:
+    """Write one dataset's report; returns the files written."""
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+    for page, result in report.items():
+        path = os.path.join(out_dir, f"{page}.json")
+        with open(path, "w") as f:
+            json.dump({k: _jsonable(v) for k, v in result["kpis"].items()}, f, indent=2)
+        written.append(path)
+        for name, table in result["tables"].items():
+            path = os.path.join(out_dir, f"{page}__{name}.csv")
+            table.to_csv(path)
+            written.append(path)
+    return written
+
+
+def run(
+    path: str,
+    out: str,
+    apply_filter: bool,
+    stream: bool,
+    chunk_rows: int,
+    workers: Optional[int] = None,
+) -> List[str]:
+    if workers is not None:
+        summary = summarize_parallel(path, apply_filter, workers)
+    elif stream:
+        summary = summarize_stream(path, apply_filter, chunk_rows)
+    else:
+        summary = summarize_frame(prepare_frame(path, apply_filter))
+    stem = os.path.splitext(os.path.basename(os.path.normpath(path)))[0].strip("*") or "dataset"
+    return write_report(compute_report(summary), os.path.join(out, stem))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("paths", nargs="+", help="CSV dataset(s)")
+    parser.add_argument("--out", default="reports", help="output directory")
+    parser.add_argument("--no-filter", action="store_true", help="keep non-functioning days")
+    parser.add_argument("--stream", action="store_true", help="summarize in chunks (bounded memory; quantiles from mergeable sketches)")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--parallel", action="store_true", help="summarize partitions in a process pool")
+    parser.add_argument("--workers", type=int, default=None, help="pool size (default: all cores)")
+    args = parser.parse_args()
+
+    failures: Dict[str, str] = {}
+    for path in args.paths:
+        try:
+            workers = (args.workers or default_workers()) if args.parallel else None
+            written = run(path, args.out, not args.no_filter, args.stream, args.chunk_rows, workers)
+        except DatasetError as e:
+            failures[path] = str(e)
+        except Exception as e:  # one bad dataset must not abort the batch
+            failures[path] = f"{type(e).__name__}: {e}"
+        else:
+            print(f"{path}: {len(written)} files -> {os.path.dirname(written[0])}")
+            continue
+        print(f"{path}: {failures[path]}", file=sys.stderr)
+
+    failures_path = os.path.join(args.out, "failures.json")
+    if failures:
+        os.makedirs(args.out, exist_ok=True)
+        with open(failures_path, "w") as f:
+            json.dump(failures, f, indent=2)
+        print(f"{len(failures)} of {len(args.paths)} datasets failed -> {failures_path}", file=sys.stderr)
+    elif os.path.exists(failures_path):
+        os.remove(failures_path)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
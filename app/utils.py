@@ -1,229 +1,364 @@
 from __future__ import annotations
 
+# Streamlit layer over the `core` package: caching keyed on the dataset
+# version, error display and sidebar/session-state helpers. All computation
+# lives in core; names pages use are re-exported from here.
+
+import functools
 import os
-from typing import Dict, List
+import threading
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple, TypeVar
 
 import pandas as pd
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from core import profiling
+from core.aggregates import (
+    DEFAULT_WEATHER_EDGES,
+    WEATHER_GRID,
+    DatasetSummary,
+    extend_summary,
+    snap_edges,
+    summarize_frame,
+)
+from core.derived import DerivedTables
+from core.downsample import DEFAULT_CHART_POINTS, DOWNSAMPLE_METHODS, downsample_series
+from core.filters import FilterIndex, RowFilter, select_rows
+from core.ingest import (
+    DEFAULT_CHUNK_ROWS,
+    IncrementalState,
+    concat_prepared,
+    refresh_incremental,
+    summarize_stream,
+)
+from core.io import DatasetError, dataset_version, prepare_frame
+from core.parallel import default_workers, partitions_version, summarize_parallel
+from core.pipeline import COL, memory_footprint, missing_columns
+from core.planner import ALL_SEASONS, DAY_TYPES, PlanGrid, build_plan_grid, pivot_slots, select_slots
+from core.rollups import build_rollups
+from core.store import DEFAULT_BUDGET_MB, DatasetStore
+
+# The app shares prepared frames across reruns and sessions as shallow
+# copies, which is only safe under Copy-on-Write (always on from pandas 3).
+if int(pd.__version__.split(".")[0]) == 2:
+    pd.set_option("mode.copy_on_write", True)
+
+INGEST_MODES: List[str] = [
+    "In-memory",
+    "Streaming (chunked)",
+    "Incremental (append-only)",
+    "Parallel (process pool)",
+]
+
+T = TypeVar("T")
+
+
+def _or_stop(fn, *args):
+    """Call into core, rendering a DatasetError on the page and stopping it."""
+    try:
+        return fn(*args)
+    except DatasetError as e:
+        st.error(str(e))
+        st.stop()
+
+
+@st.cache_resource(show_spinner=False)
+def dataset_store() -> DatasetStore:
+    """
+    Process-wide store of prepared frames and filter indexes, shared by all
+    sessions without copies (unlike st.cache_data, which unpickles a fresh
+    copy per hit). Budget: SEOULBIKE_STORE_MB (default DEFAULT_BUDGET_MB).
+    """
+    return DatasetStore(int(os.environ.get("SEOULBIKE_STORE_MB", DEFAULT_BUDGET_MB)) << 20)
 
 
-# Canonical column keys used throughout the app
-# You can adjust these canonical names, but keep the keys stable.
-COL: Dict[str, str] = {
-    "date": "Date",
-    "target": "Rented Bike Count",
-    "hour": "Hour",
-    "season": "Seasons",
-    "holiday": "Holiday",
-    "functioning_day": "Functioning Day",
-    # optional / sometimes present:
-    "temp": "Temperature(°C)",
-    "humidity": "Humidity(%)",
-    "wind": "Wind speed (m/s)",
-    "visibility": "Visibility (10m)",
-    "dew_point": "Dew point temperature(°C)",
-    "solar": "Solar Radiation (MJ/m2)",
-    "rainfall": "Rainfall(mm)",
-    "snowfall": "Snowfall (cm)",
-}
-
-
-def _norm(s: str) -> str:
-    """Normalize a column name for fuzzy matching."""
-    return (
-        str(s)
-        .strip()
-        .lower()
-        .replace("(", "")
-        .replace(")", "")
-        .replace("°", "")
-        .replace("%", "")
-        .replace("/", " ")
-        .replace("-", " ")
-        .replace("__", "_")
-        .replace("  ", " ")
-        .replace("_", " ")
-        .replace(".", " ")
-        .replace(",", " ")
-        .replace(":", " ")
-        .strip()
+def prepare_dataset(path: str, apply_filter: bool = True) -> pd.DataFrame:
+    """
+    Load and prepare the dataset, memoized per (path, mtime, size, filter) in
+    the shared store. This is the single entry point pages should use; reruns
+    and other sessions get the same frame instead of re-parsing or copying it.
+    Callers may modify their frame; Copy-on-Write keeps the shared one intact.
+    """
+    apply_filter = bool(apply_filter)
+    return dataset_store().get(
+        ("prepared", path, apply_filter),
+        dataset_version(path),
+        lambda: _or_stop(prepare_frame, path, apply_filter),
     )
 
 
-def _build_normalized_lookup(columns: List[str]) -> Dict[str, str]:
-    """Map normalized -> original column name."""
-    lookup: Dict[str, str] = {}
-    for c in columns:
-        lookup[_norm(c)] = c
-    return lookup
-
-
-def harmonize_columns(df: pd.DataFrame) -> pd.DataFrame:
-    """
-    Align common variations of column names to canonical names in COL.
-    This prevents KPI 'N/A' caused by mismatched column labels.
-    """
-    df = df.copy()
-
-    # strip whitespace in columns
-    df.columns = [str(c).strip() for c in df.columns]
-    lookup = _build_normalized_lookup(list(df.columns))
-
-    # Define candidates for each canonical field (normalized forms)
-    candidates = {
-        "date": [
-            "date",
-            "datetime",
-            "timestamp",
-        ],
-        "target": [
-            "rented bike count",
-            "rentedbikecount",
-            "rented_bike_count",
-            "rent bike count",
-            "rentbikecount",
-            "bike count",
-            "bike rental count",
-            "rental count",
-            "count",
-        ],
-        "hour": ["hour", "hr"],
-        "season": ["seasons", "season"],
-        "holiday": ["holiday", "is holiday", "is_holiday"],
-        "functioning_day": ["functioning day", "functioningday", "operating day", "operational day"],
-        "temp": ["temperature c", "temperature", "temp c", "temp"],
-        "humidity": ["humidity", "humidity percent"],
-        "wind": ["wind speed m s", "wind speed", "windspeed"],
-        "visibility": ["visibility 10m", "visibility"],
-        "dew_point": ["dew point temperature c", "dew point temperature", "dew point"],
-        "solar": ["solar radiation mj m2", "solar radiation"],
-        "rainfall": ["rainfall mm", "rainfall"],
-        "snowfall": ["snowfall cm", "snowfall"],
-    }
+@st.cache_data(show_spinner=False)
+def _prepare_summary_cached(path: str, version: Tuple[int, int], apply_filter: bool) -> DatasetSummary:
+    return summarize_frame(prepare_dataset(path, apply_filter))
+
+
+@st.cache_data(show_spinner=False)
+def _stream_summary_cached(
+    path: str, version: Tuple[int, int], apply_filter: bool, chunk_rows: int, row_filter: RowFilter
+) -> DatasetSummary:
+    return _or_stop(summarize_stream, path, apply_filter, chunk_rows, row_filter)
 
-    rename_map: Dict[str, str] = {}
-
-    for key, canon in COL.items():
-        if canon in df.columns:
-            continue  # already canonical
 
-        # try candidate matches
-        for cand in candidates.get(key, []):
-            cand_norm = _norm(cand)
-            if cand_norm in lookup:
-                rename_map[lookup[cand_norm]] = canon
-                break
+@st.cache_data(show_spinner=False)
+def _parallel_summary_cached(
+    path: str, version: Tuple[Tuple[int, int], ...], apply_filter: bool, workers: int, row_filter: RowFilter
+) -> DatasetSummary:
+    return _or_stop(summarize_parallel, path, apply_filter, workers, row_filter)
+
+
+def _filter_index(path: str, version: Tuple[int, int], apply_filter: bool) -> FilterIndex:
+    """Read-only index over the prepared dataset, shared by all sessions."""
+
+    def build() -> FilterIndex:
+        with profiling.stage("build_filter_index"):
+            return FilterIndex(prepare_dataset(path, apply_filter))
+
+    return dataset_store().get(("filter_index", path, apply_filter), version, build)
+
+
+def _filtered(df: pd.DataFrame, row_filter: RowFilter, index: FilterIndex) -> DatasetSummary:
+    with profiling.stage("filter_rows", rows_in=len(df)) as rec:
+        rows = select_rows(df, row_filter, index)
+        rec["rows_out"] = len(rows)
+    return summarize_frame(rows)
 
-        # special handling: some datasets use underscores heavily
-        if canon not in df.columns:
-            # try exact normalized match of the canonical name itself
-            canon_norm = _norm(canon)
-            if canon_norm in lookup and lookup[canon_norm] != canon:
-                rename_map[lookup[canon_norm]] = canon
 
-    if rename_map:
-        df = df.rename(columns=rename_map)
+@st.cache_data(show_spinner=False, max_entries=64)
+def _filtered_summary_cached(
+    path: str, version: Tuple[int, int], apply_filter: bool, row_filter: RowFilter
+) -> DatasetSummary:
+    index = _filter_index(path, version, apply_filter)
+    return _filtered(prepare_dataset(path, apply_filter), row_filter, index)
 
-    return df
 
+def prepare_summary(path: str, apply_filter: bool = True) -> DatasetSummary:
+    """Summary of the in-memory prepared dataset, built once per dataset version."""
+    return _prepare_summary_cached(path, dataset_version(path), bool(apply_filter))
 
-def standardize_types(df: pd.DataFrame) -> pd.DataFrame:
+
+@st.cache_resource(show_spinner=False)
+def _incremental_slot(path: str, apply_filter: bool) -> Dict[str, object]:
+    """
+    Process-wide mutable holder for one (path, filter) incremental state, plus
+    a filter index per state chunk and the filtered summaries as of "seen"
+    (the state object and its row count when they were last brought up to date).
     """
-    Standardize datatypes (date parsing, numerics, categoricals).
-    Safe even if some optional columns are missing.
+    return {"lock": threading.Lock(), "state": None, "seen": None, "indexes": [], "filtered": {}}
+
+
+def incremental_state(path: str, apply_filter: bool = True) -> IncrementalState:
+    """Refresh and return the shared incremental state for this dataset."""
+    slot = _incremental_slot(path, bool(apply_filter))
+    with slot["lock"]:
+        slot["state"] = _or_stop(refresh_incremental, slot["state"], path, bool(apply_filter))
+        return slot["state"]
+
+
+def _incremental_filtered(path: str, apply_filter: bool, row_filter: RowFilter) -> DatasetSummary:
+    state = incremental_state(path, apply_filter)
+    slot = _incremental_slot(path, bool(apply_filter))
+    with slot["lock"]:
+        seen = slot["seen"]
+        if seen is None or seen[0] is not state:
+            # first use or full rebuild: nothing cached applies
+            slot["indexes"], slot["filtered"] = [], {}
+        elif seen[1] != state.rows:
+            # appended rows: extend the cached summaries by just those rows
+            new_rows = state.rows_since(seen[1])
+            slot["filtered"] = {
+                f: extend_summary(summary, select_rows(new_rows, f)) for f, summary in slot["filtered"].items()
+            }
+        slot["seen"] = (state, state.rows)
+
+        if row_filter not in slot["filtered"]:
+            # indexes of chunks that were not joined since last time are reused
+            known = {id(chunk): index for chunk, index in slot["indexes"]}
+            with profiling.stage("build_filter_index"):
+                slot["indexes"] = [(c, known.get(id(c)) or FilterIndex(c)) for c in state.chunks]
+            with profiling.stage("filter_rows", rows_in=state.rows) as rec:
+                rows = concat_prepared([select_rows(c, row_filter, index) for c, index in slot["indexes"]])
+                rec["rows_out"] = len(rows)
+            slot["filtered"][row_filter] = summarize_frame(rows)
+        return slot["filtered"][row_filter]
+
+
+def begin_page(name: str) -> None:
     """
-    df = df.copy()
+    Call at the top of each page script: applies the sidebar profiling toggle,
+    starts a new profiling run for this rerun and notes active row filters.
+    """
+    profiling.enable(st.session_state.get("profiling", False))
+    profiling.start_run(name, session_id())
+    st.session_state["_profiling_page"] = name
+    if not row_filter().is_empty():
+        st.caption(f"Filtered to: {row_filter().describe()} (change in the sidebar on the main page)")
 
-    # Date
-    if COL["date"] in df.columns:
-        df[COL["date"]] = pd.to_datetime(df[COL["date"]], errors="coerce", dayfirst=True)
 
-    # Numerics: try to coerce commonly numeric fields
-    numeric_cols = [
-        COL["target"], COL["hour"],
-        COL["temp"], COL["humidity"], COL["wind"], COL["visibility"], COL["dew_point"],
-        COL["solar"], COL["rainfall"], COL["snowfall"],
-    ]
-    for c in numeric_cols:
-        if c in df.columns:
-            df[c] = pd.to_numeric(df[c], errors="coerce")
+def session_id() -> str:
+    """Id of the browser session running this script ("" outside Streamlit)."""
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else ""
 
-    # Categoricals: strip/normalize strings
-    for c in [COL["season"], COL["holiday"], COL["functioning_day"]]:
-        if c in df.columns:
-            df[c] = df[c].astype(str).str.strip()
 
-    return df
+def row_filter() -> RowFilter:
+    """Sidebar row filters (date range, season, hour, holiday) shared by all pages."""
+    return st.session_state.get("row_filter", RowFilter())
 
 
-def filter_functioning_days(df: pd.DataFrame) -> pd.DataFrame:
-    """Filter Functioning Day == Yes (robust to Yes/No variants)."""
-    df = df.copy()
-    col = COL["functioning_day"]
-    if col not in df.columns:
-        return df
+def page_stage(name: str, rows_in: Optional[int] = None):
+    """Profile a page compute block: `with page_stage("hourly"): ...`."""
+    return profiling.stage(name, rows_in=rows_in)
 
-    s = df[col].astype(str).str.strip().str.lower()
-    yes_values = {"yes", "y", "true", "1"}
-    return df[s.isin(yes_values)]
 
+def ingest_mode() -> str:
+    """Ingestion mode selected in the sidebar (one of INGEST_MODES)."""
+    return st.session_state.get("ingest_mode", INGEST_MODES[0])
 
-def add_time_features(df: pd.DataFrame) -> pd.DataFrame:
-    """Add Month, DayOfWeek, IsWeekend, TimeSlot."""
-    df = df.copy()
 
-    if COL["date"] in df.columns:
-        dt = df[COL["date"]]
-        df["Month"] = dt.dt.month
-        df["DayOfWeek"] = dt.dt.day_name()
-        df["IsWeekend"] = dt.dt.weekday >= 5
-    else:
-        # fallback columns if date not present
-        df["Month"] = pd.NA
-        df["DayOfWeek"] = pd.NA
-        df["IsWeekend"] = pd.NA
+def worker_count() -> int:
+    """Process pool size for parallel ingestion (sidebar, default: all cores)."""
+    return int(st.session_state.get("workers", default_workers()))
 
-    if COL["hour"] in df.columns:
-        h = df[COL["hour"]].fillna(-1).astype(int)
 
-        def _timeslot(x: int) -> str:
-            if 7 <= x <= 9:
-                return "Morning Peak (07-09)"
-            if 17 <= x <= 19:
-                return "Evening Peak (17-19)"
-            if 10 <= x <= 16:
-                return "Midday (10-16)"
-            if 20 <= x <= 23:
-                return "Night (20-23)"
-            if 0 <= x <= 6:
-                return "Early Morning (00-06)"
-            return "Unknown"
+def derived_tables() -> DerivedTables:
+    """This session's memo of derived tables."""
+    if "_derived_tables" not in st.session_state:
+        st.session_state["_derived_tables"] = DerivedTables()
+    return st.session_state["_derived_tables"]
 
-        df["TimeSlot"] = h.map(_timeslot)
-    else:
-        df["TimeSlot"] = "Unknown"
-
-    return df
 
+def derived(
+    name: str, inputs: Dict[str, Hashable], compute: Callable[[], T], depends_on: Iterable[str] = ()
+) -> T:
+    """
+    Session-memoized derived table (see core.derived): compute() runs only
+    when `inputs` or a table in `depends_on` changed. Profiled as stage
+    "derived:<name>" with memo "hit" or "miss".
+    """
+    tables = derived_tables()
+    before = tables.version(name)
+    with page_stage(f"derived:{name}") as rec:
+        value = tables.get(name, inputs, compute, depends_on)
+        rec["memo"] = "hit" if tables.version(name) == before else "miss"
+    return value
+
+
+def dataset_inputs(path: str, apply_filter: bool = True, f: Optional[RowFilter] = None) -> Dict[str, Hashable]:
+    """Inputs of everything derived from one dataset: file version, ingestion settings and row filter."""
+    mode = ingest_mode()
+    return {
+        "path": path,
+        "version": partitions_version(path) if mode == INGEST_MODES[3] else dataset_version(path),
+        "apply_filter": bool(apply_filter),
+        "mode": mode,
+        "chunk_rows": int(st.session_state.get("chunk_rows", DEFAULT_CHUNK_ROWS)),
+        "workers": worker_count(),
+        "row_filter": row_filter() if f is None else f,
+    }
 
-@st.cache_data(show_spinner=False)
-def load_data(path: str) -> pd.DataFrame:
-    """Load CSV with basic safety checks."""
-    if not path:
-        st.error("Dataset path is empty.")
-        st.stop()
 
-    if not os.path.exists(path):
-        st.error(f"Dataset not found at: {path}")
-        st.stop()
+def interactive_section(name: str) -> Callable[[Callable[[], None]], Callable[[], None]]:
+    """
+    Decorator for a page section whose widgets only affect that section: it
+    runs as an st.fragment, so changing them reruns the section alone.
+    Those reruns are profiled as runs of "<page>:<name>".
+    """
 
-    try:
-        df = pd.read_csv(path)
-    except Exception as e:
-        st.error(f"Failed to read CSV: {e}")
+    def wrap(fn: Callable[[], None]) -> Callable[[], None]:
+        @st.fragment
+        @functools.wraps(fn)
+        def section() -> None:
+            ctx = get_script_run_ctx()
+            if ctx is not None and getattr(ctx, "fragment_ids_this_run", None):
+                # a fragment rerun may run in a fresh thread: re-apply this session's toggle
+                profiling.enable(st.session_state.get("profiling", False))
+                profiling.start_run(f"{st.session_state.get('_profiling_page', '')}:{name}", ctx.session_id)
+            fn()
+
+        return section
+
+    return wrap
+
+
+def load_summary(path: str, apply_filter: bool = True, filtered: bool = True) -> DatasetSummary:
+    """
+    Summary for the current ingestion mode, restricted to the sidebar row
+    filters unless filtered=False. Stops the page if no rows match.
+    """
+    f = row_filter() if filtered else RowFilter()
+    summary = derived(
+        "summary" if filtered else "summary:unfiltered",
+        dataset_inputs(path, apply_filter, f),
+        lambda: _load_summary(path, bool(apply_filter), f),
+    )
+    if not summary.rows and not f.is_empty():
+        st.warning(f"No rows match the current filters ({f.describe()}).")
         st.stop()
+    return summary
+
+
+def _load_summary(path: str, apply_filter: bool, f: RowFilter) -> DatasetSummary:
+    mode = ingest_mode()
+    if mode == INGEST_MODES[1]:
+        chunk_rows = int(st.session_state.get("chunk_rows", DEFAULT_CHUNK_ROWS))
+        return _stream_summary_cached(path, dataset_version(path), apply_filter, chunk_rows, f)
+    if mode == INGEST_MODES[2]:
+        if f.is_empty():
+            return incremental_state(path, apply_filter).summary
+        return _incremental_filtered(path, apply_filter, f)
+    if mode == INGEST_MODES[3]:
+        return _parallel_summary_cached(path, partitions_version(path), apply_filter, worker_count(), f)
+    if f.is_empty():
+        return prepare_summary(path, apply_filter)
+    return _filtered_summary_cached(path, dataset_version(path), apply_filter, f)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _plan_grid_cached(
+    path: str, version: Tuple, apply_filter: bool, mode: str, chunk_rows: int, f: RowFilter
+) -> PlanGrid:
+    summary = _load_summary(path, apply_filter, f)
+    return build_plan_grid(summary.sketches, summary.cube)
+
+
+def plan_grid(path: str, apply_filter: bool = True) -> PlanGrid:
+    """
+    Scenario-planner quantile grid for the current summary. Cached per
+    dataset, mode and row filter, so widget reruns only slice its arrays.
+    """
+    mode = ingest_mode()
+    version = partitions_version(path) if mode == INGEST_MODES[3] else dataset_version(path)
+    chunk_rows = int(st.session_state.get("chunk_rows", DEFAULT_CHUNK_ROWS))
+    return _plan_grid_cached(path, version, bool(apply_filter), mode, chunk_rows, row_filter())
 
-    return df
+
+def load_frame(path: str, apply_filter: bool = True) -> Optional[pd.DataFrame]:
+    """
+    Full prepared frame (before sidebar row filters), or None in streaming and
+    parallel modes (rows are only ever held one chunk or partition at a time).
+    """
+    mode = ingest_mode()
+    if mode in (INGEST_MODES[1], INGEST_MODES[3]):
+        return None
+    if mode == INGEST_MODES[2]:
+        return incremental_state(path, apply_filter).frame
+    return prepare_dataset(path, apply_filter)
+
+
+def chart_series(series: pd.Series) -> pd.Series:
+    """
+    Downsample a long chart series to the sidebar's point budget (min/max by
+    default, so peaks stay visible), with a caption when points were dropped.
+    """
+    method = st.session_state.get("downsample", DOWNSAMPLE_METHODS[0])
+    target = int(st.session_state.get("chart_points", DEFAULT_CHART_POINTS))
+    with profiling.stage("downsample", rows_in=len(series)) as rec:
+        out = downsample_series(series, target, method)
+        rec["rows_out"] = len(out)
+    if len(out) < len(series):
+        st.caption(f"Showing {len(out):,} of {len(series):,} points ({method} downsampling).")
+    return out
 
 
 def validate_required_columns(df: pd.DataFrame, required_keys: List[str]) -> None:
@@ -232,14 +367,7 @@ def validate_required_columns(df: pd.DataFrame, required_keys: List[str]) -> Non
     required_keys are keys in COL, e.g. ["date", "target", "hour"].
     Stops the page if missing.
     """
-    missing = []
-    for k in required_keys:
-        if k not in COL:
-            missing.append(f"(unknown key) {k}")
-            continue
-        canon = COL[k]
-        if canon not in df.columns:
-            missing.append(f"{k} -> '{canon}'")
+    missing = missing_columns(list(df.columns), required_keys)
 
     if missing:
         st.error(
@@ -248,3 +376,38 @@ def validate_required_columns(df: pd.DataFrame, required_keys: List[str]) -> Non
             + "\n\nOpen 'Column list' expander to see detected columns."
         )
         st.stop()
+
+
+def weather_bucket_controls(summary: DatasetSummary) -> Tuple[Optional[str], List[float]]:
+    """
+    Sidebar picker for a weather variable and its bucket edges.
+    Returns (key in COL, edges snapped to the weather grid), or (None, [])
+    when no weather columns exist.
+    """
+    keys = [k for k in DEFAULT_WEATHER_EDGES if k in summary.weather]
+    if not keys:
+        return None, []
+    st.sidebar.header("Weather buckets")
+    key = st.sidebar.selectbox("Weather variable", keys, format_func=lambda k: COL[k], key="weather_key")
+    default = ", ".join(f"{e:g}" for e in DEFAULT_WEATHER_EDGES[key])
+    text = st.sidebar.text_input(
+        "Bucket edges",
+        value=default,
+        key=f"weather_edges_{key}",
+        help="Comma-separated upper edges; buckets are (-inf, e1], (e1, e2], ..., (en, inf).",
+    )
+    try:
+        edges = [float(e) for e in text.replace(";", ",").split(",") if e.strip()]
+    except ValueError:
+        st.sidebar.error(f"Could not parse bucket edges: {text!r}. Using the defaults.")
+        edges = list(DEFAULT_WEATHER_EDGES[key])
+    low, high, step = WEATHER_GRID[key]
+    snapped, dropped = snap_edges(key, edges)
+    if dropped:
+        st.sidebar.warning(
+            f"Ignoring edges outside {low:g}–{high:g}, the range the {COL[key]} histogram covers: "
+            f"{', '.join(f'{e:g}' for e in dropped)}. Values beyond it fall in the first or last bucket."
+        )
+    if snapped != sorted(set(edges) - set(dropped)):
+        st.sidebar.caption(f"Edges snapped to steps of {step:g}: {', '.join(f'{e:g}' for e in snapped)}")
+    return key, snapped
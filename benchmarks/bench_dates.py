@@ -0,0 +1,55 @@
+"""
+Date parsing: pd.to_datetime(dayfirst=True) on every row vs parse_dates.
+
+Usage:
+    python benchmarks/bench_dates.py [--rows 100000 1000000] [--days 365]
+
+Each row holds one of --days distinct dates, as in hourly or station data.
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from core.pipeline import parse_dates  # noqa: E402
+
+
+def _best_of(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    # the legacy call warns that dayfirst cannot apply to ISO strings
+    warnings.filterwarnings("ignore", message=".*dayfirst.*")
+    rng = np.random.default_rng(0)
+    days = pd.date_range("2017-12-01", periods=args.days, freq="D")
+
+    print(f"{'format':<10} {'rows':>11}  {'to_datetime':>12}  {'parse_dates':>12}  {'speedup':>8}  coerced")
+    for label, fmt in [("ISO", "%Y-%m-%d"), ("d/m/Y", "%d/%m/%Y")]:
+        strings = days.strftime(fmt).to_numpy(dtype=object)
+        for n in args.rows:
+            s = pd.Series(strings[rng.integers(0, len(strings), n)])
+            t_old = _best_of(lambda: pd.to_datetime(s, errors="coerce", dayfirst=True))
+            t_new = _best_of(lambda: parse_dates(s))
+            _, coerced = parse_dates(s)
+            print(f"{label:<10} {n:>11,}  {t_old * 1e3:>10.1f}ms  {t_new * 1e3:>10.1f}ms  "
+                  f"{t_old / t_new:>7.1f}x  {coerced}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Chart downsampling: points, JSON payload and time for min/max and LTTB.
+
+Usage:
+    python benchmarks/bench_downsample.py [--years 20] [--points 2000]
+
+Builds a synthetic hourly series (daily and seasonal cycles plus noise and a
+few spikes) and reports, per method, the output size and whether the global
+maximum and minimum survived.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from core.downsample import DOWNSAMPLE_METHODS, downsample_series  # noqa: E402
+
+
+def _series(years: int, seed: int = 0) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2000-01-01", periods=years * 8760, freq="h")
+    t = np.arange(len(idx))
+    y = 700 + 500 * np.sin(2 * np.pi * t / 24) + 300 * np.sin(2 * np.pi * t / 8760) + rng.normal(0, 80, len(t))
+    y[rng.integers(0, len(t), 10)] += 3000
+    return pd.Series(y.clip(0), index=idx, name="Rented Bike Count")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--years", type=int, default=20)
+    parser.add_argument("--points", type=int, default=2000)
+    args = parser.parse_args()
+
+    s = _series(args.years)
+    for method in DOWNSAMPLE_METHODS:
+        t0 = time.perf_counter()
+        out = downsample_series(s, args.points, method)
+        ms = (time.perf_counter() - t0) * 1000
+        payload = len(out.to_json(date_format="iso"))
+        print(
+            f"{method:8s} points {len(out):>9,}  payload {payload / 1e6:7.2f} MB  {ms:7.1f} ms  "
+            f"max kept: {out.max() == s.max()}  min kept: {out.min() == s.min()}"
+        )
+
+
+if __name__ == "__main__":
+    main()
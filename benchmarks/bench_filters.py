@@ -0,0 +1,72 @@
+"""
+Sidebar filters: boolean-mask scan vs FilterIndex lookups.
+
+Usage:
+    python benchmarks/bench_filters.py [path/to/dataset.csv] [--repeat 200] [--queries 200]
+
+--repeat stacks the prepared dataset N times. Random date/season/hour/holiday
+combinations are answered both ways and checked for identical rows.
+"""
+import argparse
+import datetime as dt
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from core.filters import FilterIndex, RowFilter  # noqa: E402
+from core.io import prepare_frame  # noqa: E402
+from core.pipeline import COL  # noqa: E402
+
+
+def _random_filters(df: pd.DataFrame, n: int, seed: int = 0):
+    rng = random.Random(seed)
+    lo, hi = df[COL["date"]].min().date(), df[COL["date"]].max().date()
+    seasons = sorted(df[COL["season"]].dropna().unique().astype(str))
+    for _ in range(n):
+        start = lo + dt.timedelta(days=rng.randint(0, (hi - lo).days))
+        h0 = rng.randint(0, 23)
+        yield RowFilter(
+            date_range=rng.choice([None, (start, start + dt.timedelta(days=rng.randint(0, 30)))]),
+            seasons=rng.choice([None, tuple(rng.sample(seasons, rng.randint(1, len(seasons))))]),
+            hours=rng.choice([None, (h0, min(23, h0 + rng.randint(0, 4)))]),
+            holiday=rng.choice([None, False, True]),
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", nargs="?", default="data/seoulbike_cleaned.csv")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    df = prepare_frame(args.path)
+    df = pd.concat([df] * args.repeat, ignore_index=True)
+    t0 = time.perf_counter()
+    index = FilterIndex(df)
+    print(f"rows: {len(df):,}  index build: {(time.perf_counter() - t0) * 1000:.0f} ms, {index.nbytes / 1e6:.1f} MB")
+
+    scan = lookup = 0.0
+    sizes = []
+    for f in _random_filters(df, args.queries):
+        t0 = time.perf_counter()
+        expected = np.flatnonzero(f.mask(df))
+        scan += time.perf_counter() - t0
+        t0 = time.perf_counter()
+        got = index.positions(f)
+        lookup += time.perf_counter() - t0
+        assert np.array_equal(expected, got), f
+        sizes.append(len(got))
+    n = args.queries
+    print(f"median result: {int(np.median(sizes)):,} rows")
+    print(f"mask scan : {scan / n * 1000:8.2f} ms/query")
+    print(f"index     : {lookup / n * 1000:8.2f} ms/query  (identical rows)")
+
+
+if __name__ == "__main__":
+    main()
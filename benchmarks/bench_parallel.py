@@ -0,0 +1,54 @@
+"""
+Parallel ingestion scaling: summarize_parallel wall time per worker count.
+
+Usage:
+    python benchmarks/bench_parallel.py [path/to/dataset.csv] [--repeat 50] [--workers 1 2 4 8]
+
+--repeat stacks the CSV N times into a temporary file so partitions have
+enough rows to amortize process start-up. Each run is checked against the
+single-process summary.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+import pandas as pd  # noqa: E402
+from core.metrics import compute_report  # noqa: E402
+from core.parallel import plan_partitions, summarize_parallel  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", nargs="?", default="data/seoulbike_cleaned.csv")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    raw = pd.read_csv(args.path)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "stacked.csv")
+        pd.concat([raw] * args.repeat, ignore_index=True).to_csv(path, index=False)
+        print(f"rows: {len(raw) * args.repeat:,}  file: {os.path.getsize(path) / 1e6:.1f} MB  cores: {os.cpu_count()}")
+
+        base_time = None
+        expected = None
+        for workers in args.workers:
+            t0 = time.perf_counter()
+            summary = summarize_parallel(path, True, workers)
+            seconds = time.perf_counter() - t0
+            kpis = {p: r["kpis"] for p, r in compute_report(summary).items()}
+            expected = expected or kpis
+            base_time = base_time or seconds
+            print(
+                f"workers={workers:<3} partitions={len(plan_partitions([path], workers)):<4}"
+                f" {seconds:7.2f} s  speedup {base_time / seconds:4.1f}x"
+                f"  {'same' if kpis == expected else 'DIFFERENT'}"
+            )
+
+
+if __name__ == "__main__":
+    main()
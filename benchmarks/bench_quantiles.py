@@ -0,0 +1,61 @@
+"""
+Quantile sketch accuracy vs exact quantiles, per sketch size and partitioning.
+
+Usage:
+    python benchmarks/bench_quantiles.py [path/to/dataset.csv] [--repeat 20] [--k 50 100 200 400]
+                                         [--parts 1 16 256]
+
+For each k, the target column (stacked --repeat times) is split into --parts
+partitions, sketched per partition and merged, then compared with exact
+np.quantile on the same rows. Rank error is |true rank of estimate - q|,
+max over q in 1%..99%; the KLL bound is roughly 1.7/k.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from core.pipeline import COL, harmonize_columns  # noqa: E402
+from core.sketch import KLLSketch, merge_sketches  # noqa: E402
+
+QS = np.linspace(0.01, 0.99, 99)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", nargs="?", default="data/seoulbike_cleaned.csv")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--k", type=int, nargs="+", default=[50, 100, 200, 400])
+    parser.add_argument("--parts", type=int, nargs="+", default=[1, 16, 256])
+    args = parser.parse_args()
+
+    y = harmonize_columns(pd.read_csv(args.path))[COL["target"]].to_numpy(dtype="float64")
+    y = np.tile(y, args.repeat)
+    exact_sorted = np.sort(y)
+    t0 = time.perf_counter()
+    np.quantile(y, QS)
+    exact_s = time.perf_counter() - t0
+    print(f"rows: {len(y):,}  exact quantiles (sort): {exact_s * 1000:.1f} ms  {y.nbytes / 1e6:.1f} MB of values")
+
+    for k in args.k:
+        for parts in args.parts:
+            t0 = time.perf_counter()
+            sketch = merge_sketches(*(KLLSketch(k).update(p) for p in np.array_split(y, parts)))
+            est = sketch.quantile(QS)
+            seconds = time.perf_counter() - t0
+            # ties: any rank inside the run of equal values counts as exact
+            lo = np.searchsorted(exact_sorted, est, side="left") / len(y)
+            hi = np.searchsorted(exact_sorted, est, side="right") / len(y)
+            err = np.where(QS < lo, lo - QS, np.where(QS > hi, QS - hi, 0.0)).max()
+            print(
+                f"k={k:<4} parts={parts:<4} retained={sketch.retained:>5} ({sketch.retained * 8 / 1e3:5.1f} kB)"
+                f"  max rank error {err:6.2%}  (bound ~{1.7 / k:5.2%})  {seconds * 1000:7.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Memory footprint and groupby speed: previous wide dtypes vs the compact SCHEMA.
+
+Usage:
+    python benchmarks/bench_schema.py [path/to/dataset.csv] [--repeat N]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+import pandas as pd  # noqa: E402
+from core.pipeline import COL, SCHEMA, harmonize_columns, memory_footprint, standardize_types  # noqa: E402
+
+
+def legacy_standardize_types(df: pd.DataFrame) -> pd.DataFrame:
+    """Previous behaviour: float64/int64 numerics and stripped string labels."""
+    df = df.copy()
+    if COL["date"] in df.columns:
+        df[COL["date"]] = pd.to_datetime(df[COL["date"]], errors="coerce", dayfirst=True)
+    for key, kind in SCHEMA.items():
+        c = COL[key]
+        if c not in df.columns:
+            continue
+        if kind == "category":
+            df[c] = df[c].astype(str).str.strip()
+        else:
+            df[c] = pd.to_numeric(df[c], errors="coerce")
+    return df
+
+
+def _time_groupby(df: pd.DataFrame, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        df.groupby([COL["season"], COL["holiday"]], observed=True)[COL["target"]].mean()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", nargs="?", default="data/seoulbike_cleaned.csv")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    raw = harmonize_columns(pd.read_csv(args.path))
+    raw = pd.concat([raw] * args.repeat, ignore_index=True)
+
+    before = memory_footprint(legacy_standardize_types(raw))
+    after_df = standardize_types(raw)
+    after = memory_footprint(after_df)
+    report = before.join(after, lsuffix="_before", rsuffix="_after", how="outer")
+    report = report.sort_values("bytes_before", ascending=False)
+    print(f"rows: {len(raw):,}\n")
+    print(report.to_string())
+
+    total_before = before.loc["(total)", "bytes"]
+    total_after = after.loc["(total)", "bytes"]
+    print(f"\nresident frame: {total_before / 1e6:.1f} MB -> {total_after / 1e6:.1f} MB "
+          f"({total_before / total_after:.1f}x smaller)")
+
+    t_before = _time_groupby(legacy_standardize_types(raw))
+    t_after = _time_groupby(after_df)
+    print(f"season x holiday mean: {t_before * 1e3:.1f} ms -> {t_after * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
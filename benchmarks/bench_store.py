@@ -0,0 +1,57 @@
+"""
+Cache hits: st.cache_data-style pickle round trip vs DatasetStore hand-out.
+
+Usage:
+    python benchmarks/bench_store.py [path/to/dataset.csv] [--repeat 100] [--hits 20]
+
+--repeat stacks the prepared dataset N times. st.cache_data stores a pickle
+and unpickles a fresh copy on every hit; the store hands out a shallow
+Copy-on-Write view of one shared frame.
+"""
+import argparse
+import os
+import pickle
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+import pandas as pd  # noqa: E402
+from core.io import prepare_frame  # noqa: E402
+from core.store import DatasetStore, nbytes_of  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", nargs="?", default="data/seoulbike_cleaned.csv")
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--hits", type=int, default=20, help="cache hits to time (e.g. sessions x reruns)")
+    args = parser.parse_args()
+
+    df = prepare_frame(args.path)
+    df = pd.concat([df] * args.repeat, ignore_index=True)
+    size = nbytes_of(df)
+    print(f"rows: {len(df):,}  frame: {size / 1e6:.1f} MB")
+
+    blob = pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL)
+    t0 = time.perf_counter()
+    for _ in range(args.hits):
+        copy = pickle.loads(blob)
+    pickled = (time.perf_counter() - t0) * 1000 / args.hits
+    del copy
+
+    store = DatasetStore()
+    store.get("bench", 1, lambda: df)
+    t0 = time.perf_counter()
+    for _ in range(args.hits):
+        view = store.get("bench", 1, lambda: df)
+    shared = (time.perf_counter() - t0) * 1000 / args.hits
+    del view
+
+    print(f"cache_data hit (unpickle): {pickled:9.2f} ms  +{size / 1e6:.1f} MB per hit")
+    print(f"store hit (shared view):   {shared:9.3f} ms  +0 MB per hit")
+    print(f"store stats: {store.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+Benchmark suite: pipeline stages and page computations on synthetic data
+at growing scale, compared against a stored baseline.
+
+Usage:
+    python benchmarks/bench_suite.py [--scales 1 10 100] [--days 365] [--repeat 3]
+                                     [--headers cleaned] [--baseline benchmarks/baseline.json]
+                                     [--save-baseline] [--fail-on-regression] [--threshold 0.25]
+                                     [--reference median]
+
+Per scale (stations; rows = scale x days x 24) a seeded CSV is written to a
+temporary directory. Then, for each step, the suite records the best wall
+time of --repeat runs (more for steps that finish within MIN_TIMED_S), the
+throughput in rows/s and the tracemalloc peak from one extra traced run. Steps: read_csv, each run_pipeline stage,
+summarize_frame, and each page's metrics function.
+
+The results are compared with the baseline when it exists. Per scale, each
+step's now/baseline time ratio is divided by a machine-speed factor so that a
+baseline recorded on another machine, or at a quieter moment, stays usable:
+by default (--reference median) the median ratio over the compared steps, or
+with --reference <step> that step's ratio (e.g. read_csv, which is pure
+pandas); --reference "" compares absolute ms. --fail-on-regression exits with
+status 1 when a step is slower than baseline x (1 + threshold). Steps faster
+than --min-ms in both runs are never flagged, because their timings are
+mostly noise. Steps (or scales) present in only one of the two runs are
+listed as missing or new. --save-baseline overwrites the baseline with
+this run.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+import pandas as pd  # noqa: E402
+from core import profiling  # noqa: E402
+from core.aggregates import summarize_frame  # noqa: E402
+from core.metrics import PAGE_METRICS  # noqa: E402
+from core.pipeline import PIPELINE_STAGES, run_pipeline  # noqa: E402
+from synthetic import HEADER_STYLES, generate  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+REFERENCE_MEDIAN = "median"
+
+# Short steps are re-run until this much time has been spent on them.
+MIN_TIMED_S = 0.5
+MAX_RUNS = 50
+
+# step name -> {"ms": best wall time, "rows_per_s": ..., "peak_mb": ...}
+Results = Dict[str, Dict[str, float]]
+
+
+def _traced_peak(fn: Callable[[], object]) -> int:
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - base
+
+
+def _best_ms(fn: Callable[[], object], repeat: int) -> float:
+    """
+    Best wall time of at least repeat runs, and of more for short steps (until
+    MIN_TIMED_S has been spent, at most MAX_RUNS), whose best-of-3 is mostly
+    scheduler noise. The cyclic GC is off while timing (as in timeit), so a
+    collection over earlier garbage is not billed to whichever step triggers it.
+    """
+    best, spent, runs = float("inf"), 0.0, 0
+    gc.collect()
+    gc.disable()
+    try:
+        while runs < repeat or (spent < MIN_TIMED_S and runs < MAX_RUNS):
+            t0 = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - t0
+            best, spent, runs = min(best, elapsed), spent + elapsed, runs + 1
+    finally:
+        gc.enable()
+    return best * 1000
+
+
+def _pipeline_stages(raw: pd.DataFrame, repeat: int) -> Results:
+    """Per-stage wall time (best of at least repeat runs, from profiling records) and traced peak."""
+    times: Dict[str, List[float]] = {}
+    profiling.enable(True)
+    gc.collect()
+    gc.disable()
+    try:
+        spent, runs = 0.0, 0
+        while runs < repeat or (spent < MIN_TIMED_S and runs < MAX_RUNS):
+            profiling.clear()
+            t0 = time.perf_counter()
+            run_pipeline(raw)
+            spent, runs = spent + time.perf_counter() - t0, runs + 1
+            for rec in profiling.records():
+                if rec["stage"] in PIPELINE_STAGES:
+                    times.setdefault(rec["stage"], []).append(float(rec["wall_ms"]))
+    finally:
+        gc.enable()
+        profiling.enable(False)
+        profiling.clear()
+
+    peaks: Dict[str, Dict[str, int]] = {}
+    run_pipeline(raw, on_stage=lambda name, stats: peaks.__setitem__(name, stats))
+    return {
+        name: {"ms": min(ms), "rows_per_s": len(raw) / (min(ms) / 1000) if min(ms) else 0.0,
+               "peak_mb": peaks[name]["peak_bytes"] / 1e6}
+        for name, ms in times.items()
+    }
+
+
+def run_scale(scale: int, days: int, headers: str, repeat: int, seed: int = 0) -> Tuple[int, Results]:
+    raw = generate(scale, days, seed, headers)
+    rows = len(raw)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "synthetic.csv")
+        raw.to_csv(path, index=False)
+        del raw
+
+        def step(fn: Callable[[], object]) -> Dict[str, float]:
+            ms = _best_ms(fn, repeat)
+            return {"ms": ms, "rows_per_s": rows / (ms / 1000) if ms else 0.0, "peak_mb": _traced_peak(fn) / 1e6}
+
+        results: Results = {"read_csv": step(lambda: pd.read_csv(path))}
+        raw = pd.read_csv(path)
+
+    results.update(_pipeline_stages(raw, repeat))
+    df = run_pipeline(raw, owned=True)
+    results["summarize_frame"] = step(lambda: summarize_frame(df))
+    summary = summarize_frame(df)
+    for page, fn in PAGE_METRICS.items():
+        results[f"page:{page}"] = step(lambda fn=fn: fn(summary))
+    return rows, results
+
+
+def _speed_factor(pairs: Dict[str, Tuple[float, float]], reference: str) -> Optional[float]:
+    """now/before for the reference (a step name, the median of the steps, or 1.0 for none)."""
+    if not reference:
+        return 1.0
+    if reference == REFERENCE_MEDIAN:
+        return statistics.median(now / before for now, before in pairs.values()) if pairs else 1.0
+    if reference not in pairs:
+        return None
+    now, before = pairs[reference]
+    return now / before
+
+
+def compare(
+    current: Dict[str, Results],
+    baseline: Dict[str, Results],
+    threshold: float,
+    min_ms: float,
+    reference: str = REFERENCE_MEDIAN,
+) -> Tuple[List[str], List[str], List[str]]:
+    """
+    Readable (regressions, missing, new) lines. A regression is a step whose
+    now/baseline ratio, divided by the reference speed factor, exceeds
+    1 + threshold.
+    """
+    regressions: List[str] = []
+    missing: List[str] = []
+    new: List[str] = []
+    for scale, steps in current.items():
+        before_steps = baseline.get(scale)
+        if before_steps is None:
+            new.append(f"scale {scale} (all steps)")
+            continue
+        missing += [f"scale {scale} {name}" for name in before_steps if name not in steps]
+        new += [f"scale {scale} {name}" for name in steps if name not in before_steps]
+
+        pairs = {
+            name: (now["ms"], before_steps[name]["ms"])
+            for name, now in steps.items()
+            if name in before_steps and min(now["ms"], before_steps[name]["ms"]) > 0
+            and max(now["ms"], before_steps[name]["ms"]) >= min_ms
+        }
+        factor = _speed_factor(pairs, reference)
+        if factor is None:
+            missing.append(f"scale {scale} {reference} (reference step; not comparing this scale)")
+            continue
+        for name, (now, before) in pairs.items():
+            if name == reference:
+                continue
+            change = now / before / factor
+            if change > 1 + threshold:
+                adjusted = f" after x{factor:.2f} machine factor" if reference else ""
+                regressions.append(
+                    f"scale {scale} {name}: {before:.1f} ms -> {now:.1f} ms (+{(change - 1) * 100:.0f}%{adjusted})"
+                )
+    return regressions, missing, new
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100], help="stations, e.g. 1 10 100 1000")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--headers", choices=sorted(HEADER_STYLES), default="cleaned")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown as a fraction")
+    parser.add_argument("--min-ms", type=float, default=5.0, help="ignore steps faster than this")
+    parser.add_argument("--reference", default=REFERENCE_MEDIAN,
+                        help='"median", a step name, or "" for absolute ms')
+    parser.add_argument("--out", default=None, help="also write this run's results as JSON")
+    args = parser.parse_args()
+
+    current: Dict[str, Results] = {}
+    for scale in args.scales:
+        rows, results = run_scale(scale, args.days, args.headers, max(1, args.repeat))
+        current[str(scale)] = results
+        print(f"\nscale {scale}x ({rows:,} rows)")
+        print(f"  {'step':<30} {'ms':>10} {'rows/s':>14} {'peak MB':>9}")
+        for name, r in results.items():
+            print(f"  {name:<30} {r['ms']:>10.1f} {r['rows_per_s']:>14,.0f} {r['peak_mb']:>9.1f}")
+
+    payload = {
+        "meta": {"days": args.days, "headers": args.headers, "python": platform.python_version(),
+                 "pandas": pd.__version__, "machine": platform.machine(), "cpus": os.cpu_count()},
+        "results": current,
+    }
+    if args.out:
+        with open(args.out, "w") as fh:
+            json.dump(payload, fh, indent=1)
+
+    status = 0
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+        if baseline.get("meta", {}).get("days") != args.days:
+            print(f"\nbaseline was recorded with --days {baseline.get('meta', {}).get('days')}; not comparing")
+        else:
+            regressions, missing, new = compare(
+                current, baseline["results"], args.threshold, args.min_ms, args.reference
+            )
+            against = f" (reference: {args.reference})" if args.reference else " (absolute ms)"
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}{against} vs {args.baseline}")
+            for line in regressions:
+                print(f"  {line}")
+            for label, lines in (("missing from this run", missing), ("not in the baseline", new)):
+                if lines:
+                    print(f"{len(lines)} step(s) {label}:")
+                    for line in lines:
+                        print(f"  {line}")
+            if regressions and args.fail_on_regression:
+                status = 1
+    if args.save_baseline:
+        with open(args.baseline, "w") as fh:
+            json.dump(payload, fh, indent=1)
+        print(f"\nbaseline written to {args.baseline}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
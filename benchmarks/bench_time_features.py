@@ -0,0 +1,90 @@
+"""
+add_time_features: vectorized lookup-table version vs the previous per-row map.
+
+Usage:
+    python benchmarks/bench_time_features.py [--sizes 10000 100000 1000000]
+
+Checks that both produce the same values, then times each across sizes.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from core.pipeline import COL, add_time_features  # noqa: E402
+
+
+def legacy_add_time_features(df: pd.DataFrame) -> pd.DataFrame:
+    """The pre-vectorization implementation, kept here as the reference."""
+    df = df.copy()
+    dt = df[COL["date"]]
+    df["Month"] = dt.dt.month
+    df["DayOfWeek"] = dt.dt.day_name()
+    df["IsWeekend"] = dt.dt.weekday >= 5
+
+    h = df[COL["hour"]].fillna(-1).astype(int)
+
+    def _timeslot(x: int) -> str:
+        if 7 <= x <= 9:
+            return "Morning Peak (07-09)"
+        if 17 <= x <= 19:
+            return "Evening Peak (17-19)"
+        if 10 <= x <= 16:
+            return "Midday (10-16)"
+        if 20 <= x <= 23:
+            return "Night (20-23)"
+        if 0 <= x <= 6:
+            return "Early Morning (00-06)"
+        return "Unknown"
+
+    df["TimeSlot"] = h.map(_timeslot)
+    return df
+
+
+def make_frame(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp("2017-12-01") + pd.to_timedelta(rng.integers(0, 365 * 3, n), unit="D")
+    hours = rng.integers(0, 24, n).astype("float64")
+    dates = pd.Series(dates)
+    dates[rng.random(n) < 0.001] = pd.NaT
+    hours[rng.random(n) < 0.001] = np.nan
+    return pd.DataFrame({COL["date"]: dates, COL["hour"]: hours})
+
+
+def _best_of(fn, df: pd.DataFrame, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(df)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    check = make_frame(50_000, seed=1)
+    old, new = legacy_add_time_features(check), add_time_features(check)
+    for c in ["Month", "DayOfWeek", "IsWeekend", "TimeSlot"]:
+        a = old[c].astype(object).where(old[c].notna(), None)
+        b = new[c].astype(object).where(new[c].notna(), None)
+        assert a.equals(b), f"{c} differs from the reference implementation"
+    print("output identical to reference: yes\n")
+
+    print(f"{'rows':>12}  {'per-row map':>12}  {'vectorized':>12}  {'speedup':>8}")
+    for n in args.sizes:
+        df = make_frame(n)
+        t_old = _best_of(legacy_add_time_features, df, args.repeat)
+        t_new = _best_of(add_time_features, df, args.repeat)
+        print(f"{n:>12,}  {t_old * 1e3:>10.1f}ms  {t_new * 1e3:>10.1f}ms  {t_old / t_new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
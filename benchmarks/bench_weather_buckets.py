@@ -0,0 +1,63 @@
+"""
+Weather buckets: pd.cut + groupby over the rows vs rolling up fine histograms.
+
+Usage:
+    python benchmarks/bench_weather_buckets.py [path/to/dataset.csv] [--repeat 100]
+
+--repeat stacks the prepared dataset N times. The histogram is built once per
+dataset version; each bucket change only costs the rollup.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from core.aggregates import DEFAULT_WEATHER_EDGES, histogram_buckets, weather_histogram  # noqa: E402
+from core.io import prepare_frame  # noqa: E402
+from core.pipeline import COL  # noqa: E402
+
+
+def _ms(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", nargs="?", default="data/seoulbike_cleaned.csv")
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    df = prepare_frame(args.path)
+    df = pd.concat([df] * args.repeat, ignore_index=True)
+    print(f"rows: {len(df):,}")
+
+    for key, edges in DEFAULT_WEATHER_EDGES.items():
+        if COL[key] not in df.columns:
+            continue
+        bins = [-np.inf] + edges + [np.inf]
+
+        def per_rerun():
+            return df.groupby(pd.cut(df[COL[key]], bins), observed=False)[COL["target"]].agg(["sum", "count"])
+
+        hist = weather_histogram(df, key)
+        exact = per_rerun()
+        rolled = histogram_buckets(hist, edges)
+        same = np.allclose(exact["count"].to_numpy(), rolled["count"].to_numpy())
+        print(
+            f"{key:<11} pd.cut {_ms(per_rerun):7.2f} ms | build {_ms(lambda: weather_histogram(df, key)):7.2f} ms"
+            f" once, rollup {_ms(lambda: histogram_buckets(hist, edges)):5.2f} ms  ({len(hist)} bins)"
+            f"  {'same' if same else 'DIFFERENT'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
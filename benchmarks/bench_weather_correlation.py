@@ -0,0 +1,61 @@
+"""
+Weather correlation per (season, holiday) slice: df.corr per slice vs the
+merged cross-product matrices.
+
+Usage:
+    python benchmarks/bench_weather_correlation.py [path/to/dataset.csv] [--repeat 100]
+
+--repeat stacks the prepared dataset N times. The matrices are built once per
+dataset version; each view change only solves 8 small k x k systems.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from core.io import prepare_frame  # noqa: E402
+from core.moments import MOMENT_DIMS, MOMENT_VARS, build_moments, correlations, regression  # noqa: E402
+from core.pipeline import COL  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", nargs="?", default="data/seoulbike_cleaned.csv")
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    df = prepare_frame(args.path)
+    df = pd.concat([df] * args.repeat, ignore_index=True)
+    cols = [COL["target"]] + [COL[k] for k in MOMENT_VARS if COL[k] in df.columns]
+    print(f"rows: {len(df):,}  variables: {len(cols)}")
+
+    t0 = time.perf_counter()
+    exact = {
+        key: g[cols].astype("float64").corr()[COL["target"]].drop(COL["target"])
+        for key, g in df.groupby(MOMENT_DIMS, observed=True)
+    }
+    corr_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    moments = build_moments(df)
+    build_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    engine = {key: correlations(m) for key, m in moments.items()}
+    for m in moments.values():
+        regression(m)
+    solve_s = time.perf_counter() - t0
+
+    diff = max(np.nanmax(np.abs(engine[k].to_numpy() - exact[k].to_numpy()), initial=0) for k in exact)
+    print(f"df.corr per slice     : {corr_s * 1000:8.1f} ms (every view change)")
+    print(f"build matrices (once) : {build_s * 1000:8.1f} ms")
+    print(f"corr + OLS from Z'Z   : {solve_s * 1000:8.1f} ms ({len(moments)} slices)")
+    print(f"max |r difference|    : {diff:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Headless load harness: N concurrent simulated sessions driving the real
+app scripts through Streamlit's testing API (no browser, no server).
+
+Usage:
+    python benchmarks/load_harness.py [--sessions 8] [--iterations 3] [--seed 0]
+                                      [--data data/seoulbike_cleaned.csv] [--scale 0]
+                                      [--mode In-memory] [--out results.json]
+
+Each session owns one AppTest per script, the way a browser tab keeps its
+session between reruns. Per iteration it:
+- runs app/app.py and sets the dataset path and the Functioning Day
+  checkbox;
+- carries those sidebar values into every page, as session_state does
+  across pages;
+- runs each page under app/pages;
+- moves the buffer slider on the Recommendations page a few times.
+
+The dataset path is picked from --data plus, with --scale N, a synthetic
+CSV of N stations (see synthetic.py).
+
+Each session runs in its own process: the testing API drives Streamlit's
+single process-wide Runtime, which concurrent AppTests in one process
+tear down under each other. So sessions do not share the Streamlit caches
+as they would on one server; every session pays its own cold loads. The
+numbers are per-process and cold-cache: they bound what one session costs,
+not contention between sessions of one shared server (lock waits, cache
+eviction, one GIL), and the report header says so.
+
+A rerun that raises (or renders an exception or error) counts as an error
+sample and the session carries on with its next step. Reported per script:
+rerun count, p50/p95/p99 latency, error count and the largest session
+process RSS after its reruns. Also reported: total reruns per second of
+wall time.
+"""
+import argparse
+import glob
+import json
+import os
+import multiprocessing
+import random
+import sys
+import tempfile
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "app"))
+
+import numpy as np  # noqa: E402
+from core.profiling import _rss_bytes  # noqa: E402
+from streamlit import logger as st_logger  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+from synthetic import generate  # noqa: E402
+
+APP = os.path.join(ROOT, "app", "app.py")
+PAGES = sorted(glob.glob(os.path.join(ROOT, "app", "pages", "*.py")))
+
+# Printed above the report and stored with --out, so results are not read as
+# a shared-server measurement.
+TOPOLOGY = "process-per-session, cold cache (no shared Streamlit runtime)"
+
+# Sidebar values the main script stores for the pages.
+SHARED_KEYS = ["data_path", "apply_filter", "ingest_mode", "row_filter"]
+
+BUFFER_STEPS = [5, 15, 25]
+
+
+class Recorder:
+    """Latency / error / memory samples per script, for one session process."""
+
+    def __init__(self):
+        self.latency: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.rss: Dict[str, List[int]] = {}
+
+    def timed(self, name: str, at: AppTest, action: Optional[Callable[[AppTest], object]] = None) -> AppTest:
+        """
+        Run at (or the element action(at) returns, e.g. a widget set_value)
+        and record the sample. A failure, including one while looking up the
+        widget, is recorded as an error and hands back at unchanged.
+        """
+        t0 = time.perf_counter()
+        try:
+            out = (action(at) if action else at).run()
+            failed = len(out.exception) + len(out.error) > 0
+        except Exception:
+            out, failed = at, True
+            traceback.print_exc(limit=2)
+        ms = (time.perf_counter() - t0) * 1000
+        self.latency.setdefault(name, []).append(ms)
+        self.errors[name] = self.errors.get(name, 0) + int(failed)
+        self.rss.setdefault(name, []).append(_rss_bytes())
+        return out
+
+    def add(self, other: Dict[str, Dict]) -> None:
+        """Fold in the samples of another session (Recorder.__dict__)."""
+        for name, ms in other["latency"].items():
+            self.latency.setdefault(name, []).extend(ms)
+            self.rss.setdefault(name, []).extend(other["rss"][name])
+            self.errors[name] = self.errors.get(name, 0) + other["errors"].get(name, 0)
+
+
+def _slider(at: AppTest):
+    return at.slider[0]
+
+
+def run_session(session: int, iterations: int, paths: List[str], mode: str, seed: int) -> Dict[str, Dict]:
+    """One simulated session, run in its own process; returns its samples."""
+    st_logger.set_log_level("error")  # bare-mode and deprecation warnings per rerun
+    os.chdir(ROOT)  # the scripts resolve relative dataset paths from the repo root
+    rec = Recorder()
+    rng = random.Random(seed * 1000 + session)
+    app = AppTest.from_file(APP, default_timeout=300)
+    app.session_state["ingest_mode"] = mode
+    pages = {p: AppTest.from_file(p, default_timeout=300) for p in PAGES}
+
+    app = rec.timed("app", app)
+    for _ in range(iterations):
+        path, apply_filter = rng.choice(paths), rng.random() < 0.8
+        app = rec.timed("app", app, lambda at: at.text_input(key="data_path").set_value(path))
+        app = rec.timed("app", app, lambda at: at.checkbox(key="apply_filter").set_value(apply_filter))
+        shared = {k: app.session_state[k] for k in SHARED_KEYS if k in app.session_state}
+
+        for page, at in pages.items():
+            name = os.path.splitext(os.path.basename(page))[0]
+            for k, v in shared.items():
+                at.session_state[k] = v
+            at = rec.timed(name, at)
+            if name.startswith("5_") and len(at.slider):
+                for pct in rng.sample(BUFFER_STEPS, len(BUFFER_STEPS)):
+                    at = rec.timed(f"{name}:buffer", at, lambda a, pct=pct: _slider(a).set_value(pct))
+            pages[page] = at
+    return rec.__dict__
+
+
+def report(rec: Recorder, wall_s: float, sessions: int) -> Dict[str, Dict[str, float]]:
+    rows = {}
+    for name, ms in rec.latency.items():
+        a = np.asarray(ms)
+        rows[name] = {
+            "reruns": int(len(a)),
+            "p50_ms": float(np.percentile(a, 50)),
+            "p95_ms": float(np.percentile(a, 95)),
+            "p99_ms": float(np.percentile(a, 99)),
+            "errors": rec.errors.get(name, 0),
+            "rss_mb": max(rec.rss[name]) / 2**20,
+        }
+    total = sum(r["reruns"] for r in rows.values())
+    print(f"\n{sessions} sessions, {TOPOLOGY}")
+    print(f"{'script':<34} {'reruns':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7} {'RSS MB':>8}")
+    for name, r in rows.items():
+        print(
+            f"{name:<34} {r['reruns']:>7} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f}"
+            f" {r['errors']:>7} {r['rss_mb']:>8.0f}"
+        )
+    print(f"\n{total:,} reruns in {wall_s:.1f} s: {total / wall_s:.1f} reruns/s")
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=8, help="concurrent simulated sessions")
+    parser.add_argument("--iterations", type=int, default=3, help="scenario passes per session")
+    parser.add_argument("--data", nargs="+", default=["data/seoulbike_cleaned.csv"], help="dataset paths to pick from")
+    parser.add_argument("--scale", type=int, default=0, help="also replay a synthetic CSV of this many stations")
+    parser.add_argument("--mode", default="In-memory", help="ingestion mode (sidebar label)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="write per-script results as JSON")
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = list(args.data)
+        if args.scale:
+            synthetic = os.path.join(tmp, f"synthetic_{args.scale}x.csv")
+            generate(args.scale, seed=args.seed).to_csv(synthetic, index=False)
+            paths.append(synthetic)
+
+        rec = Recorder()
+        t0 = time.perf_counter()
+        # spawn, not fork: a forked child would inherit this process's imported Streamlit state
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=args.sessions, mp_context=ctx) as pool:
+            futures = [
+                pool.submit(run_session, s, args.iterations, paths, args.mode, args.seed)
+                for s in range(args.sessions)
+            ]
+            for s, f in enumerate(futures):
+                try:
+                    rec.add(f.result())
+                except Exception as e:
+                    print(f"session {s} failed: {e!r}", file=sys.stderr)
+                    rec.add({"latency": {"session": [0.0]}, "rss": {"session": [0]}, "errors": {"session": 1}})
+        rows = report(rec, time.perf_counter() - t0, args.sessions)
+
+    if args.out:
+        with open(args.out, "w") as fh:
+            json.dump({"sessions": args.sessions, "iterations": args.iterations, "mode": args.mode,
+                       "topology": TOPOLOGY, "results": rows}, fh, indent=1)
+    return 1 if any(r["errors"] for r in rows.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
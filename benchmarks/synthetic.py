@@ -0,0 +1,135 @@
+"""
+Seeded synthetic Seoul-bike data in the raw CSV schema.
+
+generate(scale) returns `scale` stations x `days` of hourly rows with the
+same columns as data/seoulbike_cleaned.csv: a daily double commute peak,
+seasonal temperature, weekend/holiday dips, rain and snow that suppress
+demand, and a few non-functioning days with zero rentals. Stations get a
+"Station" column when there is more than one.
+
+HEADER_STYLES covers the column-name variants harmonize_columns must map.
+
+Usage (writes a CSV):
+    python benchmarks/synthetic.py out.csv [--scale 10] [--days 365] [--seed 0] [--headers cleaned]
+"""
+import argparse
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+# Column order of the generated frame, as keys of each header style.
+_KEYS: List[str] = [
+    "date", "target", "hour", "temp", "humidity", "wind", "visibility", "dew_point",
+    "solar", "rainfall", "snowfall", "season", "holiday", "functioning_day",
+]
+
+HEADER_STYLES: Dict[str, Dict[str, str]] = {
+    # data/seoulbike_cleaned.csv
+    "cleaned": {
+        "date": "Date", "target": "Rented_Bike_Count", "hour": "Hour", "temp": "Temperature°C",
+        "humidity": "Humidity%", "wind": "Wind_speed_m_s", "visibility": "Visibility_10m",
+        "dew_point": "Dew_point_temperature°C", "solar": "Solar_Radiation_MJ_m2", "rainfall": "Rainfallmm",
+        "snowfall": "Snowfall_cm", "season": "Seasons", "holiday": "Holiday", "functioning_day": "Functioning_Day",
+    },
+    # the UCI original
+    "original": {
+        "date": "Date", "target": "Rented Bike Count", "hour": "Hour", "temp": "Temperature(°C)",
+        "humidity": "Humidity(%)", "wind": "Wind speed (m/s)", "visibility": "Visibility (10m)",
+        "dew_point": "Dew point temperature(°C)", "solar": "Solar Radiation (MJ/m2)", "rainfall": "Rainfall(mm)",
+        "snowfall": "Snowfall (cm)", "season": "Seasons", "holiday": "Holiday", "functioning_day": "Functioning Day",
+    },
+    # snake_case exports
+    "snake": {
+        "date": "date", "target": "rented_bike_count", "hour": "hour", "temp": "temperature_c",
+        "humidity": "humidity", "wind": "wind_speed_m_s", "visibility": "visibility_10m",
+        "dew_point": "dew_point_temperature_c", "solar": "solar_radiation_mj_m2", "rainfall": "rainfall_mm",
+        "snowfall": "snowfall_cm", "season": "season", "holiday": "is_holiday", "functioning_day": "functioning_day",
+    },
+}
+
+DATE_FORMATS: Dict[str, str] = {"cleaned": "%Y-%m-%d", "original": "%d/%m/%Y", "snake": "%Y-%m-%d"}
+
+_SEASONS = np.array(["Winter"] * 2 + ["Spring"] * 3 + ["Summer"] * 3 + ["Autumn"] * 3 + ["Winter"])
+# Relative demand by hour: night trough, 08:00 and 18:00 commute peaks.
+_HOURLY = np.array([
+    0.35, 0.28, 0.2, 0.13, 0.09, 0.1, 0.28, 0.65, 1.3, 0.75, 0.5, 0.55,
+    0.65, 0.7, 0.72, 0.78, 0.9, 1.25, 1.8, 1.25, 1.05, 1.0, 0.9, 0.6,
+])
+
+
+def generate(
+    scale: int = 1, days: int = 365, seed: int = 0, headers: str = "cleaned", start: str = "2017-12-01"
+) -> pd.DataFrame:
+    """Raw frame of scale stations x days x 24 hourly rows (deterministic for a seed)."""
+    rng = np.random.default_rng(seed)
+    stations = max(1, int(scale))
+    dates = pd.date_range(start, periods=days, freq="D")
+
+    # weather and calendar are per (day, hour), shared by all stations
+    doy = dates.dayofyear.to_numpy()
+    day_temp = 12.5 - 15 * np.cos(2 * np.pi * (doy - 15) / 365) + rng.normal(0, 3, days)
+    hour = np.tile(np.arange(24), days)
+    day = np.repeat(np.arange(days), 24)
+    temp = day_temp[day] + 4 * np.sin(2 * np.pi * (hour - 9) / 24) + rng.normal(0, 1, days * 24)
+    humidity = np.clip(rng.normal(58, 20, days * 24), 0, 98).round()
+    rain = np.where(rng.random(days * 24) < 0.06, rng.exponential(2.5, days * 24), 0).round(1)
+    snow = np.where((temp < 0) & (rng.random(days * 24) < 0.05), rng.exponential(1.0, days * 24), 0).round(1)
+    holiday = rng.random(days) < 0.05
+    functioning = rng.random(days) >= 0.03
+    weekend = dates.weekday.to_numpy() >= 5
+
+    base = (
+        _HOURLY[hour]
+        * np.clip(0.35 + 0.05 * temp - 0.0012 * (temp - 24) ** 2, 0.05, None)
+        * np.where(weekend[day] | holiday[day], 0.8, 1.0)
+        / (1 + 0.8 * rain + 1.5 * snow)
+    )
+    shared = {
+        "hour": hour,
+        "temp": temp.round(1),
+        "humidity": humidity,
+        "wind": np.clip(rng.gamma(2.0, 0.85, days * 24), 0, 7.4).round(1),
+        "visibility": np.clip(2000 - rng.exponential(500, days * 24) - 8 * humidity, 27, 2000).round(),
+        "dew_point": (temp - (100 - humidity) / 5).round(1),
+        "solar": np.clip(np.sin(np.pi * (hour - 6) / 13), 0, None).round(2) * np.clip(day_temp[day] / 15, 0.3, 1.6),
+        "rainfall": rain,
+        "snowfall": snow,
+        "season": _SEASONS[dates.month.to_numpy() - 1][day],
+        "holiday": np.where(holiday[day], "Holiday", "No Holiday"),
+        "functioning_day": np.where(functioning[day], "Yes", "No"),
+    }
+
+    n = stations * days * 24
+    size = np.repeat(rng.lognormal(6.3, 0.35, stations), days * 24)
+    target = rng.poisson(np.tile(base, stations) * size)
+    target[~np.tile(functioning[day], stations)] = 0
+
+    names = HEADER_STYLES[headers]
+    cols = {names["date"]: np.tile(dates.strftime(DATE_FORMATS[headers]).to_numpy()[day], stations)}
+    cols[names["target"]] = target.astype(np.int64)
+    for key in _KEYS[2:]:
+        values = shared[key]
+        cols[names[key]] = np.tile(values.round(2) if key == "solar" else values, stations)
+    df = pd.DataFrame(cols)
+    if stations > 1:
+        df.insert(0, "Station", np.repeat([f"ST{i:04d}" for i in range(stations)], days * 24))
+    assert len(df) == n
+    return df
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write a synthetic Seoul-bike CSV.")
+    parser.add_argument("out")
+    parser.add_argument("--scale", type=int, default=1, help="stations (rows = scale x days x 24)")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--headers", choices=sorted(HEADER_STYLES), default="cleaned")
+    args = parser.parse_args()
+    df = generate(args.scale, args.days, args.seed, args.headers)
+    df.to_csv(args.out, index=False)
+    print(f"{args.out}: {len(df):,} rows")
+
+
+if __name__ == "__main__":
+    main()
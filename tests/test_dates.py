@@ -0,0 +1,37 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from core.pipeline import parse_dates  # noqa: E402
+
+
+def _parse(values, formats=None):
+    parsed, coerced = parse_dates(pd.Series(values, dtype=object), formats)
+    return [None if pd.isna(v) else v.strftime("%Y-%m-%d") for v in parsed], coerced
+
+
+def test_calls_do_not_share_formats():
+    _parse(["12/31/2017"])
+    assert _parse(["31/12/2017", "15/01/2018"]) == (["2017-12-31", "2018-01-15"], 0)
+
+
+def test_dataset_keeps_its_format_across_pieces():
+    formats = {}
+    assert _parse(["12/31/2017"], formats) == (["2017-12-31"], 0)
+    # ambiguous on its own; the dataset has shown it is month-first
+    assert _parse(["01/02/2018"], formats) == (["2018-01-02"], 0)
+
+
+def test_cached_format_refits_when_it_would_coerce():
+    formats = {}
+    _parse(["01/02/2017", "03/04/2017"], formats)
+    assert _parse(["12/13/2017"], formats) == (["2017-12-13"], 0)
+    assert _parse(["31/12/2017", "15/01/2018"], formats) == (["2017-12-31", "2018-01-15"], 0)
+
+
+def test_mixed_orders_fall_back_to_dayfirst():
+    values = ["12/31/2017", "31/12/2017", "not a date"]
+    assert _parse(values) == (["2017-12-31", "2017-12-31", None], 1)
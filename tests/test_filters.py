@@ -0,0 +1,49 @@
+import datetime as dt
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from core.filters import FilterIndex, RowFilter, select_rows  # noqa: E402
+from core.pipeline import COL  # noqa: E402
+
+FILTERS = [
+    RowFilter(holiday=False),
+    RowFilter(holiday=True),
+    RowFilter(hours=(7, 9), holiday=False),
+    RowFilter(seasons=("Winter",)),
+    RowFilter(date_range=(dt.date(2018, 1, 2), dt.date(2018, 1, 3)), holiday=False),
+]
+
+
+def _frame(holiday: bool) -> pd.DataFrame:
+    dates = pd.date_range("2018-01-01", periods=96, freq="h")
+    df = pd.DataFrame({
+        COL["date"]: dates.normalize(),
+        COL["hour"]: dates.hour,
+        COL["season"]: pd.Categorical(np.where(dates.day == 1, "Winter", "Spring")),
+        COL["target"]: np.arange(96),
+    })
+    if holiday:
+        df["IsHoliday"] = dates.day == 2
+    return df
+
+
+@pytest.mark.parametrize("f", FILTERS, ids=lambda f: f.describe())
+@pytest.mark.parametrize("holiday", [True, False], ids=["with_holiday", "no_holiday"])
+def test_mask_matches_index(f, holiday):
+    df = _frame(holiday)
+    scanned = select_rows(df, f)
+    indexed = select_rows(df, f, FilterIndex(df))
+    assert scanned.index.tolist() == indexed.index.tolist()
+
+
+def test_missing_holiday_column_means_no_holidays():
+    df = _frame(holiday=False)
+    assert RowFilter(holiday=False).mask(df).all()
+    assert not RowFilter(holiday=True).mask(df).any()
+    assert not RowFilter(seasons=("Winter",)).mask(df.drop(columns=[COL["season"]])).any()
@@ -0,0 +1,90 @@
+import os
+import shutil
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(os.path.join(ROOT, "app"))
+
+from core.aggregates import extend_summary, merge_summaries, summarize_frame  # noqa: E402
+from core.ingest import IncrementalState, _append_chunk, refresh_incremental  # noqa: E402
+from core.io import prepare_frame  # noqa: E402
+from core.pipeline import COL  # noqa: E402
+
+DATA = os.path.join(ROOT, "data", "seoulbike_cleaned.csv")
+
+
+@pytest.fixture(scope="module")
+def df() -> pd.DataFrame:
+    return prepare_frame(DATA, True)
+
+
+def _assert_same(a, b) -> None:
+    assert a.rows == b.rows
+    assert_frame_equal(a.cube, b.cube)
+    assert a.weather.keys() == b.weather.keys()
+    for k in a.weather:
+        assert_frame_equal(a.weather[k], b.weather[k])
+    assert {k: v.to_dict() for k, v in a.label_counts.items()} == {k: v.to_dict() for k, v in b.label_counts.items()}
+    assert a.sketches.keys() == b.sketches.keys()
+    assert a.moments.keys() == b.moments.keys()
+    assert np.array_equal(a.quality.slots, b.quality.slots)
+    assert np.array_equal(a.quality.slot_rows, b.quality.slot_rows)
+    assert a.quality.columns.equals(b.quality.columns)
+
+
+@pytest.mark.parametrize(
+    "split",
+    [
+        "one_new_cell",
+        "ten_new_cells",
+        "existing_cell",
+        "nan_target",
+        "out_of_order",
+    ],
+)
+def test_extend_summary_matches_merge(df, split):
+    n = len(df)
+    base, delta = {
+        "one_new_cell": (df.iloc[:n - 1], df.iloc[n - 1:]),
+        "ten_new_cells": (df.iloc[:n - 10], df.iloc[n - 10:]),
+        "existing_cell": (df, df.iloc[[n - 1, n - 1]]),
+        "nan_target": (df.iloc[:n - 1], df.iloc[n - 1:].assign(**{COL["target"]: np.nan})),
+        "out_of_order": (df.iloc[100:], df.iloc[:3]),
+    }[split]
+    summary = summarize_frame(base)
+    _assert_same(extend_summary(summary, delta), merge_summaries(summary, summarize_frame(delta)))
+
+
+def test_one_row_append_matches_rebuild(tmp_path):
+    path = str(tmp_path / "feed.csv")
+    with open(DATA) as fh:
+        lines = fh.read().splitlines()
+    with open(path, "w") as fh:
+        fh.write("\n".join(lines[:-3]) + "\n")
+    state = refresh_incremental(None, path)
+    for line in lines[-3:]:
+        with open(path, "a") as fh:
+            fh.write(line + "\n")
+        state = refresh_incremental(state, path)
+        assert state.last_refresh["mode"] == "append"
+        assert state.last_refresh["rows_added"] == 1
+    shutil.copy(DATA, str(tmp_path / "full.csv"))
+    full = refresh_incremental(None, str(tmp_path / "full.csv"))
+    _assert_same(state.summary, full.summary)
+    assert_frame_equal(state.frame, full.frame.reset_index(drop=True))
+
+
+def test_appends_keep_few_chunks(df):
+    state = IncrementalState(b"", 0, b"", b"", 0, [df.iloc[:100]], summarize_frame(df.iloc[:100]))
+    for start in range(100, 1100, 10):
+        state.chunks = _append_chunk(state.chunks, df.iloc[start:start + 10])
+    assert state.rows == 1100
+    assert len(state.chunks) <= 8
+    assert_frame_equal(state.frame, df.iloc[:1100].reset_index(drop=True))
+    assert_frame_equal(state.rows_since(1095).reset_index(drop=True), df.iloc[1095:1100].reset_index(drop=True))
+    assert len(state.rows_since(1100)) == 0
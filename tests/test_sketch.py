@@ -0,0 +1,93 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from core.sketch import DEFAULT_K, KLLSketch, merge_sketches  # noqa: E402
+
+K = DEFAULT_K
+# Documented bound: rank error about 1.7/k of n.
+MAX_RANK_ERROR = 1.7 / K
+
+PROBES = np.linspace(0.01, 0.99, 99)
+
+
+def _max_rank_error(sketch: KLLSketch, data: np.ndarray) -> float:
+    data = np.sort(data)
+    estimates = sketch.quantile(PROBES)
+    true_ranks = np.searchsorted(data, estimates, side="right") / len(data)
+    return float(np.abs(true_ranks - PROBES).max())
+
+
+@pytest.fixture(scope="module")
+def data() -> np.ndarray:
+    rng = np.random.default_rng(7)
+    return np.concatenate([rng.lognormal(6.0, 1.0, 150_000), rng.normal(300.0, 40.0, 106_000)])
+
+
+def _check_exact(sketch: KLLSketch, data: np.ndarray) -> None:
+    assert sketch.n == len(data)
+    assert sketch.min == data.min()
+    assert sketch.max == data.max()
+    assert sketch.quantile([0.0, 1.0]).tolist() == [data.min(), data.max()]
+
+
+def test_single_sketch(data):
+    sketch = KLLSketch(K)
+    for chunk in np.array_split(data, 40):
+        sketch.update(chunk)
+    _check_exact(sketch, data)
+    assert sketch.retained < 4 * K
+    assert _max_rank_error(sketch, data) <= MAX_RANK_ERROR
+
+
+def test_pairwise_merge(data):
+    half = len(data) // 2
+    a = KLLSketch(K).update(data[:half])
+    b = KLLSketch(K).update(data[half:])
+    merged = a.merge(b)
+    _check_exact(merged, data)
+    assert _max_rank_error(merged, data) <= MAX_RANK_ERROR
+    # inputs are left untouched
+    assert (a.n, b.n) == (half, len(data) - half)
+
+
+def test_merge_all_many_parts(data):
+    parts = [KLLSketch(K).update(part) for part in np.array_split(data, 256)]
+    merged = KLLSketch.merge_all(parts)
+    _check_exact(merged, data)
+    assert merged.retained < 4 * K
+    assert _max_rank_error(merged, data) <= MAX_RANK_ERROR
+    assert merge_sketches(*parts[:128], None, *parts[128:]).quantile(PROBES).tolist() == merged.quantile(PROBES).tolist()
+
+
+def test_chained_merges(data):
+    merged = None
+    for part in np.array_split(data, 64):
+        merged = merge_sketches(merged, KLLSketch(K).update(part))
+    _check_exact(merged, data)
+    assert _max_rank_error(merged, data) <= MAX_RANK_ERROR
+
+
+def test_nan_is_ignored():
+    sketch = KLLSketch(K).update([np.nan, 3.0, np.nan, 1.0, 2.0])
+    assert (sketch.n, sketch.min, sketch.max) == (3, 1.0, 3.0)
+    assert sketch.quantile([0.5]).tolist() == [2.0]
+    assert KLLSketch(K).update([np.nan, np.nan]).n == 0
+
+
+def test_empty_inputs():
+    empty = KLLSketch(K).update([])
+    assert empty.n == 0 and np.isnan(empty.min) and np.isnan(empty.max)
+    assert np.isnan(empty.quantile([0.0, 0.5, 1.0])).all()
+    assert np.isnan(empty.rank(1.0))
+
+    full = KLLSketch(K).update([1.0, 2.0])
+    merged = KLLSketch.merge_all([empty, full, KLLSketch(K)])
+    assert (merged.n, merged.min, merged.max) == (2, 1.0, 2.0)
+    assert np.isnan(KLLSketch.merge_all([empty, KLLSketch(K)]).min)
+    assert merge_sketches(None, None) is None
+    assert merge_sketches(None, full) is full